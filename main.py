@@ -1,17 +1,10 @@
 import sys
-import os
-import joblib
-import pandas as pd
+import threading
 
-# Importamos las rutas y funciones de tu proyecto
+# Solo lo imprescindible para predecir: pandas, sklearn y el pipeline de entrenamiento
+# se importan únicamente si hay que entrenar (ver main()).
 from tasa_churn.utils.paths import MODELS_DIR, ARTIFACTS_DIR
-from tasa_churn.data.make_dataset import load_data
-from tasa_churn.features.build_features import preprocess_data, process_input
-from tasa_churn.models.train_model import train_models
-from tasa_churn.models.predict_model import evaluate_models
-
-# Nombre del modelo que vamos a usar
-MODEL_NAME = "RandomForest.joblib" 
+from tasa_churn.utils.artifacts import artifact_store, MODEL_NAME, build_schema, read_schema, write_schema
 
 def check_is_trained():
     """Verifica si existen el modelo y los archivos de traducción (encoders)."""
@@ -20,7 +13,50 @@ def check_is_trained():
     artifacts_exist = (ARTIFACTS_DIR / "encoders.joblib").exists()
     return model_path.exists() and artifacts_exist
 
-def ask_user_data():
+def load_schema():
+    """
+    Columnas y opciones válidas para las preguntas.
+    Sale de schema.json, que se lee sin cargar sklearn; si no existe (artefactos antiguos)
+    se genera a partir de los encoders.
+    """
+    schema = read_schema()
+    if schema is None:
+        columns, encoders = artifact_store.columns, artifact_store.encoders
+        try:
+            schema = write_schema(columns, encoders)
+        except OSError:
+            schema = build_schema(columns, encoders)
+    return schema
+
+class PredictorWarmup:
+    """
+    Carga modelo, encoders y scaler en segundo plano mientras el usuario responde
+    las primeras preguntas, y hace una predicción de prueba para calentar sklearn.
+    """
+
+    def __init__(self):
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            import numpy as np
+            from tasa_churn.features.transformer import current_model_and_transformer
+            model, transformer = current_model_and_transformer()
+            if hasattr(model, "predict_proba"):
+                model.predict_proba(transformer.scale_encoded(np.zeros((1, transformer.n_features))))
+        except Exception:
+            # Si falla aquí, el error se muestra al usar el modelo en el bucle principal
+            pass
+
+    def wait(self):
+        """Espera a que termine la carga (no hace nada si ya terminó)."""
+        self._thread.join()
+
+def ask_user_data(schema):
     """
     Pide los datos al usuario de forma interactiva y SEGURA.
     No permite avanzar si el dato no es válido.
@@ -29,31 +65,13 @@ def ask_user_data():
     print("   RIESGO DE CHURN - PREDICCIÓN")
     print("="*40)
     
-    try:
-        columns = joblib.load(ARTIFACTS_DIR / "columns.joblib")
-        encoders = joblib.load(ARTIFACTS_DIR / "encoders.joblib")
-    except FileNotFoundError:
-        print(" Error: Faltan archivos de entrenamiento.")
-        print("   Por favor, borra la carpeta 'models' y ejecuta de nuevo para re-entrenar.")
-        sys.exit(1)
-    
     user_data = {}
     
-    for col in columns:
+    for col in schema["columns"]:
         # --- CASO A: Columna de TEXTO (Categoría) ---
-        if col in encoders:
-            encoder = encoders[col]
-            
-            # Obtener opciones válidas según el tipo de encoder
-            if hasattr(encoder, 'classes_'):
-                # Es un LabelEncoder
-                valid_options = list(encoder.classes_)
-            elif isinstance(encoder, dict):
-                # Es un diccionario de mapeo
-                valid_options = list(encoder.keys())
-            else:
-                print(f" Advertencia: Encoder desconocido para '{col}'. Saltando...")
-                continue
+        if col in schema["categorical"]:
+            valid_options = schema["categorical"][col]["options"]
+            exact = schema["categorical"][col]["exact"]
             
             print(f"\n🔹 Dato: {col.upper()}")
             print(f"   Opciones válidas: {', '.join(valid_options)}")
@@ -62,7 +80,7 @@ def ask_user_data():
                 val = input(f"     Escribe una opción: ").strip()
                 
                 # Validación: puede ser case-insensitive para los diccionarios
-                if isinstance(encoder, dict):
+                if not exact:
                     # Para diccionarios, aceptamos cualquier capitalización
                     if val.title() in valid_options or val in valid_options:
                         user_data[col] = val
@@ -94,44 +112,65 @@ def main():
     if not check_is_trained():
         print(">>> Modelo no encontrado. Iniciando entrenamiento...")
         try:
+            from tasa_churn.data.make_dataset import load_data
+            from tasa_churn.features.build_features import preprocess_data
+            from tasa_churn.models.train_model import train_models
+            from tasa_churn.models.predict_model import evaluate_models
+            from tasa_churn.utils.instrument import write_trace
+
             # IMPORTANTE: Asegúrate de que 'credit-train.csv' (con columna 'y') está en data/raw/
             df = load_data("customer_churn_dataset-training-master.csv") 
             
             # Preprocesamos y guardamos los artefactos (encoders)
-            X_train, X_test, y_train, y_test = preprocess_data(df, target_col='Churn', save_artifacts=True)
+            X_train, X_test, y_train, y_test = preprocess_data(df, target_col='Churn', save_artifacts=True, use_cache=True)
             
             # Entrenamos
             models = train_models(X_train, y_train)
             evaluate_models(models, X_test, y_test)
             print(">>> Entrenamiento finalizado.")
+            # Solo escribe algo si la instrumentación está activa (TASA_CHURN_TRACE=1)
+            write_trace()
         except Exception as e:
             print(f" Error fatal durante el entrenamiento: {e}")
             return
     else:
         print(">>> Modelo cargado correctamente.")
 
-    # 2. Cargar el modelo ya entrenado
+    # 2. Cargar el modelo en segundo plano mientras se hacen las primeras preguntas
+    warmup = PredictorWarmup().start()
     try:
-        model = joblib.load(MODELS_DIR / MODEL_NAME)
+        schema = load_schema()
     except FileNotFoundError:
-        print(f" No se pudo cargar el modelo {MODEL_NAME}.")
-        return
+        print(" Error: Faltan archivos de entrenamiento.")
+        print("   Por favor, borra la carpeta 'models' y ejecuta de nuevo para re-entrenar.")
+        sys.exit(1)
 
     # 3. Bucle infinito para pedir datos
     while True:
         try:
             # Pedir datos (ahora con validación robusta)
-            raw_data = ask_user_data()
+            raw_data = ask_user_data(schema)
             if not raw_data: break 
 
+            # Normalmente ya está cargado; en las siguientes vueltas solo se comprueba la caché
+            warmup.wait()
+            from tasa_churn.features.transformer import current_model_and_transformer
+            try:
+                model, transformer = current_model_and_transformer()
+            except FileNotFoundError:
+                print(f" No se pudo cargar el modelo {MODEL_NAME}.")
+                return
+
             # Procesar (convertir texto a números y escalar)
-            processed_data = process_input(raw_data)
-            
-            # Predecir
-            prediction = model.predict(processed_data)[0]
+            processed_data = transformer.transform_one(raw_data)
             
-            # Intentar sacar probabilidad si el modelo lo soporta
-            probs = model.predict_proba(processed_data)[0] if hasattr(model, "predict_proba") else [0,0]
+            # Una sola llamada: la clase predicha es la de mayor probabilidad (como model.predict)
+            if hasattr(model, "predict_proba"):
+                probs = model.predict_proba(processed_data)[0]
+                prediction = model.classes_[probs.argmax()]
+            else:
+                probs = [0,0]
+                prediction = model.predict(processed_data)[0]
             prob_yes = probs[1] if len(probs) > 1 else 0
 
             # Mostrar resultado
@@ -0,0 +1,275 @@
+import argparse
+
+
+def main(argv=None):
+    """
+    Punto de entrada de línea de comandos: python -m tasa_churn <comando>.
+        - score: puntúa un CSV completo de clientes por bloques.
+        - compare: entrena varios modelos candidatos en paralelo y los compara.
+        - score-spark: puntúa un CSV con Spark (local[*] por defecto) y escribe Parquet particionado.
+        - cv: validación cruzada en paralelo con intervalos de confianza bootstrap.
+        - tune: búsqueda de hiperparámetros con successive halving dentro de un presupuesto de tiempo.
+        - materialize: precalcula la probabilidad de todas las combinaciones de features.
+        - export-flat: convierte el bosque entrenado a arrays planos mapeables en memoria.
+        - serve: servicio HTTP local de scoring con micro-batching.
+        - loadgen: genera carga contra el servicio y compara con/sin micro-batching.
+        - train-ooc: preprocesa y entrena por bloques datasets que no caben en memoria.
+        - update: añade árboles al modelo con datos nuevos, sin re-entrenar todo.
+        - bench: suite de benchmarks sobre datos sintéticos, comparada con una línea base.
+        - bench-spark: escalado de Spark con los núcleos frente a la puntuación en un proceso.
+    """
+    parser = argparse.ArgumentParser(prog="tasa_churn", description="Herramientas de predicción de churn.")
+    parser.add_argument("--trace", action="store_true",
+                        help="Mide tiempo, CPU y memoria de cada etapa y guarda la traza en reports/traces.")
+    parser.add_argument("--profile-stage", default=None, help="Guarda un perfil cProfile de esta etapa.")
+    subparsers = parser.add_subparsers(dest="command")
+
+    score = subparsers.add_parser("score", help="Puntúa un CSV de clientes por bloques.")
+    score.add_argument("input", help="CSV de entrada con los datos de los clientes.")
+    score.add_argument("output", help="CSV de salida con las probabilidades de churn.")
+    score.add_argument("--chunk-size", type=int, default=100_000, help="Filas por bloque (por defecto 100000).")
+    score.add_argument("--id-col", default="CustomerID", help="Columna identificadora a copiar en la salida.")
+    score.add_argument("--rejects", default=None,
+                       help="CSV para las filas inválidas (por defecto <output>.rejects.csv).")
+    score.add_argument("--lookup", action="store_true",
+                       help="Usa la tabla precalculada (python -m tasa_churn materialize) en lugar del modelo.")
+    score.add_argument("--reasons", type=int, default=0,
+                       help="Añade los K motivos principales de cada cliente (contribución por feature).")
+    score.add_argument("--no-drift", action="store_true",
+                       help="No calcula el informe de drift (<output>.drift.json).")
+
+    score_spark = subparsers.add_parser("score-spark", help="Puntúa un CSV con Spark (requiere pyspark).")
+    score_spark.add_argument("input", help="CSV de entrada con los datos de los clientes.")
+    score_spark.add_argument("output", help="Directorio Parquet de salida.")
+    score_spark.add_argument("--master", default="local[*]", help="Master de Spark (por defecto local[*]).")
+    score_spark.add_argument("--id-col", default="CustomerID", help="Columna identificadora a copiar en la salida.")
+    score_spark.add_argument("--partition-by", default="churn_prediction",
+                             help="Columnas de partición separadas por comas ('' para no particionar).")
+
+    compare = subparsers.add_parser("compare", help="Entrena y compara modelos candidatos en paralelo.")
+    compare.add_argument("--data", default="customer_churn_dataset-training-master.csv",
+                         help="CSV de entrenamiento en data/raw.")
+    compare.add_argument("--models", default=None,
+                         help="Candidatos separados por comas (por defecto todos los de CANDIDATE_MODELS).")
+    compare.add_argument("--workers", type=int, default=None, help="Número de procesos (por defecto, núcleos).")
+
+    cv = subparsers.add_parser("cv", help="Validación cruzada de los candidatos con intervalos bootstrap.")
+    cv.add_argument("--data", default="customer_churn_dataset-training-master.csv",
+                    help="CSV de entrenamiento en data/raw (se usa su parte de train).")
+    cv.add_argument("--models", default=None,
+                    help="Candidatos separados por comas (por defecto todos los de CANDIDATE_MODELS).")
+    cv.add_argument("--folds", type=int, default=5, help="Número de folds (por defecto 5).")
+    cv.add_argument("--bootstrap", type=int, default=1000, help="Remuestras bootstrap (por defecto 1000).")
+    cv.add_argument("--workers", type=int, default=None, help="Número de procesos (por defecto, núcleos).")
+
+    tune = subparsers.add_parser("tune", help="Busca hiperparámetros con successive halving y guarda la ganadora.")
+    tune.add_argument("--data", default="customer_churn_dataset-training-master.csv",
+                      help="CSV de entrenamiento en data/raw.")
+    tune.add_argument("--budget", type=float, default=600.0, help="Presupuesto en segundos (por defecto 600).")
+    tune.add_argument("--configs", type=int, default=27, help="Configuraciones iniciales (por defecto 27).")
+    tune.add_argument("--eta", type=int, default=3,
+                      help="En cada ronda sigue 1/eta de las configuraciones (por defecto 3).")
+    tune.add_argument("--max-trees", type=int, default=300, help="Árboles de la última ronda y del modelo final.")
+    tune.add_argument("--families", default=None,
+                      help="Familias separadas por comas (por defecto todas las de SEARCH_SPACE instaladas; "
+                           "al guardar, solo RandomForest y ExtraTrees).")
+    tune.add_argument("--workers", type=int, default=None, help="Número de procesos (por defecto, núcleos).")
+    tune.add_argument("--no-save", action="store_true", help="No sustituye models/RandomForest.joblib.")
+
+    materialize = subparsers.add_parser("materialize",
+                                        help="Precalcula el modelo sobre toda la rejilla de features (uint8).")
+    materialize.add_argument("--data", default="customer_churn_dataset-training-master.csv",
+                             help="CSV de entrenamiento en data/raw, para validar con su split de test.")
+    materialize.add_argument("--no-validate", action="store_true", help="No valida contra predict_proba.")
+
+    export_flat = subparsers.add_parser("export-flat", help="Exporta el bosque a arrays planos (.npy).")
+    export_flat.add_argument("--output", default=None,
+                             help="Directorio de salida (por defecto models/<modelo>.flat).")
+
+    serve = subparsers.add_parser("serve", help="Servicio HTTP local de scoring con micro-batching.")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--max-batch-size", type=int, default=256, help="Clientes máximos por batch.")
+    serve.add_argument("--max-wait-ms", type=float, default=5.0, help="Espera máxima para completar un batch.")
+    serve.add_argument("--lookup", action="store_true", help="Puntúa con la tabla precalculada.")
+    serve.add_argument("--workers", type=int, default=0,
+                       help="Procesos de scoring con modelo compartido y recarga en caliente (0 = un proceso).")
+    serve.add_argument("--reload-interval", type=float, default=2.0,
+                       help="Segundos entre comprobaciones de modelo nuevo (con --workers).")
+
+    loadgen = subparsers.add_parser("loadgen", help="Compara el throughput con y sin micro-batching.")
+    loadgen.add_argument("--requests", type=int, default=2000)
+    loadgen.add_argument("--concurrency", type=int, default=64)
+    loadgen.add_argument("--max-batch-size", type=int, default=256)
+    loadgen.add_argument("--max-wait-ms", type=float, default=5.0)
+
+    train_ooc = subparsers.add_parser("train-ooc", help="Preprocesa y entrena por bloques (fuera de memoria).")
+    train_ooc.add_argument("data", help="CSV de entrenamiento (relativo a data/raw o ruta absoluta).")
+    train_ooc.add_argument("--chunk-size", type=int, default=500_000, help="Filas por bloque de lectura.")
+    train_ooc.add_argument("--train-chunk-rows", type=int, default=1_000_000,
+                           help="Filas por bloque de entrenamiento (acota la memoria del ajuste).")
+    train_ooc.add_argument("--dedup-index", default=None,
+                           help="Directorio del índice de duplicados persistente (p.ej. data/processed/dedup_index).")
+    train_ooc.add_argument("--dedup-key", default=None, help="Deduplicar por esta columna (p.ej. CustomerID).")
+    train_ooc.add_argument("--materialize", action="store_true",
+                           help="Precalcula y valida la tabla de probabilidades al terminar.")
+
+    update = subparsers.add_parser("update", help="Actualiza el modelo con un lote de datos nuevos.")
+    update.add_argument("data", help="CSV con las filas nuevas (incluida la columna Churn).")
+    update.add_argument("--trees", type=int, default=20, help="Árboles nuevos a añadir (por defecto 20).")
+    update.add_argument("--max-trees", type=int, default=None,
+                        help="Tamaño máximo del bosque; se retiran los árboles más antiguos.")
+    update.add_argument("--dedup-index", default=None,
+                        help="Directorio del índice de duplicados persistente (p.ej. data/processed/dedup_index).")
+    update.add_argument("--dedup-key", default=None, help="Deduplicar por esta columna (p.ej. CustomerID).")
+
+    bench = subparsers.add_parser("bench", help="Benchmarks del pipeline con datos sintéticos.")
+    bench.add_argument("--rows", type=int, default=10_000, help="Filas sintéticas (10k a 50M).")
+    bench.add_argument("--seed", type=int, default=0)
+    bench.add_argument("--cases", default=None, help="Casos separados por comas (por defecto todos).")
+    bench.add_argument("--tolerance", type=float, default=0.25, help="Empeoramiento tolerado (0.25 = 25%%).")
+    bench.add_argument("--update-baseline", action="store_true", help="Guarda estos resultados como línea base.")
+
+    bench_spark = subparsers.add_parser("bench-spark", help="Escalado de Spark frente a score_csv.")
+    bench_spark.add_argument("--rows", type=int, default=1_000_000, help="Filas sintéticas.")
+    bench_spark.add_argument("--cores", default=None, help="Núcleos a probar, separados por comas (p.ej. 1,2,4).")
+    bench_spark.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args(argv)
+
+    if args.trace or args.profile_stage:
+        from tasa_churn.utils.instrument import enable_tracing
+        enable_tracing(profile_stage=args.profile_stage)
+
+    if args.command == "score":
+        from tasa_churn.models.predict_model import score_csv
+        model = _lookup_model() if args.lookup else None
+        score_csv(args.input, args.output, model=model, chunk_size=args.chunk_size, id_col=args.id_col,
+                  reject_path=args.rejects, reasons=args.reasons, monitor_drift=not args.no_drift)
+    elif args.command == "score-spark":
+        from tasa_churn.models.spark_scoring import score_csv_spark
+        partition_by = tuple(c for c in args.partition_by.split(",") if c)
+        score_csv_spark(args.input, args.output, master=args.master, id_col=args.id_col, partition_by=partition_by)
+    elif args.command == "compare":
+        from tasa_churn.data.make_dataset import load_data
+        from tasa_churn.features.build_features import preprocess_data
+        from tasa_churn.models.train_model import CANDIDATE_MODELS, train_models_parallel
+
+        candidates = CANDIDATE_MODELS
+        if args.models:
+            candidates = {name: CANDIDATE_MODELS[name] for name in args.models.split(",")}
+        df = load_data(args.data)
+        # Como cv: los candidatos no sustituyen al modelo de producción, así que tampoco sus artefactos
+        X_train, X_test, y_train, y_test = preprocess_data(df, target_col='Churn', save_artifacts=False, use_cache=True)
+        train_models_parallel(X_train, y_train, X_test, y_test, candidates=candidates, n_workers=args.workers)
+    elif args.command == "cv":
+        from tasa_churn.data.make_dataset import load_data
+        from tasa_churn.features.build_features import preprocess_data
+        from tasa_churn.models.cross_validation import cross_validate_models
+        from tasa_churn.models.train_model import CANDIDATE_MODELS
+
+        candidates = CANDIDATE_MODELS
+        if args.models:
+            candidates = {name: CANDIDATE_MODELS[name] for name in args.models.split(",")}
+        df = load_data(args.data)
+        X_train, _, y_train, _ = preprocess_data(df, target_col='Churn', save_artifacts=False, use_cache=True)
+        cross_validate_models(X_train, y_train, candidates=candidates, n_splits=args.folds,
+                              n_workers=args.workers, n_bootstrap=args.bootstrap)
+    elif args.command == "tune":
+        from tasa_churn.data.make_dataset import load_data
+        from tasa_churn.features.build_features import preprocess_data
+        from tasa_churn.models.tuning import tune_models
+
+        df = load_data(args.data)
+        X_train, X_test, y_train, y_test = preprocess_data(df, target_col='Churn', save_artifacts=False,
+                                                           use_cache=True)
+        families = args.families.split(",") if args.families else None
+        # Los artefactos se publican junto con la ganadora, cuando ya se ha re-entrenado
+        # (la segunda llamada es un acierto de la caché que solo escribe los artefactos)
+        tune_models(X_train, y_train, X_test, y_test, n_configs=args.configs, budget_seconds=args.budget,
+                    eta=args.eta, max_trees=args.max_trees, families=families, n_workers=args.workers,
+                    save=not args.no_save,
+                    publish_artifacts=lambda: preprocess_data(df, target_col='Churn', save_artifacts=True,
+                                                              use_cache=True))
+    elif args.command == "materialize":
+        from tasa_churn.models.lookup_table import materialize as build_lookup
+        X_test = None
+        if not args.no_validate:
+            from tasa_churn.data.make_dataset import load_data
+            from tasa_churn.features.build_features import preprocess_data
+            df = load_data(args.data)
+            _, X_test, _, _ = preprocess_data(df, target_col='Churn', save_artifacts=False, use_cache=True)
+        build_lookup(X_test=X_test)
+    elif args.command == "export-flat":
+        from pathlib import Path
+        from tasa_churn.models.flat_forest import export_forest
+        from tasa_churn.utils.artifacts import artifact_store
+
+        model_path = artifact_store.paths["model"]
+        output = Path(args.output) if args.output else model_path.with_suffix(".flat")
+        export_forest(artifact_store.model, output)
+    elif args.command == "serve":
+        if args.workers:
+            if args.lookup:
+                raise SystemExit("--lookup no está disponible con --workers")
+            from tasa_churn.serving.workers import serve_workers
+            serve_workers(args.workers, args.host, args.port, args.max_batch_size, args.max_wait_ms,
+                          args.reload_interval)
+        else:
+            from tasa_churn.serving.server import serve as run_server
+            run_server(args.host, args.port, args.max_batch_size, args.max_wait_ms,
+                       model=_lookup_model() if args.lookup else None)
+    elif args.command == "loadgen":
+        from tasa_churn.serving.loadgen import compare_batching
+        compare_batching(args.requests, args.concurrency, args.max_batch_size, args.max_wait_ms)
+    elif args.command == "train-ooc":
+        from tasa_churn.features.out_of_core import preprocess_out_of_core
+        from tasa_churn.models.predict_model import evaluate_models
+        from tasa_churn.models.train_model import train_models_out_of_core
+        from tasa_churn.utils.artifacts import artifact_store
+
+        X_train, X_test, y_train, y_test = preprocess_out_of_core(args.data, chunk_size=args.chunk_size,
+                                                                  dedup=_dedup_index(args))
+        models = train_models_out_of_core(X_train, y_train, artifact_store.columns,
+                                          chunk_rows=args.train_chunk_rows)
+        evaluate_models(models, X_test, y_test, chunk_size=args.chunk_size)
+        if args.materialize:
+            from tasa_churn.models.lookup_table import materialize as build_lookup
+            build_lookup(X_test=X_test)
+    elif args.command == "update":
+        from tasa_churn.data.make_dataset import load_data
+        from tasa_churn.models.incremental import update_model
+        df = load_data(args.data, use_cache=False)
+        update_model(df, n_new_trees=args.trees, max_trees=args.max_trees, dedup=_dedup_index(args))
+    elif args.command == "bench":
+        from tasa_churn.benchmarks.suite import run_benchmarks
+        cases = args.cases.split(",") if args.cases else None
+        _, regressions = run_benchmarks(args.rows, args.seed, cases, args.update_baseline, args.tolerance)
+        if regressions:
+            raise SystemExit(1)
+    elif args.command == "bench-spark":
+        from tasa_churn.benchmarks.spark_scaling import benchmark_spark
+        cores = [int(c) for c in args.cores.split(",")] if args.cores else None
+        benchmark_spark(args.rows, cores, args.seed)
+    else:
+        parser.print_help()
+
+
+def _lookup_model():
+    from tasa_churn.models.lookup_table import load_lookup
+    model = load_lookup()
+    if model is None:
+        raise SystemExit("No hay tabla para el modelo actual: ejecuta 'python -m tasa_churn materialize'.")
+    return model
+
+
+def _dedup_index(args):
+    if args.dedup_index is None:
+        return None
+    from pathlib import Path
+    from tasa_churn.data.dedup import DedupIndex
+    return DedupIndex(Path(args.dedup_index), key_col=args.dedup_key)
+
+
+if __name__ == "__main__":
+    main()
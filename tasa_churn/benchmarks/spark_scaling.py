@@ -0,0 +1,63 @@
+# tasa_churn/benchmarks/spark_scaling.py
+import json
+import os
+import shutil
+import time
+
+from tasa_churn.benchmarks.suite import BENCHMARKS_DIR, WORK_DIR
+
+
+def benchmark_spark(n_rows=1_000_000, cores=None, seed=0):
+    """
+    Compara la puntuación por lotes en un solo proceso (score_csv) con Spark en local[n]
+    para cada n de 'cores' (por defecto 1, 2, 4, ... hasta los núcleos disponibles).
+        - Mismo CSV sintético y mismo modelo (el de la caché de artefactos) en todos los casos.
+        - Cada n usa una SparkSession nueva; un primer trabajo pequeño calienta la JVM y los
+          workers de Python para que el tiempo medido sea solo el de la puntuación.
+        - Guarda los resultados en reports/benchmarks/spark-<filas>-<fecha>.json.
+    Devuelve la lista de resultados (filas/s, aceleración y eficiencia frente a score_csv).
+    """
+    from tasa_churn.data.synthetic import write_synthetic_csv
+    from tasa_churn.models.predict_model import score_csv
+    from tasa_churn.models.spark_scoring import score_csv_spark, spark_session
+
+    if cores is None:
+        cpu = os.cpu_count() or 1
+        cores = sorted({min(2 ** i, cpu) for i in range(cpu.bit_length() + 1)})
+
+    base = WORK_DIR / f"spark-{n_rows}-seed-{seed}"
+    base.mkdir(parents=True, exist_ok=True)
+    csv = base / "synthetic.csv"
+    if not csv.exists():
+        write_synthetic_csv(csv, n_rows, seed)
+    warmup = base / "warmup.csv"
+    if not warmup.exists():
+        write_synthetic_csv(warmup, 1_000, seed)
+
+    print(f"--> Escalado de Spark con {n_rows} filas ({', '.join(map(str, cores))} núcleos)...")
+    single = score_csv(csv, base / "scores.csv")
+    results = [{"backend": "score_csv", "cores": 1, "seconds": single["seconds"],
+                "rows_per_sec": single["rows_per_sec"], "speedup": 1.0, "efficiency": 1.0}]
+
+    for n in cores:
+        spark = spark_session(f"local[{n}]", **{"spark.sql.shuffle.partitions": str(n)})
+        try:
+            score_csv_spark(warmup, base / "warmup.parquet", spark=spark)
+            stats = score_csv_spark(csv, base / "scores.parquet", spark=spark)
+        finally:
+            spark.stop()
+        speedup = stats["rows_per_sec"] / single["rows_per_sec"]
+        results.append({"backend": "spark", "cores": n, "seconds": stats["seconds"],
+                        "rows_per_sec": stats["rows_per_sec"], "speedup": speedup, "efficiency": speedup / n})
+    shutil.rmtree(base / "warmup.parquet", ignore_errors=True)
+
+    print(f"    {'backend':<10} {'núcleos':>7} {'filas/s':>12} {'aceleración':>12} {'eficiencia':>11}")
+    for r in results:
+        print(f"    {r['backend']:<10} {r['cores']:>7} {r['rows_per_sec']:>12,.0f} "
+              f"{r['speedup']:>11.2f}x {r['efficiency']:>10.0%}")
+
+    BENCHMARKS_DIR.mkdir(parents=True, exist_ok=True)
+    out_path = BENCHMARKS_DIR / f"spark-{n_rows}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out_path.write_text(json.dumps({"rows": n_rows, "cpu_count": os.cpu_count(), "results": results}, indent=2))
+    print(f"    Resultados guardados en {out_path}")
+    return results
@@ -0,0 +1,75 @@
+# tasa_churn/benchmarks/startup.py
+import json
+import os
+import subprocess
+import sys
+import time
+
+from tasa_churn.utils.paths import PROJECT_DIR
+
+MAIN_SCRIPT = PROJECT_DIR / "main.py"
+
+# Textos con los que main.py pide un dato o muestra el resultado
+PROMPTS = (b"Escribe una opci", b"Introduce un n")
+RESULTS = (b"RIESGO DE CHURN ALTO", b"Cliente estable")
+
+
+def default_answers(artifacts_dir):
+    """Una respuesta válida por pregunta (primera opción o un número), en el orden de schema.json."""
+    schema = json.loads((artifacts_dir / "schema.json").read_text())
+    return [schema["categorical"][col]["options"][0] if col in schema["categorical"] else "1"
+            for col in schema["columns"]]
+
+
+def measure_startup(answers=None, models_dir=None, think_ms=0.0, timeout=60.0):
+    """
+    Arranca 'python main.py' con un modelo ya entrenado y mide:
+        - first_prompt_seconds: desde el arranque hasta la primera pregunta.
+        - first_prediction_seconds: hasta que se muestra la primera predicción.
+    Cada respuesta se envía al ver su pregunta, tras esperar think_ms (simula al usuario).
+    models_dir redirige el modelo con TASA_CHURN_MODELS_DIR.
+    """
+    env = dict(os.environ)
+    if models_dir is not None:
+        env["TASA_CHURN_MODELS_DIR"] = str(models_dir)
+    if answers is None:
+        from tasa_churn.utils.paths import MODELS_DIR
+        base = MODELS_DIR if models_dir is None else models_dir
+        answers = default_answers(base / "artifacts")
+    pending = list(answers) + ["n"]
+
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-u", "-W", "ignore", str(MAIN_SCRIPT)], cwd=PROJECT_DIR, env=env,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    first_prompt = first_prediction = None
+    output = b""
+    seen = 0
+    try:
+        while first_prediction is None:
+            if time.perf_counter() - start > timeout:
+                raise TimeoutError("main.py no respondió a tiempo")
+            data = os.read(proc.stdout.fileno(), 65536)
+            if not data:
+                break
+            output += data
+            now = time.perf_counter() - start
+            if any(r in output for r in RESULTS):
+                first_prediction = now
+                break
+            prompts = sum(output.count(p) for p in PROMPTS)
+            if prompts and first_prompt is None:
+                first_prompt = now
+            while seen < prompts and pending:
+                time.sleep(think_ms / 1000)
+                proc.stdin.write((pending.pop(0) + "\n").encode())
+                proc.stdin.flush()
+                seen += 1
+        proc.communicate(("\n".join(pending) + "\n").encode(), timeout=timeout)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+    if first_prediction is None:
+        raise RuntimeError(f"main.py terminó sin predecir:\n{output.decode(errors='replace')[-500:]}")
+    return {"first_prompt_seconds": first_prompt, "first_prediction_seconds": first_prediction}
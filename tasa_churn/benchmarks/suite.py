@@ -0,0 +1,261 @@
+# tasa_churn/benchmarks/suite.py
+import json
+import os
+import platform
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from tasa_churn.utils.artifacts import MODEL_NAME
+from tasa_churn.utils.paths import DATA_DIR, REPORTS_DIR
+
+# Los datos sintéticos y los modelos de benchmark van aparte para no pisar los reales
+WORK_DIR = DATA_DIR / "interim" / "benchmarks"
+BENCHMARKS_DIR = REPORTS_DIR / "benchmarks"
+
+# Métricas que cuentan como regresión si suben / si bajan
+LOWER_IS_BETTER = ("wall_seconds", "peak_rss_mb", "p50_ms", "p99_ms",
+                   "first_prompt_seconds", "first_prediction_seconds")
+HIGHER_IS_BETTER = ("rows_per_sec",)
+
+
+def _timed(fn, *args, **kwargs):
+    start, cpu = time.perf_counter(), time.process_time()
+    result = fn(*args, **kwargs)
+    return result, {"wall_seconds": time.perf_counter() - start, "cpu_seconds": time.process_time() - cpu}
+
+
+# --- Casos (se ejecutan cada uno en un proceso nuevo) --------------------------
+
+def case_load_csv(ws):
+    from tasa_churn.data.make_dataset import load_data
+    df, stats = _timed(load_data, ws["csv"], use_cache=False)
+    return {**stats, "rows": len(df)}
+
+
+def case_load_cached(ws):
+    from tasa_churn.data.make_dataset import load_data
+    load_data(ws["csv"], cache_dir=ws["cache"])  # construye la caché si no existe
+    df, stats = _timed(load_data, ws["csv"], cache_dir=ws["cache"])
+    return {**stats, "rows": len(df)}
+
+
+def case_preprocess(ws):
+    from tasa_churn.data.make_dataset import load_data
+    from tasa_churn.features.build_features import preprocess_data
+    df = load_data(ws["csv"], cache_dir=ws["cache"])
+    _, stats = _timed(preprocess_data, df, target_col='Churn', save_artifacts=True)
+    return {**stats, "rows": len(df)}
+
+
+def case_train(ws):
+    from tasa_churn.data.make_dataset import load_data
+    from tasa_churn.features.build_features import preprocess_data
+    from tasa_churn.models.train_model import train_models
+    df = load_data(ws["csv"], cache_dir=ws["cache"])
+    X_train, X_test, y_train, y_test = preprocess_data(df, target_col='Churn', save_artifacts=True,
+                                                       use_cache=True, cache_dir=ws["cache"])
+    _, stats = _timed(train_models, X_train, y_train)
+    return {**stats, "rows": len(X_train)}
+
+
+def case_single_row(ws, n_iter=500):
+    import numpy as np
+    from tasa_churn.data.synthetic import synthetic_chunks
+    from tasa_churn.features.build_features import process_input
+    from tasa_churn.utils.artifacts import artifact_store
+
+    model = artifact_store.model
+    rows = next(synthetic_chunks(n_iter, seed=1)).to_dict("records")
+    model.predict_proba(process_input(rows[0]))  # calentamiento
+
+    latencies = np.empty(n_iter)
+    start = time.perf_counter()
+    for i, row in enumerate(rows):
+        t = time.perf_counter()
+        model.predict_proba(process_input(row))
+        latencies[i] = time.perf_counter() - t
+    wall = time.perf_counter() - start
+    return {
+        "wall_seconds": wall,
+        "rows": n_iter,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+    }
+
+
+def case_batch_scoring(ws):
+    from tasa_churn.models.predict_model import score_csv
+    stats = score_csv(ws["csv"], ws["dir"] / "scores.csv")
+    return {"wall_seconds": stats["seconds"], "rows": stats["rows"], "rows_per_sec": stats["rows_per_sec"]}
+
+
+def case_reason_codes(ws, n_rows=100_000):
+    """Motivos por cliente (top-3) frente a predict_proba sobre las mismas filas."""
+    from tasa_churn.data.synthetic import synthetic_chunks
+    from tasa_churn.features.transformer import FeatureTransformer
+    from tasa_churn.models.explain import ReasonExplainer
+    from tasa_churn.utils.artifacts import artifact_store
+
+    model = artifact_store.model
+    X = FeatureTransformer.from_artifacts(artifact_store).transform_batch(next(synthetic_chunks(n_rows, seed=2)))
+    explainer = ReasonExplainer.from_model(model, artifact_store.columns)
+    _, plain = _timed(model.predict_proba, X)
+    _, stats = _timed(explainer.top_reasons, X, 3)
+    return {**stats, "rows": n_rows, "rows_per_sec": n_rows / stats["wall_seconds"],
+            "predict_proba_rows_per_sec": n_rows / plain["wall_seconds"]}
+
+
+def case_startup(ws, think_ms=200.0):
+    """Arranque del CLI interactivo (main.py) con un usuario que tarda think_ms por respuesta."""
+    from tasa_churn.benchmarks.startup import measure_startup
+    stats = measure_startup(models_dir=ws["models"], think_ms=think_ms)
+    return {"wall_seconds": stats["first_prediction_seconds"], **stats}
+
+
+# Orden de ejecución: los casos posteriores usan los artefactos y el modelo de los anteriores
+CASES = {
+    "load_csv": case_load_csv,
+    "load_cached": case_load_cached,
+    "preprocess": case_preprocess,
+    "train": case_train,
+    "single_row": case_single_row,
+    "batch_scoring": case_batch_scoring,
+    "reason_codes": case_reason_codes,
+    "startup": case_startup,
+}
+
+# Casos que puntúan con el modelo entrenado por "train"
+NEEDS_MODEL = ("single_row", "batch_scoring", "reason_codes", "startup")
+
+
+def _run_case(name, ws):
+    from tasa_churn.utils.memory import peak_memory_mb
+    result = CASES[name](ws)
+    result["peak_rss_mb"] = peak_memory_mb()
+    return result
+
+
+def _run_isolated(name, ws):
+    """Ejecuta un caso en un intérprete nuevo: el pico de RSS es solo de ese caso."""
+    previous = os.environ.get("TASA_CHURN_MODELS_DIR")
+    os.environ["TASA_CHURN_MODELS_DIR"] = str(ws["models"])
+    try:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            return pool.submit(_run_case, name, ws).result()
+    finally:
+        if previous is None:
+            os.environ.pop("TASA_CHURN_MODELS_DIR", None)
+        else:
+            os.environ["TASA_CHURN_MODELS_DIR"] = previous
+
+
+# --- Ejecución, guardado y comparación -----------------------------------------
+
+def prepare_workspace(n_rows, seed=0, reset=True):
+    """
+    Genera (o reutiliza) el CSV sintético. Con reset deja limpias las cachés y modelos del
+    benchmark; sin reset se reutilizan los de la ejecución anterior.
+    """
+    from tasa_churn.data.synthetic import write_synthetic_csv
+
+    base = WORK_DIR / f"rows-{n_rows}-seed-{seed}"
+    ws = {"dir": base, "csv": base / "synthetic.csv", "cache": base / "cache", "models": base / "models"}
+    base.mkdir(parents=True, exist_ok=True)
+    if not ws["csv"].exists():
+        write_synthetic_csv(ws["csv"], n_rows, seed)
+    for key in ("cache", "models"):
+        if reset:
+            shutil.rmtree(ws[key], ignore_errors=True)
+        ws[key].mkdir(parents=True, exist_ok=True)
+    (ws["models"] / "artifacts").mkdir(exist_ok=True)
+    return ws
+
+
+def compare_to_baseline(results, baseline, tolerance=0.25):
+    """
+    Compara los resultados con una línea base.
+    Devuelve una lista de regresiones (caso, métrica, base, actual, cambio relativo)
+    cuando una métrica empeora más que 'tolerance' (0.25 = 25%).
+    """
+    regressions = []
+    for case, metrics in results["cases"].items():
+        base_metrics = baseline.get("cases", {}).get(case)
+        if not base_metrics:
+            continue
+        for metric, value in metrics.items():
+            base = base_metrics.get(metric)
+            if not base or value is None:
+                continue
+            change = (value - base) / base
+            if (metric in LOWER_IS_BETTER and change > tolerance) or \
+               (metric in HIGHER_IS_BETTER and change < -tolerance):
+                regressions.append({"case": case, "metric": metric, "baseline": base,
+                                    "current": value, "change": change})
+    return regressions
+
+
+def run_benchmarks(n_rows=10_000, seed=0, cases=None, update_baseline=False, tolerance=0.25):
+    """
+    Ejecuta la suite de benchmarks sobre n_rows filas sintéticas.
+        - Cada caso corre en un proceso nuevo y mide tiempo de pared y pico de RSS.
+        - Guarda los resultados en reports/benchmarks/bench-<filas>-<fecha>.json.
+        - Los compara con reports/benchmarks/baseline-<filas>.json (si existe) y
+          devuelve (resultados, regresiones). update_baseline=True la reemplaza.
+          La línea base es propia de cada máquina (no se versiona): si su meta indica
+          otra máquina o le faltan casos, se avisa.
+    """
+    cases = list(CASES) if cases is None else cases
+    # Sin "train" se reutiliza el modelo del espacio de trabajo (o se entrena una vez, sin medirlo)
+    ws = prepare_workspace(n_rows, seed, reset="train" in cases)
+
+    print(f"--> Benchmarks con {n_rows} filas sintéticas...")
+    if "train" not in cases and any(name in NEEDS_MODEL for name in cases) and \
+            not (ws["models"] / MODEL_NAME).exists():
+        print("    No hay modelo de benchmark: se entrena antes (no se mide).")
+        _run_isolated("train", ws)
+    results = {
+        "meta": {
+            "rows": n_rows,
+            "seed": seed,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "cases": {},
+    }
+    for name in cases:
+        result = _run_isolated(name, ws)
+        results["cases"][name] = result
+        print(f"    {name:<15} {result['wall_seconds']:8.3f}s  pico RSS {result['peak_rss_mb'] or 0:7.1f} MB")
+
+    BENCHMARKS_DIR.mkdir(parents=True, exist_ok=True)
+    out_path = BENCHMARKS_DIR / f"bench-{n_rows}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out_path.write_text(json.dumps(results, indent=2))
+    print(f"    Resultados guardados en {out_path}")
+
+    baseline_path = BENCHMARKS_DIR / f"baseline-{n_rows}.json"
+    regressions = []
+    if baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text())
+        machine = {key: results["meta"][key] for key in ("platform", "cpu_count", "python")}
+        other = {key: baseline.get("meta", {}).get(key) for key in machine}
+        if other != machine:
+            print(f"    AVISO: {baseline_path.name} es de otra máquina ({other}): la comparación no es fiable "
+                  "(--update-baseline para regenerarla)")
+        missing = [name for name in cases if name not in baseline.get("cases", {})]
+        if missing:
+            print(f"    Sin línea base para: {', '.join(missing)}")
+        regressions = compare_to_baseline(results, baseline, tolerance)
+        for r in regressions:
+            print(f"    REGRESIÓN {r['case']}.{r['metric']}: {r['baseline']:.4g} -> {r['current']:.4g} "
+                  f"({r['change']:+.0%})")
+        if not regressions:
+            print(f"    Sin regresiones respecto a {baseline_path.name} (tolerancia {tolerance:.0%})")
+    if update_baseline or not baseline_path.exists():
+        shutil.copyfile(out_path, baseline_path)
+        print(f"    Línea base actualizada: {baseline_path}")
+
+    return results, regressions
@@ -0,0 +1,121 @@
+# tasa_churn/data/dedup.py
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from tasa_churn.utils.paths import PROCESSED_DATA_DIR
+
+DEDUP_DIR = PROCESSED_DATA_DIR / "dedup_index"
+
+
+def row_hashes(chunk, key_col=None):
+    """
+    Hash uint64 de cada fila (pandas.util.hash_pandas_object, sin el índice).
+    key_col: si se indica (p.ej. 'CustomerID'), solo cuenta esa columna.
+    Enteros de cualquier ancho y texto/'category' dan el mismo hash; float frente a entero no,
+    así que conviene leer siempre con el mismo esquema (RAW_SCHEMA).
+    """
+    values = chunk[key_col] if key_col is not None else chunk
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def _contains(sorted_arrays, hashes):
+    """Máscara de los hashes que ya están en alguno de los arrays ordenados."""
+    found = np.zeros(len(hashes), dtype=bool)
+    for arr in sorted_arrays:
+        if len(arr) == 0:
+            continue
+        pos = np.searchsorted(arr, hashes)
+        pos[pos == len(arr)] = len(arr) - 1
+        found |= arr[pos] == hashes
+    return found
+
+
+class DedupIndex:
+    """
+    Índice persistente de filas ya vistas, para eliminar duplicados entre entregas de datos.
+        - Guarda hashes uint64 ordenados en segmentos .npy (8 bytes por fila única).
+        - Los segmentos se abren con mmap: buscar un bloque cuesta O(filas * log(total))
+          sin cargar el índice en memoria.
+        - filter() marca las filas nuevas de cada bloque; commit() escribe lo añadido
+          como un segmento nuevo (atómico). Cada ejecución solo escribe sus datos nuevos.
+        - Con más de max_segments segmentos, se fusionan en uno.
+        - key_col: deduplicar por cliente (p.ej. 'CustomerID') en vez de por fila completa.
+    """
+
+    def __init__(self, path=DEDUP_DIR, key_col=None, max_segments=8):
+        self.path = path
+        self.key_col = key_col
+        self.max_segments = max_segments
+        self._pending = []
+        self._load()
+
+    def _load(self):
+        meta_path = self.path / "meta.json"
+        self.meta = json.loads(meta_path.read_text()) if meta_path.exists() else {"segments": [], "rows": 0}
+        if self.meta.get("key_col", self.key_col) != self.key_col:
+            raise ValueError(f"El índice {self.path} se creó con key_col={self.meta['key_col']!r}")
+        self.segments = [np.load(self.path / name, mmap_mode="r") for name in self.meta["segments"]]
+
+    def __len__(self):
+        return self.meta["rows"] + sum(len(p) for p in self._pending)
+
+    def filter(self, chunk):
+        """
+        Devuelve una máscara con las filas de chunk que no se habían visto
+        (ni en el índice, ni antes en esta ejecución, ni antes dentro del bloque)
+        y las apunta como vistas. Se guardan en disco al llamar a commit().
+        """
+        hashes = row_hashes(chunk, self.key_col)
+        # Primera aparición de cada hash dentro del bloque
+        unique, first = np.unique(hashes, return_index=True)
+        new = ~_contains(self.segments + self._pending, unique)
+        keep = np.zeros(len(hashes), dtype=bool)
+        keep[first[new]] = True
+        if new.any():
+            self._pending.append(unique[new])
+            if len(self._pending) > self.max_segments:
+                self._pending = [np.concatenate(self._pending)]
+                self._pending[0].sort()
+        return keep
+
+    def commit(self):
+        """Escribe las filas nuevas como un segmento y, si hay demasiados, los fusiona."""
+        if not self._pending:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        added = np.concatenate(self._pending)
+        added.sort()
+
+        names = list(self.meta["segments"])
+        arrays = self.segments + [added]
+        if len(names) + 1 > self.max_segments:
+            merged = np.concatenate(arrays)
+            merged.sort()
+            names, arrays = [], [merged]
+        else:
+            arrays = [added]
+
+        number = self.meta.get("next_segment", 0)
+        for arr in arrays:
+            name = f"segment-{number:06d}.npy"
+            tmp = self.path / (name + ".tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, arr)
+            os.replace(tmp, self.path / name)
+            names.append(name)
+            number += 1
+
+        meta = {"segments": names, "rows": self.meta["rows"] + len(added),
+                "key_col": self.key_col, "next_segment": number}
+        tmp = self.path / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta, indent=2))
+        os.replace(tmp, self.path / "meta.json")
+
+        # Los segmentos que ya no están en meta.json sobran (tras fusionar)
+        for old in set(self.meta["segments"]) - set(names):
+            (self.path / old).unlink(missing_ok=True)
+        self._pending = []
+        self._load()
@@ -1,17 +1,142 @@
+import hashlib
+import json
+import time
+
 import pandas as pd
-from tasa_churn.utils.paths import RAW_DATA_DIR
+from tasa_churn.utils.instrument import stage
+from tasa_churn.utils.paths import RAW_DATA_DIR, PROCESSED_DATA_DIR
+
+# Esquema explícito del CSV de clientes: enteros pequeños (nullable, por si hay filas vacías)
+# y 'category' para las columnas de texto.
+RAW_SCHEMA = {
+    'CustomerID': 'Int32',
+    'Age': 'Int8',
+    'Gender': 'category',
+    'Tenure': 'Int16',
+    'Usage Frequency': 'Int8',
+    'Support Calls': 'Int8',
+    'Payment Delay': 'Int16',
+    'Subscription Type': 'category',
+    'Contract Length': 'category',
+    'Total Spend': 'float32',
+    'Last Interaction': 'Int16',
+    'Churn': 'Int8',
+}
 
-def load_data(filename="customer_churn_dataset-training-master.csv"):
+def load_data(filename="customer_churn_dataset-training-master.csv", columns=None, use_cache=True,
+              cache_dir=PROCESSED_DATA_DIR):
     """
     Carga el dataset desde la carpeta data/raw.
+        - La primera lectura parsea el CSV con RAW_SCHEMA y guarda una copia columnar
+          (Parquet) en data/processed, asociada al tamaño, fecha y hash del CSV.
+        - Las siguientes lecturas usan la copia y solo leen las columnas pedidas.
+        - columns: lista de columnas a devolver (None = todas).
+        - use_cache: False para leer siempre el CSV (con el mismo esquema).
     """
     file_path = RAW_DATA_DIR / filename
     print(f"--> Cargando datos desde {file_path}...")
-    
+
     try:
-        df = pd.read_csv(file_path)
+        with stage("load_data") as s:
+            if use_cache:
+                df = _load_cached(file_path, columns, cache_dir)
+            else:
+                df = _read_csv(file_path, columns)
+            s.rows = len(df)
         print(f"    Datos cargados. Dimensiones: {df.shape}")
         return df
     except FileNotFoundError:
         print(f"ERROR: No se encontró el archivo {filename} en {RAW_DATA_DIR}")
-        raise
\ No newline at end of file
+        raise
+
+def _read_csv(file_path, columns=None):
+    """Lee el CSV aplicando RAW_SCHEMA a las columnas que existan."""
+    header = pd.read_csv(file_path, nrows=0).columns
+    dtype = {col: kind for col, kind in RAW_SCHEMA.items() if col in header}
+    return pd.read_csv(file_path, dtype=dtype, usecols=columns)
+
+def read_chunks(filename, chunk_size=500_000, columns=None):
+    """
+    Lee el CSV por bloques de chunk_size filas con RAW_SCHEMA (memoria acotada).
+    filename es relativo a data/raw (o una ruta absoluta).
+    Los enteros se parsean con los tipos de NumPy y se convierten después: con chunksize,
+    parsear directamente a Int8/Int16 (nullable) es ~5x más lento.
+    """
+    file_path = RAW_DATA_DIR / filename
+    header = pd.read_csv(file_path, nrows=0).columns
+    dtype = {col: kind for col, kind in RAW_SCHEMA.items() if col in header}
+    text = {col: kind for col, kind in dtype.items() if kind == 'category'}
+    for chunk in pd.read_csv(file_path, dtype=text, usecols=columns, chunksize=chunk_size):
+        yield chunk.astype({col: kind for col, kind in dtype.items() if col in chunk.columns})
+
+def _file_digest(file_path, block_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _default_memory(df):
+    """Memoria aproximada (por columna) que ocuparía df con la inferencia por defecto de read_csv."""
+    memory = {}
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            memory[col] = int(df[col].astype(object).memory_usage(deep=True, index=False))
+        else:
+            memory[col] = 8 * len(df)
+    return memory
+
+def _load_cached(file_path, columns, cache_dir):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("    Aviso: pyarrow no está instalado, se lee el CSV sin caché.")
+        return _read_csv(file_path, columns)
+
+    st = file_path.stat()
+    meta_path = cache_dir / f"{file_path.stem}.cache.json"
+    meta = json.loads(meta_path.read_text()) if meta_path.exists() else None
+
+    if meta is not None and meta['size'] == st.st_size:
+        cache_path = cache_dir / meta['cache_file']
+        fresh = meta['mtime_ns'] == st.st_mtime_ns
+        if not fresh and cache_path.exists() and _file_digest(file_path) == meta['digest']:
+            # El CSV se ha tocado pero el contenido es el mismo
+            meta['mtime_ns'] = st.st_mtime_ns
+            meta_path.write_text(json.dumps(meta, indent=2))
+            fresh = True
+        if fresh and cache_path.exists():
+            start = time.perf_counter()
+            df = pd.read_parquet(cache_path, columns=columns)
+            elapsed = time.perf_counter() - start
+            memory = int(df.memory_usage(deep=True).sum())
+            csv_memory = sum(meta['csv_memory_bytes'][col] for col in df.columns)
+            print(f"    Caché columnar: {elapsed:.2f}s (CSV: {meta['csv_seconds']:.2f}s, "
+                  f"ahorro {meta['csv_seconds'] - elapsed:.2f}s)")
+            print(f"    Memoria: {memory / 1e6:.1f} MB (CSV por defecto: ~{csv_memory / 1e6:.1f} MB)")
+            return df
+
+    # Fallo de caché: parsear el CSV completo con el esquema y guardar la copia columnar
+    start = time.perf_counter()
+    df = _read_csv(file_path)
+    csv_seconds = time.perf_counter() - start
+
+    digest = _file_digest(file_path)
+    cache_file = f"{file_path.stem}-{digest[:12]}.parquet"
+    if meta is not None and meta.get('cache_file') != cache_file:
+        (cache_dir / meta['cache_file']).unlink(missing_ok=True)
+    df.to_parquet(cache_dir / cache_file, index=False)
+
+    meta = {
+        'source': str(file_path),
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'digest': digest,
+        'cache_file': cache_file,
+        'csv_seconds': csv_seconds,
+        'csv_memory_bytes': _default_memory(df),
+    }
+    meta_path.write_text(json.dumps(meta, indent=2))
+    print(f"    CSV parseado en {csv_seconds:.2f}s; copia columnar guardada en {cache_dir / cache_file}")
+
+    return df[columns] if columns is not None else df
@@ -0,0 +1,56 @@
+# tasa_churn/data/synthetic.py
+import numpy as np
+import pandas as pd
+
+# Mismo orden de columnas que customer_churn_dataset-*-master.csv
+COLUMNS = [
+    'CustomerID', 'Age', 'Gender', 'Tenure', 'Usage Frequency', 'Support Calls', 'Payment Delay',
+    'Subscription Type', 'Contract Length', 'Total Spend', 'Last Interaction', 'Churn',
+]
+
+def synthetic_chunks(n_rows, seed=0, chunk_size=1_000_000):
+    """
+    Genera datos sintéticos de churn con el esquema del dataset original, por bloques.
+        - Rangos como los del CSV real (Age 18-65, Tenure 1-60, Support Calls 0-10, ...).
+        - Churn sigue una logística de llamadas a soporte, retraso en pagos, antigüedad
+          y tipo de contrato, para que los modelos tengan algo que aprender.
+        - Cada bloque usa su propia semilla derivada de (seed, nº de bloque): el resultado
+          es reproducible y no hace falta tener todo el dataset en memoria.
+    """
+    for chunk_index, start in enumerate(range(0, n_rows, chunk_size)):
+        n = min(chunk_size, n_rows - start)
+        rng = np.random.default_rng([seed, chunk_index])
+
+        age = rng.integers(18, 66, n)
+        tenure = rng.integers(1, 61, n)
+        support_calls = rng.integers(0, 11, n)
+        payment_delay = rng.integers(0, 31, n)
+        contract = rng.choice(np.array(['Monthly', 'Quarterly', 'Annual']), n, p=[0.2, 0.4, 0.4])
+        subscription = rng.choice(np.array(['Basic', 'Standard', 'Premium']), n)
+        gender = rng.choice(np.array(['Female', 'Male']), n, p=[0.45, 0.55])
+
+        logit = (-3.0 + 0.45 * support_calls + 0.09 * payment_delay - 0.02 * tenure
+                 + 1.5 * (contract == 'Monthly') + 0.02 * (age - 40) + 0.3 * (gender == 'Female'))
+        churn = (rng.random(n) < 1 / (1 + np.exp(-logit))).astype(np.int8)
+
+        yield pd.DataFrame({
+            'CustomerID': np.arange(start + 1, start + n + 1),
+            'Age': age,
+            'Gender': gender,
+            'Tenure': tenure,
+            'Usage Frequency': rng.integers(1, 31, n),
+            'Support Calls': support_calls,
+            'Payment Delay': payment_delay,
+            'Subscription Type': subscription,
+            'Contract Length': contract,
+            'Total Spend': rng.integers(100, 1001, n),
+            'Last Interaction': rng.integers(1, 31, n),
+            'Churn': churn,
+        }, columns=COLUMNS)
+
+def write_synthetic_csv(path, n_rows, seed=0, chunk_size=1_000_000):
+    """Escribe un CSV sintético de n_rows filas por bloques (memoria acotada por chunk_size)."""
+    print(f"--> Generando {n_rows} filas sintéticas en {path}...")
+    for i, chunk in enumerate(synthetic_chunks(n_rows, seed, chunk_size)):
+        chunk.to_csv(path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+    return path
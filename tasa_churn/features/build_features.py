@@ -1,33 +1,73 @@
 # credito/features/build_features.py
+import numpy as np
 import pandas as pd
 import joblib
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder, MinMaxScaler
-from tasa_churn.utils.paths import ARTIFACTS_DIR
+from tasa_churn.features.drift import DRIFT_REFERENCE_NAME, DriftReference
+from tasa_churn.features.preprocess_cache import load_preprocessed, preprocessing_key, save_preprocessed
+from tasa_churn.features.transformer import FEATURE_DTYPE, FeatureTransformer, current_transformer
+from tasa_churn.utils.artifacts import artifact_store, write_schema
+from tasa_churn.utils.instrument import stage
+from tasa_churn.utils.paths import ARTIFACTS_DIR, PROCESSED_DATA_DIR
 
-def preprocess_data(df, target_col='Churn', save_artifacts=True):
+# Columnas que no se usan para entrenar
+DROP_COLUMNS = [
+    # Identificador del cliente
+    'CustomerID',
+    #Un cliente que hace churn → deja de usar el servicio Entonces su frecuencia baja brutalmente El modelo aprende: “frecuencia ≈ 0 ⇒ churn"
+    'Usage Frequency',
+    # Un cliente que churnea → deja de interactuar Last Interaction se vuelve enorme El modelo lo adivina sin esfuerzo
+    'Last Interaction',
+    # El gasto total está muy correlacionado con la duración del contrato (tenure). El modelo puede aprender esta relación en lugar de aprender patrones reales relacionados con el churn.
+    'Total Spend',
+]
+
+# Parámetros de la partición train/test
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+
+# Filas por bloque al escalar (acota la copia temporal en float64)
+_SCALE_BLOCK = 1_000_000
+
+def preprocess_data(df, target_col='Churn', save_artifacts=True, use_cache=False, cache_dir=PROCESSED_DATA_DIR,
+                    dtype=FEATURE_DTYPE):
     """
     Procesa los datos para entrenamiento y guarda los codificadores.
         - Limpieza: elimina duplicados, nulos y columnas irrelevantes.
-        - Codificación: LabelEncoder para Gender, mapeo para Subscription Type y Contract Length.
-        - Escalado: MinMaxScaler para todas las columnas numéricas.
+        - Codificación: LabelEncoder para Gender, mapeo para Subscription Type y Contract Length
+          (códigos int8 hasta el escalado).
+        - Escalado: MinMaxScaler para todas las columnas numéricas. El scaler trabaja en
+          float64, pero el resultado se guarda en una única matriz de dtype (FEATURE_DTYPE,
+          float32 por defecto): los mismos valores que ven los árboles con float64.
+        - use_cache: si es True, guarda/recupera el resultado en cache_dir como arrays .npy
+          mapeables en memoria. La clave cubre el hash de los datos, target_col,
+          DROP_COLUMNS, los parámetros del split y dtype.
     """
     print("--> Preprocesando datos de entrenamiento...")
-    
-    # 1. Limpieza
-    df = df.drop_duplicates()
-    df = df.dropna()
-    
-    # Borrar CustomerID
-    df.drop(columns=['CustomerID'], inplace=True)
-    #Borrar Usage Frequency
-    #Un cliente que hace churn → deja de usar el servicio Entonces su frecuencia baja brutalmente El modelo aprende: “frecuencia ≈ 0 ⇒ churn"
-    df.drop(columns=['Usage Frequency'], inplace=True)
-    # Borrar Last Interaction Un cliente que churnea → deja de interactuar Last Interaction se vuelve enorme El modelo lo adivina sin esfuerzo
-    df.drop(columns=['Last Interaction'], inplace=True)
-    # Borrar total spend El gasto total está muy correlacionado con la duración del contrato (tenure). El modelo puede aprender esta relación en lugar de aprender patrones reales relacionados con el churn.
-    df.drop(columns=['Total Spend'], inplace=True)
+    with stage("preprocess_data", rows=len(df)):
+        return _preprocess(df, target_col, save_artifacts, use_cache, cache_dir, np.dtype(dtype))
 
+def _preprocess(df, target_col, save_artifacts, use_cache, cache_dir, dtype):
+    cache_path = None
+    if use_cache and target_col in df.columns:
+        with stage("cache_lookup", rows=len(df)):
+            key = preprocessing_key(df, target_col, DROP_COLUMNS, TEST_SIZE, RANDOM_STATE, dtype=dtype.name)
+            cache_path = cache_dir / f"preprocess-{key}"
+            cached = load_preprocessed(cache_path, save_artifacts)
+        if cached is not None:
+            print(f"    Resultado recuperado de la caché {cache_path}")
+            return cached
+
+    # 1. Limpieza
+    with stage("drop_duplicates") as s:
+        df = df.drop_duplicates()
+        s.rows = len(df)
+    with stage("dropna") as s:
+        df = df.dropna()
+        s.rows = len(df)
+    with stage("drop_columns", rows=len(df)):
+        df = df.drop(columns=DROP_COLUMNS)
 
     # Separar X e y
     if target_col in df.columns:
@@ -39,98 +79,111 @@ def preprocess_data(df, target_col='Churn', save_artifacts=True):
         y = None
 
     # Guardamos el orden de las columnas para pedirselas al usuario luego
+    columns = X.columns.tolist()
     if save_artifacts:
-        joblib.dump(X.columns.tolist(), ARTIFACTS_DIR / "columns.joblib")
+        joblib.dump(columns, ARTIFACTS_DIR / "columns.joblib")
 
    # 2. Categóricas
-    # LabelEncoder para Gender
-    le_gender = LabelEncoder()
-    X['Gender'] = le_gender.fit_transform(X['Gender'])
+    with stage("encode", rows=len(X)):
+        # LabelEncoder para Gender
+        le_gender = LabelEncoder()
+        X['Gender'] = le_gender.fit_transform(X['Gender']).astype(np.int8)
 
-    # Diccionarios para otras categóricas
-    sub_type_map = {'Basic':0, 'Standard':1, 'Premium':2}
-    contract_map = {'Monthly':0, 'Quarterly':1, 'Annual':2}
+        # Diccionarios para otras categóricas
+        sub_type_map = {'Basic':0, 'Standard':1, 'Premium':2}
+        contract_map = {'Monthly':0, 'Quarterly':1, 'Annual':2}
 
-    X['Subscription Type'] = X['Subscription Type'].str.title().map(sub_type_map)
-    X['Contract Length'] = X['Contract Length'].str.title().map(contract_map)
+        X['Subscription Type'] = X['Subscription Type'].astype(str).str.title().map(sub_type_map).astype(np.int8)
+        X['Contract Length'] = X['Contract Length'].astype(str).str.title().map(contract_map).astype(np.int8)
 
     # Guardar encoders y diccionarios
+    encoders = {
+        "Gender": le_gender,
+        "Subscription Type": sub_type_map,
+        "Contract Length": contract_map
+    }
     if save_artifacts:
-        encoders = {
-            "Gender": le_gender,
-            "Subscription Type": sub_type_map,
-            "Contract Length": contract_map
-        }
         joblib.dump(encoders, ARTIFACTS_DIR / "encoders.joblib")
-    # 3. Escalado
-    scaler = MinMaxScaler()
-    X_scaled = pd.DataFrame(
-        scaler.fit_transform(X),
-        columns=X.columns
-    )
+        write_schema(columns, encoders)
+    # 3. Escalado: una sola matriz en dtype; el scaler se ajusta y aplica sobre los valores
+    # originales en float64, por bloques, y solo el resultado se pasa a dtype (como FeatureTransformer)
+    with stage("scale", rows=len(X)):
+        scaler = MinMaxScaler()
+        for start in range(0, len(X), _SCALE_BLOCK):
+            scaler.partial_fit(X.iloc[start:start + _SCALE_BLOCK].to_numpy(dtype=np.float64))
+        X_values = np.empty(X.shape, dtype=dtype)
+        for start in range(0, len(X), _SCALE_BLOCK):
+            X_values[start:start + _SCALE_BLOCK] = scaler.transform(
+                X.iloc[start:start + _SCALE_BLOCK].to_numpy(dtype=np.float64))
+        del X
+    print(f"    Matriz de features: {X_values.nbytes / 1e6:.1f} MB en {dtype.name} "
+          f"(float64: {X_values.size * 8 / 1e6:.1f} MB)")
 
     if save_artifacts:
         joblib.dump(scaler, ARTIFACTS_DIR / "scaler.joblib")
+        artifact_store.invalidate()
 
     # Retorno
     if y is not None:
-        X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
+        with stage("split", rows=len(X_values)):
+            # Se reparten índices (misma partición que con los DataFrames) y cada fila se copia una vez
+            train_idx, test_idx = train_test_split(np.arange(len(X_values)), test_size=TEST_SIZE,
+                                                   random_state=RANDOM_STATE)
+            X_train = pd.DataFrame(X_values[train_idx], columns=columns, index=train_idx, copy=False)
+            X_test = pd.DataFrame(X_values[test_idx], columns=columns, index=test_idx, copy=False)
+            y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
+            del X_values
+        with stage("drift_reference", rows=len(X_train)):
+            # Histogramas del split de entrenamiento para el monitor de drift (features/drift.py)
+            reference = DriftReference.from_scaler(columns, scaler).add(X_train.to_numpy())
+        if save_artifacts:
+            reference.save(ARTIFACTS_DIR / DRIFT_REFERENCE_NAME)
+        if cache_path is not None:
+            with stage("cache_store", rows=len(X_train) + len(X_test)):
+                save_preprocessed(cache_path, (X_train, X_test, y_train, y_test),
+                                  {"columns": columns, "encoders": encoders, "scaler": scaler,
+                                   "drift_reference": vars(reference)})
         return X_train, X_test, y_train, y_test
     else:
-        return X_scaled
+        return pd.DataFrame(X_values, columns=columns, copy=False)
 
 def process_input(user_data):
     """
     Toma un diccionario con los datos del usuario y los transforma
     usando los artefactos guardados.
-        - Carga columnas, encoders y scaler.
-        - Crea un DataFrame con los datos del usuario.
+        - Obtiene columnas, encoders y scaler de la caché de artefactos.
+        - Usa el FeatureTransformer compilado (sin crear DataFrames).
         - Aplica las mismas transformaciones que al entrenamiento.
         - Devuelve un array listo para predecir.
         user_data: dict con claves como  'Gender', 'Age', 'Subscription Type', etc.
     """
-    # 1. Cargar artefactos
     try:
-        columns = joblib.load(ARTIFACTS_DIR / "columns.joblib")
-        encoders = joblib.load(ARTIFACTS_DIR / "encoders.joblib")
-        scaler = joblib.load(ARTIFACTS_DIR / "scaler.joblib")
+        transformer = current_transformer()
     except FileNotFoundError:
         raise Exception("No se encontraron los archivos de entrenamiento. Entrena el modelo primero.")
 
-    # 2. Crear DataFrame vacío con las columnas correctas
-    df = pd.DataFrame(columns=columns)
-    
-    # 3. Llenar el DataFrame con los datos del usuario
-    for col in columns:
-        if col in user_data:
-            df.loc[0, col] = user_data[col]
+    return transformer.transform_one(user_data)
+
+
+def process_batch(df, columns=None, encoders=None, scaler=None):
+    """
+    Versión vectorizada de process_input para un bloque de clientes.
+        - df: DataFrame (o dict de columnas) con las columnas usadas en el entrenamiento.
+        - Aplica encoders y scaler de una sola vez sobre todo el bloque.
+        - Las categorías desconocidas de Subscription Type y Contract Length pasan a 0
+          fila a fila; un Gender desconocido lanza ValueError, igual que process_input.
+        - Devuelve un array (n_filas, n_columnas) listo para predecir.
+    """
+    try:
+        if columns is None and encoders is None and scaler is None:
+            transformer = current_transformer()
         else:
-            raise ValueError(f"Falta la columna requerida: {col}")
-        
-    # 4. Aplicar encoders solo a columnas categóricas
-    # Gender
-    if 'Gender' in df.columns and 'Gender' in encoders:
-        gender_encoder = encoders['Gender']
-        df['Gender'] = gender_encoder.transform(df['Gender'].astype(str))
-    
-    # Subscription Type
-    if 'Subscription Type' in df.columns and 'Subscription Type' in encoders:
-        sub_map = encoders['Subscription Type']
-        df['Subscription Type'] = df['Subscription Type'].astype(str).str.title().map(sub_map)
-        if df['Subscription Type'].isna().any():
-            df['Subscription Type'] = 0
-    
-    # Contract Length
-    if 'Contract Length' in df.columns and 'Contract Length' in encoders:
-        contract_map = encoders['Contract Length']
-        df['Contract Length'] = df['Contract Length'].astype(str).str.title().map(contract_map)
-        if df['Contract Length'].isna().any():
-            df['Contract Length'] = 0
-
-    # 5. Convertir todo a numérico
-    df = df.apply(pd.to_numeric, errors='coerce').fillna(0)
-
-    # 6. Aplicar scaler
-    df_scaled = scaler.transform(df)
-    
-    return df_scaled
\ No newline at end of file
+            transformer = FeatureTransformer(
+                artifact_store.columns if columns is None else columns,
+                artifact_store.encoders if encoders is None else encoders,
+                artifact_store.scaler if scaler is None else scaler,
+            )
+    except FileNotFoundError:
+        raise Exception("No se encontraron los archivos de entrenamiento. Entrena el modelo primero.")
+
+    return transformer.transform_batch(df)
@@ -0,0 +1,222 @@
+# tasa_churn/features/drift.py
+import json
+import os
+from collections import deque
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from tasa_churn.features.validation import OUT_OF_RANGE
+from tasa_churn.utils.paths import ARTIFACTS_DIR
+
+DRIFT_REFERENCE_NAME = "drift_reference.joblib"
+
+# Bins de igual anchura en [0, 1] (espacio del scaler de entrenamiento), más uno por debajo y otro por encima
+N_BINS = 20
+
+# Umbrales de aviso: PSI > 0.2 suele considerarse un cambio importante de población
+PSI_ALERT = 0.2
+OUT_OF_RANGE_ALERT = 0.01
+
+# Margen para no contar como fuera de rango el redondeo de float32
+_TOLERANCE = 1e-6
+# Desplazamiento (en bins) para que los enteros que caen justo en un borde no dependan del redondeo
+_BIN_EPSILON = 1e-4
+# Proporción mínima por bin en el PSI (evita log(0))
+_PSI_EPSILON = 1e-4
+
+
+def bin_counts(X, scale, offset, n_bins=N_BINS):
+    """
+    Recuentos por feature y bin de un bloque, array int64 (n_features, n_bins + 2).
+        - Cada valor se lleva al espacio de referencia (X * scale + offset) y se asigna a
+          uno de n_bins bins iguales en [0, 1]; el bin 0 y el último cuentan lo que queda fuera.
+        - Un único bincount para todo el bloque: no se guardan filas.
+    """
+    X = np.asarray(X)
+    n_features = X.shape[1]
+    position = X * scale + offset
+    bins = np.floor(position * n_bins + _BIN_EPSILON)
+    np.clip(bins, 0, n_bins - 1, out=bins)
+    bins += 1
+    bins[position < -_TOLERANCE] = 0
+    bins[position > 1 + _TOLERANCE] = n_bins + 1
+    bins += np.arange(n_features) * (n_bins + 2)
+    counts = np.bincount(bins.astype(np.intp).ravel(), minlength=n_features * (n_bins + 2))
+    return counts.reshape(n_features, n_bins + 2)
+
+
+def population_stability(expected, actual):
+    """PSI por feature entre dos matrices de recuentos (n_features, n_bins)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p = np.maximum(expected / expected.sum(axis=1, keepdims=True), _PSI_EPSILON)
+        q = np.maximum(actual / actual.sum(axis=1, keepdims=True), _PSI_EPSILON)
+    return ((q - p) * np.log(q / p)).sum(axis=1)
+
+
+def ks_statistic(expected, actual):
+    """Estadístico KS por feature sobre los histogramas (máxima distancia entre las CDF por bins)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p = np.cumsum(expected, axis=1) / expected.sum(axis=1, keepdims=True)
+        q = np.cumsum(actual, axis=1) / actual.sum(axis=1, keepdims=True)
+    return np.abs(p - q).max(axis=1)
+
+
+class DriftReference:
+    """
+    Histogramas de referencia de cada feature sobre el split de entrenamiento.
+        - Se construye al preprocesar (preprocess_data y preprocess_out_of_core) y se guarda
+          junto a los demás artefactos (models/artifacts/drift_reference.joblib).
+        - Guarda el scale_/min_ del scaler con el que se calculó: si el scaler cambia después
+          (p.ej. con update), los datos nuevos se siguen llevando a los mismos bins.
+    """
+
+    def __init__(self, columns, scale, offset, n_bins=N_BINS, counts=None):
+        self.columns = list(columns)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.offset = np.asarray(offset, dtype=np.float64)
+        self.n_bins = n_bins
+        self.counts = np.zeros((len(self.columns), n_bins + 2), dtype=np.int64) if counts is None else counts
+
+    @classmethod
+    def from_scaler(cls, columns, scaler, n_bins=N_BINS):
+        """Referencia vacía para matrices escaladas con scaler; se llena con add()."""
+        return cls(columns, scaler.scale_, scaler.min_, n_bins)
+
+    def add(self, X_scaled):
+        """Suma un bloque ya escalado con el scaler de la referencia."""
+        self.counts += bin_counts(X_scaled, 1.0, 0.0, self.n_bins)
+        return self
+
+    def save(self, path=ARTIFACTS_DIR / DRIFT_REFERENCE_NAME):
+        tmp_path = path.with_name(path.name + ".tmp")
+        joblib.dump(vars(self), tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path=ARTIFACTS_DIR / DRIFT_REFERENCE_NAME):
+        """Devuelve None si no hay referencia (modelos entrenados antes de existir el monitor)."""
+        try:
+            return cls(**joblib.load(path))
+        except FileNotFoundError:
+            return None
+
+
+class DriftMonitor:
+    """
+    Monitor de drift para la puntuación por lotes, con coste fijo por bloque.
+        - update() suma cada bloque puntuado a contadores por bin (bin_counts): no guarda filas.
+        - Ventana deslizante: los contadores se agrupan en cubos de al menos bucket_rows filas
+          y la ventana son los últimos window_buckets cubos. Al cerrar cada cubo se anota en
+          history el PSI, el KS y la tasa de fuera de rango de la ventana.
+        - La tasa de fuera de rango sale de los códigos del validador (flags de check(), filas
+          rechazadas incluidas) o, sin flags, de los bins de desbordamiento.
+    """
+
+    def __init__(self, reference, scaler, bucket_rows=100_000, window_buckets=10):
+        self.reference = reference
+        self.columns = reference.columns
+        self.n_bins = reference.n_bins
+        # Del escalado actual al de la referencia: X_ref = X * scale + offset
+        self.scale = reference.scale / np.asarray(scaler.scale_, dtype=np.float64)
+        self.offset = reference.offset - np.asarray(scaler.min_, dtype=np.float64) * self.scale
+        self.bucket_rows = bucket_rows
+
+        # Cada cubo (y la suma de la ventana) es [recuentos por bin, fuera de rango por feature, filas]
+        self._current = self._new_bucket()
+        self._buckets = deque(maxlen=window_buckets)
+        self._window = self._new_bucket()
+        self.rows_seen = 0
+        self.history = []
+
+    def _new_bucket(self):
+        n_features = len(self.columns)
+        return [np.zeros((n_features, self.n_bins + 2), dtype=np.int64), np.zeros(n_features, dtype=np.int64), 0]
+
+    @classmethod
+    def from_artifacts(cls, store=None, path=None, scaler=None, **kwargs):
+        """
+        Monitor con la referencia guardada (por defecto, junto al scaler del store) y el scaler
+        actual (o el dado), o None si no hay referencia.
+        """
+        if store is None:
+            from tasa_churn.utils.artifacts import artifact_store as store
+        if path is None:
+            path = store.paths["scaler"].with_name(DRIFT_REFERENCE_NAME)
+        reference = DriftReference.load(path)
+        if reference is None or reference.columns != list(store.columns):
+            return None
+        return cls(reference, store.scaler if scaler is None else scaler, **kwargs)
+
+    def update(self, X, flags=None):
+        """
+        Suma un bloque: X son las filas puntuadas (ya escaladas, puede ser None si no hay
+        ninguna) y flags el detalle de SchemaValidator.check() de todas las filas del bloque.
+        """
+        block = bin_counts(X, self.scale, self.offset, self.n_bins) if X is not None and len(X) else None
+        counts, out_of_range, _ = self._current
+        if block is not None:
+            counts += block
+        if flags is not None:
+            out_of_range += np.count_nonzero(flags & OUT_OF_RANGE, axis=0)
+            n_rows = len(flags)
+        else:
+            if block is not None:
+                out_of_range += block[:, 0] + block[:, -1]
+            n_rows = 0 if block is None else len(X)
+        self._current[2] += n_rows
+        self.rows_seen += n_rows
+        if self._current[2] >= self.bucket_rows:
+            self._close_bucket()
+
+    def _close_bucket(self):
+        if len(self._buckets) == self._buckets.maxlen:
+            evicted = self._buckets[0]
+            for total, value in zip(self._window[:2], evicted[:2]):
+                total -= value
+            self._window[2] -= evicted[2]
+        self._buckets.append(self._current)
+        for total, value in zip(self._window[:2], self._current[:2]):
+            total += value
+        self._window[2] += self._current[2]
+        self._current = self._new_bucket()
+
+        report = self.report()
+        self.history.append({"rows_seen": self.rows_seen, "window_rows": self._window[2],
+                             **{metric: report[metric].round(6).to_dict()
+                                for metric in ("psi", "ks", "out_of_range_rate")}})
+
+    def report(self):
+        """PSI, KS y tasa de fuera de rango por feature en la ventana actual (cubo en curso incluido)."""
+        counts = self._window[0] + self._current[0]
+        out_of_range = self._window[1] + self._current[1]
+        rows = self._window[2] + self._current[2]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rate = out_of_range / rows if rows else np.full(len(self.columns), np.nan)
+        return pd.DataFrame({
+            "psi": population_stability(self.reference.counts, counts),
+            "ks": ks_statistic(self.reference.counts, counts),
+            "out_of_range_rate": rate,
+            "rows": counts.sum(axis=1),
+        }, index=pd.Index(self.columns, name="feature"))
+
+    def alerts(self, report=None):
+        """Features con PSI > PSI_ALERT o con más de OUT_OF_RANGE_ALERT de valores fuera de rango."""
+        report = self.report() if report is None else report
+        flagged = (report["psi"] > PSI_ALERT) | (report["out_of_range_rate"] > OUT_OF_RANGE_ALERT)
+        return list(report.index[flagged])
+
+    def save(self, path):
+        """Guarda la ventana actual y el histórico de ventanas en JSON."""
+        report = self.report()
+        path.write_text(json.dumps({
+            "rows_seen": self.rows_seen,
+            "bucket_rows": self.bucket_rows,
+            "window_buckets": self._buckets.maxlen,
+            "window": report.round(6).reset_index().to_dict("records"),
+            "alerts": self.alerts(report),
+            "history": self.history,
+        }, indent=2, default=float))
+        return path
@@ -0,0 +1,174 @@
+# tasa_churn/features/out_of_core.py
+import json
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+
+from tasa_churn.data.make_dataset import read_chunks
+from tasa_churn.features.build_features import DROP_COLUMNS, TEST_SIZE
+from tasa_churn.features.drift import DRIFT_REFERENCE_NAME, DriftReference
+from tasa_churn.features.transformer import FeatureTransformer
+from tasa_churn.utils.artifacts import artifact_store, write_schema
+from tasa_churn.utils.instrument import stage
+from tasa_churn.utils.paths import ARTIFACTS_DIR, PROCESSED_DATA_DIR
+
+_ARRAYS = ("X_train", "X_test", "y_train", "y_test")
+
+# Resolución del reparto train/test por hash (test_size se redondea a 1/10000)
+_HASH_BUCKETS = 10_000
+
+
+def in_test_split(chunk, test_size=TEST_SIZE, key_col='CustomerID'):
+    """
+    Asignación determinista a test por hash de cada fila:
+        - Usa key_col (el cliente) si existe; si no, el contenido de toda la fila.
+        - No depende del tamaño de bloque ni del orden: la misma fila cae siempre en el mismo lado.
+    """
+    keys = chunk[key_col] if key_col in chunk.columns else chunk
+    hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    return (hashes % _HASH_BUCKETS) < int(round(test_size * _HASH_BUCKETS))
+
+
+def _clean(chunk):
+    # Mismas limpiezas que preprocess_data, pero dentro de cada bloque
+    return chunk.drop_duplicates().dropna()
+
+
+def _clean_chunks(filename, chunk_size, dedup, keep_masks):
+    """
+    Bloques limpios del CSV. Con dedup (DedupIndex), la primera pasada (keep_masks vacío)
+    filtra con el índice y guarda la máscara de cada bloque (1 bit por fila) para que la
+    segunda pasada se quede exactamente con las mismas filas.
+    """
+    first_pass = not keep_masks
+    for i, chunk in enumerate(read_chunks(filename, chunk_size)):
+        if dedup is None:
+            chunk = _clean(chunk)
+        else:
+            chunk = chunk.dropna()
+            if first_pass:
+                keep = dedup.filter(chunk)
+                keep_masks.append(np.packbits(keep))
+            else:
+                keep = np.unpackbits(keep_masks[i], count=len(chunk)).astype(bool)
+            chunk = chunk[keep]
+        # Un bloque puede quedarse vacío (p.ej. todo duplicados)
+        if len(chunk):
+            yield chunk
+
+
+def preprocess_out_of_core(filename, output_dir=None, target_col='Churn', chunk_size=500_000,
+                           test_size=TEST_SIZE, key_col='CustomerID', save_artifacts=True, dedup=None):
+    """
+    Preprocesado para datasets que no caben en memoria (alternativa a preprocess_data).
+        - Pasada 1 por el CSV: cuenta filas de train/test y recoge las categorías de Gender.
+        - Pasada 2: codifica cada bloque, ajusta el MinMaxScaler con partial_fit y escribe
+          las features codificadas (float64) en matrices temporales mapeadas en memoria.
+        - Al final escala bloque a bloque en float64 y escribe el resultado en las matrices
+          .npy finales (float32), como preprocess_data; en la misma pasada cuenta los
+          histogramas de train para el monitor de drift (DriftReference).
+        - El reparto train/test es por hash de CustomerID (in_test_split), no train_test_split.
+        - drop_duplicates/dropna se aplican por bloque: los duplicados entre bloques
+          distintos no se eliminan. Con dedup (un DedupIndex) se eliminan también entre
+          bloques y frente a entregas anteriores; el índice se guarda al terminar.
+    La memoria máxima depende de chunk_size, no del tamaño del dataset.
+    Devuelve (X_train, X_test, y_train, y_test) como memmaps de solo lectura.
+    """
+    if output_dir is None:
+        output_dir = PROCESSED_DATA_DIR / "out_of_core" / os.path.basename(str(filename)).rsplit(".", 1)[0]
+    print(f"--> Preprocesando {filename} por bloques de {chunk_size} filas...")
+
+    # --- Pasada 1: tamaños y categorías --------------------------------------
+    n_train = n_test = 0
+    genders = set()
+    columns = None
+    keep_masks = []
+    with stage("ooc:scan") as s:
+        for chunk in _clean_chunks(filename, chunk_size, dedup, keep_masks):
+            is_test = in_test_split(chunk, test_size, key_col)
+            n_test += int(is_test.sum())
+            n_train += len(chunk) - int(is_test.sum())
+            genders.update(chunk['Gender'].astype(str).unique())
+            if columns is None:
+                columns = [c for c in chunk.columns if c not in DROP_COLUMNS and c != target_col]
+        s.rows = n_train + n_test
+    print(f"    Filas: {n_train} train / {n_test} test")
+
+    encoders = {
+        "Gender": LabelEncoder().fit(sorted(genders)),
+        "Subscription Type": {'Basic':0, 'Standard':1, 'Premium':2},
+        "Contract Length": {'Monthly':0, 'Quarterly':1, 'Annual':2},
+    }
+    encoder = FeatureTransformer(columns, encoders)
+    scaler = MinMaxScaler()
+
+    # --- Pasada 2: codificar y escribir en las matrices -----------------------
+    tmp_dir = output_dir.with_name(output_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    sizes = {"train": n_train, "test": n_test}
+    # Valores codificados sin escalar en float64: el escalado no puede hacerse hasta ajustar el scaler
+    raw = {split: np.lib.format.open_memmap(tmp_dir / f"X_{split}.raw.npy", mode="w+", dtype=np.float64,
+                                            shape=(n, len(columns))) for split, n in sizes.items()}
+    y = {split: np.lib.format.open_memmap(tmp_dir / f"y_{split}.npy", mode="w+", dtype=np.int8,
+                                          shape=(n,)) for split, n in sizes.items()}
+    pos = {"train": 0, "test": 0}
+
+    with stage("ooc:encode", rows=n_train + n_test):
+        for chunk in _clean_chunks(filename, chunk_size, dedup, keep_masks):
+            is_test = in_test_split(chunk, test_size, key_col)
+            encoded = encoder.encode_batch(chunk)
+            scaler.partial_fit(pd.DataFrame(encoded, columns=columns))
+            target = chunk[target_col].to_numpy(dtype=np.int8)
+            for split, mask in (("train", ~is_test), ("test", is_test)):
+                n = int(mask.sum())
+                raw[split][pos[split]:pos[split] + n] = encoded[mask]
+                y[split][pos[split]:pos[split] + n] = target[mask]
+                pos[split] += n
+
+    with stage("ooc:scale", rows=n_train + n_test):
+        scale, offset = scaler.scale_, scaler.min_
+        reference = DriftReference.from_scaler(columns, scaler)
+        X = {}
+        for split, values in raw.items():
+            X[split] = np.lib.format.open_memmap(tmp_dir / f"X_{split}.npy", mode="w+", dtype=np.float32,
+                                                 shape=values.shape)
+            for start in range(0, len(values), chunk_size):
+                block = X[split][start:start + chunk_size]
+                block[:] = values[start:start + chunk_size] * scale + offset
+                if split == "train":
+                    reference.add(block)
+    for arr in list(X.values()) + list(y.values()):
+        arr.flush()
+    del X, y, raw
+    for split in sizes:
+        os.remove(tmp_dir / f"X_{split}.raw.npy")
+
+    meta = {"feature_columns": columns, "target": target_col, "rows": sizes,
+            "test_size": test_size, "key_col": key_col, "chunk_size": chunk_size}
+    (tmp_dir / "meta.json").write_text(json.dumps(meta, indent=2))
+    for name, value in {"columns": columns, "encoders": encoders, "scaler": scaler}.items():
+        joblib.dump(value, tmp_dir / f"{name}.joblib")
+    reference.save(tmp_dir / DRIFT_REFERENCE_NAME)
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(tmp_dir, output_dir)
+    if dedup is not None:
+        dedup.commit()
+
+    if save_artifacts:
+        for name in ("columns", "encoders", "scaler", "drift_reference"):
+            shutil.copyfile(output_dir / f"{name}.joblib", ARTIFACTS_DIR / f"{name}.joblib")
+        artifact_store.invalidate()
+        write_schema(columns, encoders)
+
+    print(f"    Matrices guardadas en {output_dir}")
+    return open_matrices(output_dir)
+
+
+def open_matrices(path):
+    """Abre las matrices de preprocess_out_of_core en modo solo lectura (mmap)."""
+    return tuple(np.load(path / f"{name}.npy", mmap_mode="r") for name in _ARRAYS)
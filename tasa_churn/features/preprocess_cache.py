@@ -0,0 +1,99 @@
+# tasa_churn/features/preprocess_cache.py
+import hashlib
+import json
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from tasa_churn.utils.artifacts import artifact_store, write_schema
+from tasa_churn.utils.paths import ARTIFACTS_DIR
+
+# Subir este número si cambia la lógica de preprocess_data (invalida las cachés antiguas)
+PREPROCESS_VERSION = 4
+
+_ARRAYS = ("X_train", "X_test", "y_train", "y_test")
+_ARTIFACTS = ("columns", "encoders", "scaler", "drift_reference")
+
+
+def preprocessing_key(df, target_col, drop_columns, test_size, random_state, **extra):
+    """
+    Clave de contenido para el resultado de preprocess_data.
+        - Hash de los datos (valores + índice) y de las columnas/dtypes de df.
+        - Parámetros: target_col, columnas eliminadas y parámetros del split.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    params = {
+        "version": PREPROCESS_VERSION,
+        "columns": [str(c) for c in df.columns],
+        "dtypes": [str(t) for t in df.dtypes],
+        "target_col": target_col,
+        "drop_columns": list(drop_columns),
+        "test_size": test_size,
+        "random_state": random_state,
+        **extra,
+    }
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def save_preprocessed(path, splits, artifacts):
+    """
+    Guarda X_train/X_test/y_train/y_test como .npy y los artefactos ajustados en path.
+    Se escribe en un directorio temporal y se renombra al final (escritura atómica).
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    tmp_path.mkdir(parents=True)
+
+    meta = {"feature_columns": [], "target": None, "index": {}}
+    for name, obj in zip(_ARRAYS, splits):
+        np.save(tmp_path / f"{name}.npy", obj.to_numpy())
+        index = np.asarray(obj.index)
+        if index.dtype.kind in "iu":
+            np.save(tmp_path / f"{name}_index.npy", index)
+            meta["index"][name] = True
+        if isinstance(obj, pd.DataFrame):
+            meta["feature_columns"] = [str(c) for c in obj.columns]
+        else:
+            meta["target"] = obj.name
+
+    for name in _ARTIFACTS:
+        joblib.dump(artifacts[name], tmp_path / f"{name}.joblib")
+    (tmp_path / "meta.json").write_text(json.dumps(meta, indent=2))
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+
+
+def load_preprocessed(path, save_artifacts=True):
+    """
+    Recupera el resultado cacheado de preprocess_data (o None si no existe).
+        - Los arrays se abren con mmap_mode='r': no se copian a memoria.
+        - Si save_artifacts es True, restaura columns/encoders/scaler y la referencia de drift
+          en models/artifacts.
+    """
+    meta_path = path / "meta.json"
+    if not meta_path.exists():
+        return None
+    meta = json.loads(meta_path.read_text())
+
+    splits = []
+    for name in _ARRAYS:
+        values = np.load(path / f"{name}.npy", mmap_mode="r")
+        index = np.load(path / f"{name}_index.npy") if meta["index"].get(name) else None
+        if name.startswith("X"):
+            splits.append(pd.DataFrame(values, columns=meta["feature_columns"], index=index, copy=False))
+        else:
+            splits.append(pd.Series(values, index=index, name=meta["target"], copy=False))
+
+    if save_artifacts:
+        for name in _ARTIFACTS:
+            shutil.copyfile(path / f"{name}.joblib", ARTIFACTS_DIR / f"{name}.joblib")
+        artifact_store.invalidate()
+        write_schema(artifact_store.columns, artifact_store.encoders)
+
+    return tuple(splits)
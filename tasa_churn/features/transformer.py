@@ -0,0 +1,234 @@
+# tasa_churn/features/transformer.py
+import numpy as np
+
+# Tipo de las features ya escaladas: los árboles de sklearn convierten siempre a float32,
+# así que float64 solo duplica la memoria
+FEATURE_DTYPE = np.float32
+
+
+class FeatureTransformer:
+    """
+    Transformador de features compilado a partir de los artefactos guardados.
+        - Precompila cada encoder en arrays de búsqueda (claves ordenadas + códigos):
+            * LabelEncoder (Gender): coincidencia exacta, una categoría desconocida lanza ValueError.
+            * Diccionarios (Subscription Type, Contract Length): se aplica str.title()
+              y las categorías desconocidas pasan a 0.
+        - Fusiona el MinMaxScaler (scale_ y min_) en un único paso afín: X * scale + offset.
+          Se calcula en float64 y el resultado se devuelve en dtype (FEATURE_DTYPE por defecto),
+          igual que preprocess_data.
+        - No crea DataFrames: solo NumPy. Da los mismos resultados que process_input.
+    """
+
+    def __init__(self, columns, encoders, scaler=None, dtype=FEATURE_DTYPE):
+        self.columns = list(columns)
+        self.n_features = len(self.columns)
+        self.dtype = np.dtype(dtype)
+
+        # Mapas categóricos: columna -> (dict para una fila, claves ordenadas, códigos, estricto, title)
+        self._categorical = {}
+        for col in self.columns:
+            encoder = encoders.get(col)
+            if encoder is None:
+                continue
+            if hasattr(encoder, 'classes_'):
+                mapping = {str(c): float(i) for i, c in enumerate(encoder.classes_)}
+                strict, title = True, False
+            elif isinstance(encoder, dict):
+                mapping = {str(k): float(v) for k, v in encoder.items()}
+                strict, title = False, True
+            else:
+                continue
+            keys = np.array(sorted(mapping), dtype=str)
+            codes = np.array([mapping[k] for k in keys], dtype=np.float64)
+            self._categorical[col] = (mapping, keys, codes, strict, title)
+
+        self.categorical_columns = [col for col in self.columns if col in self._categorical]
+        self._index = {col: i for i, col in enumerate(self.columns)}
+
+        # Paso afín fusionado del MinMaxScaler (sin scaler: identidad, solo codifica)
+        if scaler is None:
+            self.scale, self.offset = np.ones(self.n_features), np.zeros(self.n_features)
+        else:
+            self.scale = np.asarray(scaler.scale_, dtype=np.float64)
+            self.offset = np.asarray(scaler.min_, dtype=np.float64)
+        self.clip = getattr(scaler, 'clip', False)
+        self.feature_range = getattr(scaler, 'feature_range', (0, 1))
+
+    @classmethod
+    def from_artifacts(cls, store=None):
+        """Construye el transformador con los artefactos de la caché (ArtifactStore)."""
+        if store is None:
+            from tasa_churn.utils.artifacts import artifact_store as store
+        return cls(store.columns, store.encoders, store.scaler)
+
+    # --- Una sola fila -------------------------------------------------------
+
+    def encode_one(self, user_data):
+        """Codifica un diccionario de entrada sin escalar. Devuelve un array (1, n_features)."""
+        row = np.empty((1, self.n_features), dtype=np.float64)
+        for i, col in enumerate(self.columns):
+            if col not in user_data:
+                raise ValueError(f"Falta la columna requerida: {col}")
+            value = user_data[col]
+            cat = self._categorical.get(col)
+            if cat is None:
+                row[0, i] = _to_float(value)
+                continue
+            mapping, _, _, strict, title = cat
+            key = str(value).title() if title else str(value)
+            code = mapping.get(key)
+            if code is None:
+                if strict:
+                    raise ValueError(f"Categoría desconocida para '{col}': {value!r}")
+                code = 0.0
+            row[0, i] = code
+        return row
+
+    def transform_one(self, user_data):
+        """Codifica y escala un diccionario de entrada. Devuelve un array (1, n_features) en dtype."""
+        return self._scale(self.encode_one(user_data))
+
+    # --- Bloques de filas ----------------------------------------------------
+
+    def encode_batch(self, data):
+        """
+        Codifica un bloque sin escalar. Devuelve un array (n_filas, n_features).
+            - data: mapeo columna -> valores (dict de arrays, DataFrame, ...) o
+              array 2-D con las columnas en el orden de self.columns.
+        """
+        getter = self._column_getter(data)
+        n_rows = None
+        out = None
+        for i, col in enumerate(self.columns):
+            column = getter(col)
+            if out is None:
+                n_rows = len(column)
+                out = np.empty((n_rows, self.n_features), dtype=np.float64)
+            cat = self._categorical.get(col)
+            if cat is None:
+                out[:, i] = _to_float_array(np.asarray(column))
+            elif hasattr(column, 'cat'):
+                out[:, i] = self._lookup_categorical(col, column, cat)
+            else:
+                out[:, i] = self._lookup(col, np.asarray(column), cat)
+        if out is None:
+            out = np.empty((0, self.n_features), dtype=np.float64)
+        return out
+
+    def transform_batch(self, data):
+        """Codifica y escala un bloque. Devuelve un array (n_filas, n_features) en dtype."""
+        return self._scale(self.encode_batch(data))
+
+    def scale_encoded(self, X):
+        """Aplica solo el paso afín del scaler a features ya codificadas."""
+        return self._scale(np.array(X, dtype=np.float64))
+
+    # --- Internos ------------------------------------------------------------
+
+    def _scale(self, X):
+        X *= self.scale
+        X += self.offset
+        if self.clip:
+            np.clip(X, self.feature_range[0], self.feature_range[1], out=X)
+        return X.astype(self.dtype, copy=False)
+
+    def _column_getter(self, data):
+        if isinstance(data, np.ndarray):
+            if data.ndim != 2 or data.shape[1] != self.n_features:
+                raise ValueError(f"Se esperaba un array 2-D con {self.n_features} columnas")
+            return lambda col: data[:, self._index[col]]
+
+        missing = [col for col in self.columns if col not in data]
+        if missing:
+            raise ValueError(f"Faltan las columnas requeridas: {missing}")
+        return lambda col: data[col]
+
+    def _lookup_categorical(self, col, column, cat):
+        """Series 'category' de pandas: cada categoría se busca una sola vez y se indexa por código."""
+        # El código -1 (nulo) apunta al último elemento, que se codifica como el texto 'nan'
+        categories = np.append(np.asarray(column.cat.categories, dtype=object), np.nan)
+        codes = column.cat.codes.to_numpy()
+        used = np.zeros(len(categories), dtype=bool)
+        used[np.unique(codes)] = True
+        mapped = np.zeros(len(categories), dtype=np.float64)
+        mapped[used] = self._lookup(col, categories[used], cat)
+        return mapped[codes]
+
+    def known_categories(self, col, column):
+        """Máscara de los valores de 'column' que el encoder de 'col' reconoce (sin lanzar errores)."""
+        cat = self._categorical[col]
+        if hasattr(column, 'cat'):
+            categories = np.asarray(column.cat.categories, dtype=object)
+            known = np.append(self._find(categories, cat)[1], False)
+            return known[column.cat.codes.to_numpy()]
+        return self._find(np.asarray(column), cat)[1]
+
+    def _find(self, values, cat):
+        """Posición en las claves ordenadas de cada valor y máscara de los encontrados."""
+        _, keys, _, _, title = cat
+        strings = values.astype(str)
+        if title:
+            strings = np.char.title(strings)
+        pos = np.minimum(np.searchsorted(keys, strings), len(keys) - 1)
+        return pos, keys[pos] == strings
+
+    def _lookup(self, col, values, cat):
+        _, _, codes, strict, _ = cat
+        pos_clipped, found = self._find(values, cat)
+        if strict and not found.all():
+            unknown = np.unique(values[~found].astype(str)).tolist()
+            raise ValueError(f"Categorías desconocidas para '{col}': {unknown}")
+        return np.where(found, codes[pos_clipped], 0.0)
+
+
+def _to_float(value):
+    """Conversión numérica equivalente a pd.to_numeric(errors='coerce').fillna(0)."""
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if result != result else result
+
+
+def _to_float_array(values):
+    if values.dtype.kind in 'biuf':
+        result = values.astype(np.float64)
+    else:
+        try:
+            result = values.astype(np.float64)
+        except (TypeError, ValueError):
+            result = np.fromiter((_to_float(v) for v in values), dtype=np.float64, count=len(values))
+    result[np.isnan(result)] = 0.0
+    return result
+
+
+# Transformador compartido, reconstruido solo si cambian los artefactos
+_current = {"key": None, "transformer": None}
+
+
+def current_transformer(store=None):
+    """
+    Devuelve el FeatureTransformer de los artefactos actuales.
+    Se recompila únicamente cuando cambia el contenido de columns, encoders o scaler.
+    """
+    if store is None:
+        from tasa_churn.utils.artifacts import artifact_store as store
+    key = (id(store), store.digest("columns"), store.digest("encoders"), store.digest("scaler"))
+    if _current["key"] != key:
+        _current["transformer"] = FeatureTransformer.from_artifacts(store)
+        _current["key"] = key
+    return _current["transformer"]
+
+
+def current_model_and_transformer(store=None):
+    """
+    Modelo y FeatureTransformer construidos con el mismo scaler (ArtifactStore.model_and_scaler).
+    Si el scaler cambia entre las dos lecturas (un update a medias), se vuelven a leer.
+    """
+    if store is None:
+        from tasa_churn.utils.artifacts import artifact_store as store
+    while True:
+        model, scaler = store.model_and_scaler()
+        transformer = current_transformer(store)
+        if np.array_equal(transformer.scale, scaler.scale_) and np.array_equal(transformer.offset, scaler.min_):
+            return model, transformer
@@ -0,0 +1,95 @@
+# tasa_churn/features/validation.py
+import numpy as np
+import pandas as pd
+
+from tasa_churn.features.transformer import FeatureTransformer
+
+# Códigos de error por fila (bits de un uint8, se combinan con OR)
+MISSING_COLUMN = 1
+MISSING_VALUE = 2
+UNKNOWN_CATEGORY = 4
+NOT_NUMERIC = 8
+OUT_OF_RANGE = 16
+
+ERROR_LABELS = {
+    MISSING_COLUMN: "falta la columna",
+    MISSING_VALUE: "valor vacío",
+    UNKNOWN_CATEGORY: "categoría desconocida",
+    NOT_NUMERIC: "no numérico",
+    OUT_OF_RANGE: "fuera de rango",
+}
+
+
+class SchemaValidator:
+    """
+    Validación vectorizada de bloques de entrada, construida con columns, encoders y scaler.
+        - Comprueba cada columna de una vez para todo el bloque: columnas que faltan,
+          valores vacíos, categorías desconocidas (las mismas reglas que FeatureTransformer),
+          valores no numéricos y valores fuera del rango visto por el scaler (data_min_..data_max_).
+        - No lanza excepciones: devuelve una máscara de filas válidas y un código de error
+          por fila (bits de ERROR_LABELS), para puntuar las buenas y apartar las malas.
+        - check() da el detalle por columna (n_filas, n_columnas) y describe() lo pasa a texto.
+    """
+
+    def __init__(self, columns, encoders, scaler=None):
+        self.columns = list(columns)
+        self.transformer = FeatureTransformer(columns, encoders, scaler)
+        self.categorical = set(self.transformer.categorical_columns)
+        if scaler is None:
+            self.low = np.full(len(self.columns), -np.inf)
+            self.high = np.full(len(self.columns), np.inf)
+        else:
+            self.low = np.asarray(scaler.data_min_, dtype=np.float64)
+            self.high = np.asarray(scaler.data_max_, dtype=np.float64)
+
+    @classmethod
+    def from_artifacts(cls, store=None):
+        """Construye el validador con los artefactos de la caché (ArtifactStore)."""
+        if store is None:
+            from tasa_churn.utils.artifacts import artifact_store as store
+        return cls(store.columns, store.encoders, store.scaler)
+
+    def check(self, data, n_rows=None):
+        """
+        Códigos de error por fila y columna, array uint8 (n_filas, n_columnas).
+            - data: mapeo columna -> valores (DataFrame, dict de arrays, ...).
+            - n_rows: número de filas (por defecto, el de la primera columna presente).
+        """
+        if n_rows is None:
+            present = [col for col in self.columns if col in data]
+            n_rows = len(data[present[0]]) if present else len(data)
+        flags = np.zeros((n_rows, len(self.columns)), dtype=np.uint8)
+        for i, col in enumerate(self.columns):
+            if col not in data:
+                flags[:, i] = MISSING_COLUMN
+                continue
+            column = data[col]
+            missing = np.asarray(pd.isna(column), dtype=bool)
+            flags[missing, i] |= MISSING_VALUE
+
+            if col in self.categorical:
+                unknown = ~self.transformer.known_categories(col, column) & ~missing
+                flags[unknown, i] |= UNKNOWN_CATEGORY
+                continue
+
+            values = pd.to_numeric(pd.Series(np.asarray(column)), errors='coerce').to_numpy(dtype=np.float64)
+            invalid = np.isnan(values)
+            flags[invalid & ~missing, i] |= NOT_NUMERIC
+            with np.errstate(invalid='ignore'):
+                outside = (values < self.low[i]) | (values > self.high[i])
+            flags[outside, i] |= OUT_OF_RANGE
+        return flags
+
+    def validate(self, data, n_rows=None):
+        """Devuelve (máscara de filas válidas, código de error uint8 por fila)."""
+        errors = np.bitwise_or.reduce(self.check(data, n_rows), axis=1)
+        return errors == 0, errors
+
+    def describe(self, flags):
+        """Texto legible del detalle de check() para cada fila, p.ej. 'Gender: categoría desconocida'."""
+        rows, cols = np.nonzero(flags)
+        messages = [[] for _ in range(len(flags))]
+        for row, col in zip(rows, cols):
+            labels = [label for bit, label in ERROR_LABELS.items() if flags[row, col] & bit]
+            messages[row].append(f"{self.columns[col]}: {', '.join(labels)}")
+        return ["; ".join(m) for m in messages]
@@ -0,0 +1,81 @@
+# tasa_churn/models/explain.py
+import numpy as np
+
+from tasa_churn.models.flat_forest import FlatForest
+
+
+class ReasonExplainer:
+    """
+    Motivos de churn por cliente: contribución exacta de cada feature a la probabilidad
+    del bosque (descomposición por caminos de decisión, tipo Saabas).
+        - En cada nodo interno, la probabilidad de churn cambia de value[padre] a value[hijo];
+          ese cambio se atribuye a la feature del split. Sumando a lo largo del camino,
+          probabilidad = bias (media de las raíces) + suma de contribuciones, exacto.
+        - Trabaja sobre el FlatForest (arrays planos): todas las filas y árboles avanzan a la
+          vez max_depth pasos y las contribuciones se acumulan con un único bincount por paso.
+        - top_reasons devuelve arrays compactos (índice de feature int8 y contribución float32);
+          reason_names los traduce a los nombres de columns.joblib.
+    """
+
+    def __init__(self, forest, columns, positive=None):
+        self.forest = forest
+        self.columns = np.asarray(columns, dtype=object)
+        if positive is None:
+            classes = list(forest.classes_)
+            positive = classes.index(1) if 1 in classes else len(classes) - 1
+        # Probabilidad de churn de cada nodo y su cambio en cada arista (mismo orden que children)
+        self.node_value = np.ascontiguousarray(forest.value[:, positive], dtype=np.float64)
+        self.edge_delta = self.node_value[forest.children] - np.repeat(self.node_value, 2)
+        self.bias = float(self.node_value[forest.roots].mean())
+
+    @classmethod
+    def from_model(cls, model, columns):
+        """Explicador para un RandomForestClassifier / ExtraTreesClassifier (o un FlatForest)."""
+        if not isinstance(model, FlatForest) and not hasattr(model, "estimators_"):
+            raise ValueError(f"Los motivos solo están disponibles para bosques de árboles, no {type(model).__name__}")
+        forest = model if isinstance(model, FlatForest) else FlatForest.from_model(model)
+        return cls(forest, columns)
+
+    def contributions(self, X, chunk_size=4096):
+        """
+        Contribución de cada feature a la probabilidad de churn de cada fila: array (n_filas, n_features).
+        bias + contributions(X).sum(axis=1) == predict_proba(X)[:, churn].
+        """
+        forest = self.forest
+        X = np.asarray(X)
+        n_features = forest.n_features_in_
+        out = np.empty((len(X), n_features), dtype=np.float64)
+        for start in range(0, len(X), chunk_size):
+            block = np.ascontiguousarray(X[start:start + chunk_size], dtype=np.float32)
+            n_rows, n_trees = len(block), forest.n_estimators
+            flat_X = block.ravel()
+            row_base = np.repeat(np.arange(n_rows, dtype=np.int64) * n_features, n_trees)
+            node = np.tile(forest.roots.astype(np.int64), n_rows)
+            totals = np.zeros(n_rows * n_features, dtype=np.float64)
+            for _ in range(forest.max_depth):
+                slot = row_base + forest.feature[node]
+                edge = 2 * node + (flat_X[slot] > forest.threshold[node])
+                # En las hojas la arista apunta al propio nodo: la diferencia es 0
+                totals += np.bincount(slot, weights=self.edge_delta[edge], minlength=len(totals))
+                node = forest.children[edge]
+            out[start:start + n_rows] = totals.reshape(n_rows, n_features) / n_trees
+        return out
+
+    def top_reasons(self, X, k=3, chunk_size=4096):
+        """
+        Las k features que más suben la probabilidad de churn de cada fila, de mayor a menor.
+        Devuelve (índices int8 (n_filas, k), contribuciones float32 (n_filas, k)).
+        """
+        k = min(k, self.forest.n_features_in_)
+        contrib = self.contributions(X, chunk_size)
+        # argpartition: O(n_features) por fila; solo se ordenan las k elegidas
+        top = np.argpartition(-contrib, k - 1, axis=1)[:, :k]
+        values = np.take_along_axis(contrib, top, axis=1)
+        order = np.argsort(-values, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        values = np.take_along_axis(values, order, axis=1)
+        return top.astype(np.int8), values.astype(np.float32)
+
+    def reason_names(self, indices):
+        """Nombres de columna de los índices de top_reasons (mismo shape)."""
+        return self.columns[indices]
@@ -0,0 +1,153 @@
+# tasa_churn/models/flat_forest.py
+import json
+import os
+import shutil
+
+import numpy as np
+
+_ARRAYS = ("feature", "threshold", "children", "value", "roots")
+
+
+class FlatForest:
+    """
+    Ensemble de árboles aplanado en arrays contiguos de NumPy.
+        - Todos los nodos de todos los árboles van en los mismos arrays (índices globales):
+          feature, threshold, children (hijo izquierdo y derecho intercalados) y value
+          (probabilidad por clase de cada nodo).
+        - Las hojas apuntan a sí mismas (ambos hijos = nodo, threshold = +inf), así la
+          predicción avanza todas las filas y árboles a la vez durante max_depth pasos
+          sin ramas por nodo: nodo = children[2 * nodo + (x > threshold)].
+        - Los umbrales se guardan en float32 redondeados hacia abajo, que para entradas
+          float32 (como hace sklearn) da exactamente las mismas decisiones que el float64.
+        - Se guarda como un directorio de .npy que se puede abrir con mmap: varios
+          procesos comparten la misma copia del modelo en la caché de páginas.
+        - predict_proba coincide con el de sklearn (promedio de los árboles).
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, classes, max_depth, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.classes_ = np.asarray(classes)
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features)
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @classmethod
+    def from_model(cls, model):
+        """Aplana un RandomForestClassifier / ExtraTreesClassifier ya entrenado."""
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise ValueError("Solo se admiten modelos de una única salida.")
+
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            own = np.arange(offset, offset + n, dtype=np.int32)
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(_round_down_float32(np.where(is_leaf, np.inf, tree.threshold)))
+            pair = np.empty(2 * n, dtype=np.int32)
+            pair[0::2] = np.where(is_leaf, own, tree.children_left + offset)
+            pair[1::2] = np.where(is_leaf, own, tree.children_right + offset)
+            children.append(pair)
+
+            # Probabilidades por clase en cada nodo, normalizadas como en DecisionTreeClassifier
+            value = tree.value[:, 0, :model.n_classes_].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            children=np.concatenate(children),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=model.classes_,
+            max_depth=max_depth,
+            n_features=model.n_features_in_,
+        )
+
+    def save(self, path):
+        """Guarda el modelo como directorio de .npy + meta.json (escritura atómica)."""
+        tmp_path = path.with_name(path.name + ".tmp")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+        for name in _ARRAYS:
+            np.save(tmp_path / f"{name}.npy", getattr(self, name))
+        meta = {
+            "classes": self.classes_.tolist(),
+            "max_depth": self.max_depth,
+            "n_features": self.n_features_in_,
+            "n_estimators": self.n_estimators,
+        }
+        (tmp_path / "meta.json").write_text(json.dumps(meta, indent=2))
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Abre un modelo aplanado; con mmap=True los arrays no se copian a memoria."""
+        meta = json.loads((path / "meta.json").read_text())
+        mode = "r" if mmap else None
+        arrays = {name: np.asarray(np.load(path / f"{name}.npy", mmap_mode=mode)) for name in _ARRAYS}
+        return cls(classes=meta["classes"], max_depth=meta["max_depth"], n_features=meta["n_features"], **arrays)
+
+    def apply(self, X):
+        """Índice global de la hoja alcanzada por cada fila en cada árbol: array (n_filas, n_árboles)."""
+        # sklearn compara siempre en float32
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_trees = len(X), self.n_estimators
+        flat_X = X.ravel()
+        row_base = np.repeat(np.arange(n_rows, dtype=np.int64) * X.shape[1], n_trees)
+        node = np.tile(self.roots.astype(np.int64), n_rows)
+        for _ in range(self.max_depth):
+            go_right = flat_X[row_base + self.feature[node]] > self.threshold[node]
+            node = self.children[2 * node + go_right]
+        return node.reshape(n_rows, n_trees)
+
+    def predict_proba(self, X, chunk_size=4096):
+        """Probabilidad por clase (promedio de los árboles), procesando por bloques de filas."""
+        X = np.asarray(X)
+        out = np.empty((len(X), len(self.classes_)), dtype=np.float64)
+        for start in range(0, len(X), chunk_size):
+            leaves = self.apply(X[start:start + chunk_size])
+            out[start:start + chunk_size] = self.value[leaves].sum(axis=1) / self.n_estimators
+        return out
+
+    def predict(self, X, chunk_size=4096):
+        return self.classes_[np.argmax(self.predict_proba(X, chunk_size), axis=1)]
+
+
+def _round_down_float32(values):
+    """Mayor float32 <= cada valor: x32 <= t64 equivale a x32 <= t32 para cualquier x32."""
+    rounded = values.astype(np.float32)
+    too_big = rounded.astype(np.float64) > values
+    rounded[too_big] = np.nextafter(rounded[too_big], np.float32(-np.inf))
+    return rounded
+
+
+def export_forest(model, path):
+    """Convierte un bosque de sklearn al formato plano y lo guarda en path."""
+    flat = FlatForest.from_model(model)
+    flat.save(path)
+    print(f"--> Modelo aplanado guardado en {path} ({flat.n_estimators} árboles, {flat.n_nodes} nodos)")
+    return flat
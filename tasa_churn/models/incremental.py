@@ -0,0 +1,122 @@
+# tasa_churn/models/incremental.py
+import copy
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from tasa_churn.features.build_features import DROP_COLUMNS
+from tasa_churn.features.transformer import FeatureTransformer
+from tasa_churn.utils.artifacts import ArtifactStore, MODEL_NAME, artifact_store, save_model
+from tasa_churn.utils.instrument import stage
+from tasa_churn.utils.paths import ARTIFACTS_DIR, MODELS_DIR
+
+
+def rescale_thresholds(model, old_scale, old_offset, new_scale, new_offset):
+    """
+    Reescribe (in situ) los umbrales de los árboles ya entrenados para el nuevo escalado.
+    El MinMaxScaler es afín y creciente en cada feature (x' = x * scale + offset), así que
+    la condición x_old <= t equivale a x_new <= new_scale * (t - old_offset) / old_scale + new_offset:
+    los árboles antiguos siguen tomando las mismas decisiones. Solo pueden cambiar
+    valores que caen a menos de un ulp de float32 del umbral (sklearn compara X en float32).
+    """
+    factor = np.asarray(new_scale, dtype=np.float64) / np.asarray(old_scale, dtype=np.float64)
+    shift = np.asarray(new_offset, dtype=np.float64) - factor * np.asarray(old_offset, dtype=np.float64)
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        split = tree.children_left != -1
+        features = tree.feature[split]
+        # tree_.threshold es una vista de escritura sobre los nodos del árbol
+        tree.threshold[split] = tree.threshold[split] * factor[features] + shift[features]
+
+
+def _prepare_new_rows(df, target_col, transformer, dedup=None):
+    """Mismas limpiezas que preprocess_data y codificación con los encoders ya guardados."""
+    if dedup is None:
+        df = df.drop_duplicates().dropna()
+    else:
+        df = df.dropna()
+        df = df[dedup.filter(df)]
+    df = df.drop(columns=[c for c in DROP_COLUMNS if c in df.columns])
+    if target_col not in df.columns:
+        raise ValueError(f"Los datos nuevos deben incluir la columna objetivo '{target_col}'")
+    y = df[target_col].to_numpy()
+    X_raw = transformer.encode_batch(df)
+    return X_raw, y
+
+
+def _dump_tmp(value, path):
+    tmp_path = path.with_name(path.name + ".tmp")
+    joblib.dump(value, tmp_path)
+    return tmp_path
+
+
+def update_model(df_new, target_col='Churn', n_new_trees=20, max_trees=None,
+                 artifacts_dir=ARTIFACTS_DIR, models_dir=MODELS_DIR, model_name=MODEL_NAME, dedup=None):
+    """
+    Actualiza el modelo con filas nuevas sin re-entrenar con todo el histórico.
+        - Codifica las filas nuevas con los encoders existentes (no cambian).
+        - Actualiza data_min_/data_max_ del MinMaxScaler con partial_fit y ajusta los
+          umbrales de los árboles antiguos al nuevo escalado (mismas predicciones).
+        - Añade n_new_trees árboles entrenados solo con las filas nuevas (warm_start).
+        - max_trees: si el bosque supera ese tamaño, retira los árboles más antiguos.
+        - dedup: DedupIndex para descartar filas ya usadas en entregas anteriores
+          (se guarda solo si la actualización termina bien).
+        - Escribe scaler y modelo en ficheros temporales y los sustituye con os.replace:
+          un lector nunca ve un fichero a medio escribir. El modelo lleva el hash del nuevo
+          scaler y se sustituye primero: entre los dos os.replace el par no coincide y
+          ArtifactStore.model_and_scaler espera en lugar de mezclar versiones.
+    El coste es proporcional al tamaño del lote nuevo.
+    Devuelve un dict con filas usadas, árboles añadidos/retirados, total y segundos.
+    """
+    start = time.perf_counter()
+    store = ArtifactStore(artifacts_dir, models_dir, model_name)
+    columns, encoders = store.columns, store.encoders
+    old_model, old_scaler = store.model_and_scaler()
+    print(f"--> Actualizando {model_name} con {len(df_new)} filas nuevas...")
+
+    with stage("update:encode", rows=len(df_new)):
+        X_raw, y = _prepare_new_rows(df_new, target_col, FeatureTransformer(columns, encoders, old_scaler), dedup)
+    if len(X_raw) == 0:
+        raise ValueError("No quedan filas nuevas tras eliminar duplicados y nulos")
+    missing = set(old_model.classes_) - set(np.unique(y))
+    if missing:
+        raise ValueError(f"El lote nuevo debe contener todas las clases; faltan: {sorted(missing)}")
+
+    # Copias: si algo falla a mitad, los objetos de la caché siguen intactos
+    scaler = copy.deepcopy(old_scaler)
+    model = copy.deepcopy(old_model)
+
+    with stage("update:scale", rows=len(X_raw)):
+        scaler.partial_fit(pd.DataFrame(X_raw, columns=columns))
+        rescale_thresholds(model, old_scaler.scale_, old_scaler.min_, scaler.scale_, scaler.min_)
+        X_new = pd.DataFrame(FeatureTransformer(columns, encoders, scaler).scale_encoded(X_raw), columns=columns)
+
+    n_old = len(model.estimators_)
+    with stage("update:fit", rows=len(X_new)):
+        model.set_params(warm_start=True, n_estimators=n_old + n_new_trees)
+        model.fit(X_new, y)
+        model.set_params(warm_start=False)
+
+    retired = 0
+    if max_trees is not None and len(model.estimators_) > max_trees:
+        retired = len(model.estimators_) - max_trees
+        model.estimators_ = model.estimators_[retired:]
+        model.n_estimators = len(model.estimators_)
+
+    with stage("update:save"):
+        scaler_path, model_path = store.paths["scaler"], store.paths["model"]
+        tmp_scaler = _dump_tmp(scaler, scaler_path)
+        save_model(model, model_path, scaler_path=tmp_scaler)
+        os.replace(tmp_scaler, scaler_path)
+    artifact_store.invalidate()
+    if dedup is not None:
+        dedup.commit()
+
+    seconds = time.perf_counter() - start
+    print(f"    Árboles añadidos: {n_new_trees}, retirados: {retired}, total: {len(model.estimators_)}")
+    print(f"    Actualización completada en {seconds:.2f}s")
+    return {"rows": len(X_new), "added": n_new_trees, "retired": retired,
+            "n_trees": len(model.estimators_), "seconds": seconds}
@@ -0,0 +1,229 @@
+# tasa_churn/models/lookup_table.py
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from tasa_churn.utils.artifacts import artifact_store
+
+# Probabilidad cuantizada en uint8: p ~= código / 255 (error máximo 1/510)
+_LEVELS = 255
+
+
+class LookupTableScorer:
+    """
+    Tabla precalculada con la probabilidad de churn de cada combinación de features.
+        - Tras los drops de preprocess_data todas las features son enteros de rango pequeño
+          o categorías: la rejilla completa (mínimo..máximo observado de cada feature,
+          ~17.7M celdas con el dataset de churn) cabe en unos MB como uint8.
+        - Se construye recorriendo las hojas de cada árbol: cada hoja cubre una caja de la
+          rejilla y se suma su probabilidad a toda la caja (no se llama a predict_proba).
+          Los umbrales se traducen a índices de la rejilla con la misma comparación en
+          float32 que usa sklearn.
+        - Se usa como un modelo: predict_proba(X) recibe X escalado, recupera los enteros
+          originales y hace una búsqueda O(1) por fila. Las filas fuera de la rejilla
+          (valores no enteros o fuera de rango) van al modelo real.
+        - Se guarda como directorio (table.npy + meta.json) y se abre con mmap.
+    """
+
+    def __init__(self, table, mins, columns, scale, offset, classes, model=None, meta=None):
+        self.table = table
+        self.mins = np.asarray(mins, dtype=np.int64)
+        self.shape = np.asarray(table.shape, dtype=np.int64)
+        self.columns = list(columns)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.offset = np.asarray(offset, dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+        self.model = model
+        self.meta = meta or {}
+        self._flat = table.reshape(-1)
+
+    @classmethod
+    def build(cls, model, scaler, columns, max_cells=50_000_000):
+        """Evalúa el bosque sobre la rejilla data_min_..data_max_ del scaler (enteros)."""
+        mins = np.floor(scaler.data_min_).astype(np.int64)
+        maxs = np.ceil(scaler.data_max_).astype(np.int64)
+        shape = tuple(int(n) for n in maxs - mins + 1)
+        n_cells = int(np.prod(shape, dtype=np.int64))
+        if n_cells > max_cells:
+            raise ValueError(f"La rejilla tiene {n_cells} celdas (máximo {max_cells})")
+        print(f"--> Materializando el modelo sobre {n_cells:,} combinaciones {shape}...")
+
+        # Valor escalado de cada punto de la rejilla, tal y como lo verá el árbol (float32)
+        scale, offset = scaler.scale_, scaler.min_
+        grid_values = [((mins[f] + np.arange(n)) * scale[f] + offset[f]).astype(np.float32).astype(np.float64)
+                       for f, n in enumerate(shape)]
+
+        positive = list(model.classes_).index(1) if 1 in model.classes_ else len(model.classes_) - 1
+        # Se acumula con las features más largas como ejes interiores (sumas por cajas más contiguas)
+        order = np.argsort(shape, kind="stable")
+        sums = np.zeros([shape[f] for f in order], dtype=np.float32)
+        for estimator in model.estimators_:
+            _add_tree(sums, estimator.tree_, grid_values, positive, order)
+        sums /= len(model.estimators_)
+        sums = sums.transpose(np.argsort(order))
+
+        table = np.ascontiguousarray(np.rint(sums * _LEVELS).astype(np.uint8))
+        return cls(table, mins, columns, scale, offset, model.classes_, model=model)
+
+    # --- Predicción ----------------------------------------------------------
+
+    def grid_index(self, X):
+        """Índice plano en la tabla de cada fila de X (escalado) y máscara de filas dentro de la rejilla."""
+        X = np.asarray(X)
+        raw = (X.astype(np.float64) - self.offset) / self.scale
+        rounded = np.rint(raw)
+        idx = rounded.astype(np.int64) - self.mins
+        inside = ((idx >= 0) & (idx < self.shape)).all(axis=1)
+        # Dentro de la rejilla solo si el árbol vería exactamente el punto de la rejilla (en float32)
+        on_grid = X.astype(np.float32) == (rounded * self.scale + self.offset).astype(np.float32)
+        inside &= on_grid.all(axis=1)
+        flat = np.zeros(len(idx), dtype=np.int64)
+        if inside.any():
+            flat[inside] = np.ravel_multi_index(tuple(idx[inside].T), tuple(self.shape))
+        return flat, inside
+
+    def predict_positive(self, X):
+        """Probabilidad de churn de cada fila (tabla o, fuera de la rejilla, el modelo real)."""
+        flat, inside = self.grid_index(X)
+        probs = self._flat[flat].astype(np.float64) / _LEVELS
+        if not inside.all():
+            if self.model is None:
+                raise ValueError(f"{(~inside).sum()} filas fuera de la rejilla y no hay modelo de respaldo")
+            outside = _frame(self.model, np.asarray(X)[~inside])
+            positive = list(self.model.classes_).index(1) if 1 in self.model.classes_ else -1
+            probs[~inside] = self.model.predict_proba(outside)[:, positive]
+        return probs
+
+    def predict_proba(self, X):
+        p = self.predict_positive(X)
+        return np.column_stack([1 - p, p])
+
+    def predict(self, X):
+        return self.classes_[(self.predict_positive(X) > 0.5).astype(int)]
+
+    def validate(self, X_test):
+        """Compara con model.predict_proba sobre X_test (p.ej. el split de test)."""
+        X_test = np.asarray(X_test, dtype=np.float64)
+        _, inside = self.grid_index(X_test)
+        expected = self.model.predict_proba(_frame(self.model, X_test))[:, list(self.model.classes_).index(1)]
+        got = self.predict_positive(X_test)
+        error = np.abs(got - expected)
+        return {
+            "rows": len(X_test),
+            "coverage": float(inside.mean()) if len(X_test) else 0.0,
+            "max_abs_error": float(error.max()) if len(X_test) else 0.0,
+            "mean_abs_error": float(error.mean()) if len(X_test) else 0.0,
+            "prediction_agreement": float(((got > 0.5) == (expected > 0.5)).mean()) if len(X_test) else 1.0,
+        }
+
+    # --- Guardado ------------------------------------------------------------
+
+    def save(self, path, **meta):
+        """Guarda table.npy y meta.json en el directorio path (escritura atómica)."""
+        tmp_path = path.with_name(path.name + ".tmp")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+        np.save(tmp_path / "table.npy", self.table)
+        self.meta = {
+            "mins": self.mins.tolist(),
+            "columns": self.columns,
+            "scale": self.scale.tolist(),
+            "offset": self.offset.tolist(),
+            "classes": self.classes_.tolist(),
+            "levels": _LEVELS,
+            **meta,
+        }
+        (tmp_path / "meta.json").write_text(json.dumps(self.meta, indent=2))
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path, model=None, mmap=True):
+        meta = json.loads((path / "meta.json").read_text())
+        table = np.load(path / "table.npy", mmap_mode="r" if mmap else None)
+        return cls(table, meta["mins"], meta["columns"], meta["scale"], meta["offset"], meta["classes"],
+                   model=model, meta=meta)
+
+
+def _frame(model, X):
+    # Con los nombres de columna del entrenamiento (evita el aviso de sklearn)
+    names = getattr(model, "feature_names_in_", None)
+    return X if names is None else pd.DataFrame(X, columns=names)
+
+
+def _add_tree(sums, tree, grid_values, positive, order):
+    """
+    Suma la probabilidad de cada hoja del árbol a su caja de la rejilla.
+    Los ejes de sums siguen 'order' (feature del eje i = order[i]).
+    """
+    value = tree.value[:, 0, :]
+    proba = value[:, positive] / value.sum(axis=1)
+    left, right = tree.children_left, tree.children_right
+    axis_of = np.argsort(order)
+    feature = np.where(left == -1, 0, axis_of[np.maximum(tree.feature, 0)])
+    threshold = tree.threshold
+    grid_values = [grid_values[f] for f in order]
+
+    lows = [0] * sums.ndim
+    highs = list(sums.shape)
+    stack = [(0, lows, highs)]
+    while stack:
+        node, lo, hi = stack.pop()
+        if left[node] == -1:
+            sums[tuple(slice(a, b) for a, b in zip(lo, hi))] += proba[node]
+            continue
+        f = feature[node]
+        # Puntos de la rejilla que van a la izquierda: x <= threshold
+        cut = int(np.searchsorted(grid_values[f], threshold[node], side="right"))
+        if cut > lo[f]:
+            child_hi = list(hi)
+            child_hi[f] = min(hi[f], cut)
+            stack.append((left[node], lo, child_hi))
+        if cut < hi[f]:
+            child_lo = list(lo)
+            child_lo[f] = max(lo[f], cut)
+            stack.append((right[node], child_lo, hi))
+
+
+def default_path(store=artifact_store):
+    return store.paths["model"].with_suffix(".lut")
+
+
+def materialize(store=artifact_store, path=None, X_test=None, validate_rows=200_000):
+    """
+    Construye y guarda la tabla del modelo actual (por defecto models/RandomForest.lut).
+    Si se da X_test, valida las primeras validate_rows filas contra model.predict_proba
+    y guarda el resultado en meta.json.
+    """
+    model, scaler = store.model_and_scaler()
+    scorer = LookupTableScorer.build(model, scaler, store.columns)
+    meta = {"model_digest": store.digest("model"), "scaler_digest": store.digest("scaler")}
+    if X_test is not None:
+        meta["validation"] = scorer.validate(X_test[:validate_rows])
+        v = meta["validation"]
+        print(f"    Validación sobre {v['rows']} filas: cobertura {v['coverage']:.1%}, "
+              f"error máx. {v['max_abs_error']:.4f}, medio {v['mean_abs_error']:.5f}, "
+              f"mismas predicciones {v['prediction_agreement']:.2%}")
+    path = scorer.save(path or default_path(store), **meta)
+    print(f"    Tabla guardada en {path} ({scorer.table.nbytes / 1e6:.1f} MB)")
+    return scorer
+
+
+def load_lookup(store=artifact_store, path=None):
+    """
+    Abre la tabla del modelo actual con mmap (el modelo real queda como respaldo).
+    Devuelve None si no existe o si se generó con otro modelo/scaler.
+    """
+    path = path or default_path(store)
+    if not (path / "meta.json").exists():
+        return None
+    scorer = LookupTableScorer.load(path, model=store.model)
+    if (scorer.meta.get("model_digest"), scorer.meta.get("scaler_digest")) != \
+            (store.digest("model"), store.digest("scaler")):
+        print(f"    Aviso: {path} no corresponde al modelo actual, se ignora.")
+        return None
+    return scorer
@@ -1,16 +1,172 @@
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
 from sklearn.metrics import classification_report, confusion_matrix
 
-def evaluate_models(models, X_test, y_test):
+from tasa_churn.features.drift import DriftMonitor
+from tasa_churn.features.transformer import FeatureTransformer
+from tasa_churn.features.validation import SchemaValidator
+from tasa_churn.utils.artifacts import artifact_store
+from tasa_churn.utils.instrument import stage
+from tasa_churn.utils.memory import peak_memory_mb
+
+def evaluate_models(models, X_test, y_test, chunk_size=None):
     """
     Evalúa los modelos entrenados y muestra métricas.
+    chunk_size: predice por bloques (p.ej. X_test mapeado en memoria más grande que la RAM).
     """
     print("--> Evaluando modelos...")
-    
+
     for name, model in models.items():
         print(f"\n{'='*10} Reporte para: {name} {'='*10}")
-        predictions = model.predict(X_test)
-        
+        with stage(f"evaluate:{name}", rows=len(X_test)):
+            if chunk_size is None:
+                predictions = model.predict(X_test)
+            else:
+                predictions = np.concatenate([model.predict(_block(model, X_test, i, chunk_size))
+                                              for i in range(0, len(X_test), chunk_size)])
+            matrix = confusion_matrix(y_test, predictions)
+            report = classification_report(y_test, predictions)
+
         print("Confusion Matrix:")
-        print(confusion_matrix(y_test, predictions))
+        print(matrix)
         print("\nClassification Report:")
-        print(classification_report(y_test, predictions))
\ No newline at end of file
+        print(report)
+
+def _block(model, X, start, size):
+    """Bloque de filas de X; si X es un array y el modelo tiene nombres de columnas, como DataFrame."""
+    block = X[start:start + size]
+    if isinstance(block, np.ndarray) and hasattr(model, 'feature_names_in_'):
+        block = pd.DataFrame(block, columns=model.feature_names_in_, copy=False)
+    return block
+
+def score_csv(input_path, output_path, model=None, chunk_size=100_000, id_col='CustomerID', reject_path=None,
+              reasons=0, monitor_drift=True, drift_path=None):
+    """
+    Puntúa un CSV completo de clientes por bloques, con memoria acotada.
+        - Lee el CSV en bloques de chunk_size filas (solo las columnas necesarias).
+        - Valida cada bloque de forma vectorizada (SchemaValidator): las filas con errores
+          no se puntúan y se apartan en reject_path con su código y descripción del error.
+        - Aplica encoders y scaler vectorizados sobre las filas válidas (FeatureTransformer).
+        - Llama a predict_proba una sola vez por bloque.
+        - Escribe las puntuaciones en output_path de forma incremental.
+        - model: modelo ya cargado; si es None se usa el de la caché de artefactos.
+        - reject_path: por defecto, output_path con sufijo '.rejects.csv'.
+        - reasons: si es > 0, añade los k motivos principales de cada fila (reason_i con el nombre
+          de la feature y reason_i_value con su contribución a la probabilidad; ver explain.py).
+        - monitor_drift: suma cada bloque al monitor de drift (DriftMonitor, si hay referencia
+          guardada) y escribe PSI, KS y tasa de fuera de rango por feature en drift_path
+          (por defecto, output_path con sufijo '.drift.json').
+        - return: dict con filas, rechazadas, segundos, filas/segundo y pico de memoria (MB).
+    """
+    print(f"--> Puntuando {input_path} por bloques de {chunk_size} filas...")
+    start = time.perf_counter()
+
+    # Modelo, transformador, validador y monitor con el mismo scaler aunque un update lo sustituya
+    if model is None:
+        model, scaler = artifact_store.model_and_scaler()
+    else:
+        scaler = artifact_store.scaler
+    transformer = FeatureTransformer(artifact_store.columns, artifact_store.encoders, scaler)
+    validator = SchemaValidator(artifact_store.columns, artifact_store.encoders, scaler)
+    columns = transformer.columns
+    if reject_path is None:
+        reject_path = Path(output_path).with_suffix(".rejects.csv")
+    monitor = DriftMonitor.from_artifacts(artifact_store, scaler=scaler) if monitor_drift else None
+    if monitor_drift and monitor is None:
+        print("    Sin referencia de drift para estos artefactos (se genera al entrenar): no se monitoriza.")
+    if drift_path is None:
+        drift_path = Path(output_path).with_suffix(".drift.json")
+
+    # Solo leemos el identificador (si existe) y las columnas del modelo presentes en el CSV
+    header = pd.read_csv(input_path, nrows=0).columns
+    has_id = id_col is not None and id_col in header
+    usecols = ([id_col] if has_id else []) + [c for c in columns if c in header]
+
+    positive = list(model.classes_).index(1) if 1 in model.classes_ else -1
+    explainer = None
+    if reasons > 0:
+        from tasa_churn.models.explain import ReasonExplainer
+        # Con la tabla precalculada se explica el bosque del que sale
+        explainer = ReasonExplainer.from_model(getattr(model, 'model', None) or model, columns)
+    n_rows = n_rejected = n_scored = 0
+    # Ambos ficheros se crean al escribir la primera fila: los de una ejecución anterior no deben quedar
+    for path in (output_path, reject_path):
+        Path(path).unlink(missing_ok=True)
+
+    reader = pd.read_csv(input_path, usecols=usecols, chunksize=chunk_size)
+    for chunk in reader:
+        flags = validator.check(chunk, n_rows=len(chunk))
+        errors = np.bitwise_or.reduce(flags, axis=1)
+        valid = errors == 0
+        n_rows += len(chunk)
+
+        if not valid.all():
+            rejects = chunk[~valid].copy()
+            rejects['error_code'] = errors[~valid]
+            rejects['errors'] = validator.describe(flags[~valid])
+            rejects.to_csv(reject_path, mode='w' if n_rejected == 0 else 'a',
+                           header=(n_rejected == 0), index=False)
+            n_rejected += len(rejects)
+            chunk = chunk[valid]
+        if not len(chunk):
+            if monitor is not None:
+                monitor.update(None, flags)
+            continue
+
+        X = transformer.transform_batch(chunk)
+        if monitor is not None:
+            monitor.update(X, flags)
+        # Con los nombres de columnas con los que se entrenó (evita el aviso de sklearn)
+        if hasattr(model, 'feature_names_in_'):
+            probs = model.predict_proba(pd.DataFrame(X, columns=columns, copy=False))
+        else:
+            probs = model.predict_proba(X)
+
+        scores = pd.DataFrame({
+            'churn_probability': probs[:, positive],
+            'churn_prediction': model.classes_[np.argmax(probs, axis=1)],
+        })
+        if has_id:
+            scores.insert(0, id_col, chunk[id_col].to_numpy())
+        if explainer is not None:
+            top, values = explainer.top_reasons(X, k=reasons)
+            names = explainer.reason_names(top)
+            for i in range(top.shape[1]):
+                scores[f'reason_{i + 1}'] = names[:, i]
+                scores[f'reason_{i + 1}_value'] = values[:, i]
+
+        scores.to_csv(output_path, mode='w' if n_scored == 0 else 'a', header=(n_scored == 0), index=False)
+        n_scored += len(chunk)
+
+    if n_scored == 0:
+        # Todas las filas rechazadas: salida vacía, solo con la cabecera
+        header = ([id_col] if has_id else []) + ['churn_probability', 'churn_prediction']
+        for i in range(reasons if explainer is not None else 0):
+            header += [f'reason_{i + 1}', f'reason_{i + 1}_value']
+        pd.DataFrame(columns=header).to_csv(output_path, index=False)
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        'rows': n_rows,
+        'rejected': n_rejected,
+        'seconds': elapsed,
+        'rows_per_sec': n_rows / elapsed if elapsed > 0 else float('inf'),
+        'peak_memory_mb': peak_memory_mb(),
+    }
+
+    if monitor is not None:
+        monitor.save(drift_path)
+        stats['drift_alerts'] = monitor.alerts()
+
+    if n_rejected:
+        print(f"    Filas rechazadas: {n_rejected} (detalle en {reject_path})")
+    print(f"    Filas puntuadas: {n_scored} en {elapsed:.2f}s ({stats['rows_per_sec']:,.0f} filas/s)")
+    if stats['peak_memory_mb'] is not None:
+        print(f"    Pico de memoria: {stats['peak_memory_mb']:.1f} MB")
+    if stats.get('drift_alerts'):
+        print(f"    Aviso de drift en: {', '.join(stats['drift_alerts'])} (detalle en {drift_path})")
+    print(f"    Resultados guardados en {output_path}")
+    return stats
@@ -0,0 +1,152 @@
+# tasa_churn/models/spark_scoring.py
+import time
+
+import numpy as np
+import pandas as pd
+
+from tasa_churn.features.transformer import FeatureTransformer
+from tasa_churn.features.validation import SchemaValidator
+from tasa_churn.utils.artifacts import artifact_store
+
+# Objetos reconstruidos en cada proceso worker de Python: clave de artefactos -> objetos
+_worker_cache = {}
+
+
+def spark_session(master="local[*]", app_name="tasa_churn", **config):
+    """
+    Crea (o reutiliza) una SparkSession con Arrow activado para los pandas UDF.
+    pyspark es opcional (extra 'ml'); sin él se lanza ImportError con la instrucción de instalación.
+    """
+    try:
+        from pyspark.sql import SparkSession
+    except ImportError as e:
+        raise ImportError("El backend Spark necesita pyspark: pip install 'tasa_churn[ml]'") from e
+    builder = SparkSession.builder.master(master).appName(app_name) \
+        .config("spark.sql.execution.arrow.pyspark.enabled", "true")
+    for key, value in config.items():
+        builder = builder.config(key, value)
+    return builder.getOrCreate()
+
+
+def broadcast_artifacts(spark, store=artifact_store):
+    """
+    Envía columns, encoders, scaler y modelo a los executors con un único broadcast.
+    Cada proceso worker lo deserializa una vez y lo reutiliza en todas sus particiones.
+    """
+    artifacts = {name: store.get(name) for name in ("columns", "encoders", "scaler", "model")}
+    artifacts["key"] = tuple(store.digest(name) for name in ("columns", "encoders", "scaler", "model"))
+    return spark.sparkContext.broadcast(artifacts)
+
+
+def _worker_objects(broadcast):
+    """Transformador, validador y modelo del broadcast, construidos una vez por proceso worker."""
+    artifacts = broadcast.value
+    objects = _worker_cache.get(artifacts["key"])
+    if objects is None:
+        columns, encoders, scaler, model = (artifacts[n] for n in ("columns", "encoders", "scaler", "model"))
+        positive = list(model.classes_).index(1) if 1 in model.classes_ else -1
+        objects = (FeatureTransformer(columns, encoders, scaler), SchemaValidator(columns, encoders, scaler),
+                   model, positive)
+        _worker_cache.clear()
+        _worker_cache[artifacts["key"]] = objects
+    return objects
+
+
+def score_batch(batch, transformer, validator, model, positive, id_col=None):
+    """
+    Puntúa un bloque pandas como score_csv: valida, transforma las filas válidas y llama
+    a predict_proba una vez. Las filas inválidas quedan con probabilidad y predicción nulas
+    y su código de error (validation.ERROR_LABELS).
+    """
+    valid, errors = validator.validate(batch, n_rows=len(batch))
+    probabilities = np.full(len(batch), np.nan)
+    predictions = pd.array(np.zeros(len(batch), dtype=np.int32), dtype="Int32")
+    predictions[~valid] = pd.NA
+    if valid.any():
+        rows = batch[valid] if not valid.all() else batch
+        X = transformer.transform_batch(rows)
+        if hasattr(model, 'feature_names_in_'):
+            X = pd.DataFrame(X, columns=transformer.columns, copy=False)
+        probs = model.predict_proba(X)
+        probabilities[valid] = probs[:, positive]
+        predictions[valid] = model.classes_[np.argmax(probs, axis=1)].astype(np.int32)
+
+    scores = pd.DataFrame({
+        'churn_probability': probabilities,
+        'churn_prediction': predictions,
+        'error_code': errors.astype(np.int32),
+    })
+    if id_col is not None:
+        scores.insert(0, id_col, batch[id_col].to_numpy())
+    return scores
+
+
+def score_spark_df(sdf, broadcast, id_col='CustomerID'):
+    """
+    Puntúa un DataFrame de Spark con un pandas UDF vectorizado (mapInPandas): Spark pasa
+    cada partición en bloques Arrow y cada bloque se puntúa con score_batch.
+    Devuelve un DataFrame de Spark (perezoso) con id, churn_probability, churn_prediction y error_code.
+    """
+    columns = broadcast.value["columns"]
+    has_id = id_col is not None and id_col in sdf.columns
+    id_type = dict(sdf.dtypes)[id_col] if has_id else None
+    schema = (f"`{id_col}` {id_type}, " if has_id else "") + \
+        "churn_probability double, churn_prediction int, error_code int"
+
+    def score_partition(batches):
+        transformer, validator, model, positive = _worker_objects(broadcast)
+        for batch in batches:
+            yield score_batch(batch, transformer, validator, model, positive, id_col if has_id else None)
+
+    selected = ([id_col] if has_id else []) + [c for c in columns if c in sdf.columns]
+    return sdf.select(*[f"`{c}`" for c in selected]).mapInPandas(score_partition, schema)
+
+
+def csv_schema(input_path, categorical, id_col='CustomerID'):
+    """
+    Esquema DDL para leer el CSV sin inferSchema (que haría una pasada extra):
+    categorías como string, identificador como long y el resto como double.
+    Los valores no numéricos llegan como nulos y el validador los marca como vacíos.
+    """
+    header = pd.read_csv(input_path, nrows=0).columns
+    types = {c: "string" if c in categorical else "long" if c == id_col else "double" for c in header}
+    return ", ".join(f"`{c}` {t}" for c, t in types.items())
+
+
+def score_csv_spark(input_path, output_path, spark=None, master="local[*]", store=artifact_store,
+                    id_col='CustomerID', partition_by=("churn_prediction",)):
+    """
+    Puntúa un CSV con Spark (por defecto en local[*], sin clúster) y escribe Parquet particionado.
+        - Los artefactos se envían una sola vez por executor (broadcast_artifacts).
+        - Se puntúa con el mismo código que score_csv (FeatureTransformer + SchemaValidator),
+          en un pandas UDF por bloques Arrow.
+        - partition_by: columnas de partición del Parquet (por defecto churn_prediction;
+          las filas inválidas van a la partición de nulos).
+    Devuelve un dict con filas, segundos, filas/segundo y núcleos usados.
+    """
+    spark = spark or spark_session(master)
+    print(f"--> Puntuando {input_path} con Spark ({spark.sparkContext.master})...")
+    start = time.perf_counter()
+
+    broadcast = broadcast_artifacts(spark, store)
+    categorical = set(FeatureTransformer(store.columns, store.encoders).categorical_columns)
+    sdf = spark.read.csv(str(input_path), header=True, schema=csv_schema(input_path, categorical, id_col))
+    scores = score_spark_df(sdf, broadcast, id_col)
+    writer = scores.write.mode("overwrite")
+    if partition_by:
+        writer = writer.partitionBy(*partition_by)
+    writer.parquet(str(output_path))
+    elapsed = time.perf_counter() - start
+
+    n_rows = spark.read.parquet(str(output_path)).count()
+    broadcast.unpersist()
+    stats = {
+        'rows': n_rows,
+        'seconds': elapsed,
+        'rows_per_sec': n_rows / elapsed if elapsed > 0 else float('inf'),
+        'cores': spark.sparkContext.defaultParallelism,
+    }
+    print(f"    Filas puntuadas: {n_rows} en {elapsed:.2f}s ({stats['rows_per_sec']:,.0f} filas/s, "
+          f"{stats['cores']} núcleos)")
+    print(f"    Resultados guardados en {output_path}")
+    return stats
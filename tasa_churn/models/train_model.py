@@ -1,7 +1,36 @@
+import importlib
+import importlib.util
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import joblib
-from tasa_churn.utils.paths import MODELS_DIR
+import numpy as np
+import pandas as pd
+from tasa_churn.features.transformer import FEATURE_DTYPE
+from tasa_churn.utils.artifacts import artifact_store, save_model
+from tasa_churn.utils.instrument import stage
+from tasa_churn.utils.paths import MODELS_DIR, REPORTS_DIR
+from tasa_churn.utils.shared_arrays import open_shared, shared_arrays
 from sklearn.ensemble import RandomForestClassifier
 
+# Modelos candidatos para comparar: nombre -> (clase "modulo.Clase", parámetros).
+# Cada worker usa un solo hilo (n_jobs=1): el paralelismo lo da el pool de procesos.
+CANDIDATE_MODELS = {
+    'RandomForest_d6': ('sklearn.ensemble.RandomForestClassifier',
+                        {'n_estimators': 100, 'class_weight': 'balanced', 'max_depth': 6, 'random_state': 42}),
+    'RandomForest_d10': ('sklearn.ensemble.RandomForestClassifier',
+                         {'n_estimators': 100, 'class_weight': 'balanced', 'max_depth': 10, 'random_state': 42}),
+    'RandomForest_d14': ('sklearn.ensemble.RandomForestClassifier',
+                         {'n_estimators': 100, 'class_weight': 'balanced', 'max_depth': 14, 'random_state': 42}),
+    'ExtraTrees': ('sklearn.ensemble.ExtraTreesClassifier',
+                   {'n_estimators': 100, 'class_weight': 'balanced', 'max_depth': 12, 'random_state': 42}),
+    'HistGradientBoosting': ('sklearn.ensemble.HistGradientBoostingClassifier',
+                             {'max_iter': 200, 'class_weight': 'balanced', 'random_state': 42}),
+    'LightGBM': ('lightgbm.LGBMClassifier',
+                 {'n_estimators': 200, 'class_weight': 'balanced', 'random_state': 42, 'n_jobs': 1, 'verbose': -1}),
+}
+
 def train_models(X_train, y_train):
     """
     Entrena los modelos y guarda los artefactos.
@@ -23,11 +52,163 @@ def train_models(X_train, y_train):
         random_state=42
     )
     
-    dt.fit(X_train, y_train)
+    with stage("fit:RandomForest", rows=len(X_train)):
+        dt.fit(X_train, y_train)
     models['RandomForest'] = dt
 
     # Guardar modelos
     for name, model in models.items():
-        joblib.dump(model, MODELS_DIR / f"{name}.joblib")
-    
-    return models
\ No newline at end of file
+        save_model(model, MODELS_DIR / f"{name}.joblib")
+    artifact_store.invalidate("model")
+
+    return models
+
+def train_models_out_of_core(X_train, y_train, columns, n_estimators=100, chunk_rows=1_000_000,
+                             models_dir=MODELS_DIR):
+    """
+    Entrena el Random Forest de train_models desde matrices mapeadas en memoria
+    (p.ej. las de preprocess_out_of_core), sin cargar todo el train en RAM.
+        - Recorre X_train en bloques de chunk_rows filas y entrena en cada bloque una
+          parte de los árboles (warm_start): el bosque final es la unión de todos.
+        - Cada árbol solo ve su bloque, así que la memoria depende de chunk_rows.
+        - Si hay más bloques que árboles, se agrandan los bloques (1 árbol por bloque).
+        - Los árboles de un bloque con una sola clase pasan al siguiente; si son los últimos,
+          se entrenan sobre el último bloque con las dos clases junto con los que le siguen.
+        - Guarda el modelo en models/RandomForest.joblib, como train_models.
+    """
+    n_rows = len(X_train)
+    n_chunks = min(max(1, -(-n_rows // chunk_rows)), n_estimators)
+    bounds = np.linspace(0, n_rows, n_chunks + 1).astype(int)
+    trees = np.diff(np.linspace(0, n_estimators, n_chunks + 1).astype(int))
+    print(f"--> Entrenando el random forest por bloques ({n_chunks} bloques, {n_estimators} árboles)...")
+
+    # 'balanced' calculado sobre todo el train: con warm_start cada fit solo ve su bloque
+    counts = sum(np.bincount(y_train[i:i + chunk_rows], minlength=2) for i in range(0, n_rows, chunk_rows))
+    classes = np.flatnonzero(counts)
+    class_weight = {int(c): n_rows / (len(classes) * counts[c]) for c in classes}
+
+    model = RandomForestClassifier(
+        n_estimators=0,
+        class_weight=class_weight,
+        max_depth=10,
+        random_state=42,
+        warm_start=True,
+    )
+    def fit_trees(start, stop, n_trees):
+        # DataFrame sin copia sobre el bloque del memmap (mismos nombres de columnas que train_models)
+        X_chunk = pd.DataFrame(X_train[start:stop], columns=columns, copy=False)
+        model.set_params(n_estimators=model.n_estimators + n_trees)
+        model.fit(X_chunk, y_train[start:stop])
+
+    with stage("fit:RandomForest", rows=n_rows):
+        pending = 0
+        last_start = None
+        for start, stop, n_trees in zip(bounds[:-1], bounds[1:], trees):
+            pending += int(n_trees)
+            # Un bloque con una sola clase cambiaría classes_ del bosque: sus árboles pasan al siguiente
+            if len(np.unique(y_train[start:stop])) < 2:
+                continue
+            fit_trees(start, stop, pending)
+            pending, last_start = 0, start
+        if last_start is None:
+            raise ValueError("Ningún bloque de entrenamiento contiene las dos clases")
+        if pending:
+            # Los últimos bloques tienen una sola clase: sus árboles se entrenan con ellos y el bloque anterior
+            print(f"    {pending} árboles de los últimos bloques (una sola clase) se entrenan con las filas "
+                  f"{last_start}-{n_rows}")
+            fit_trees(last_start, n_rows, pending)
+    model.set_params(warm_start=False)
+
+    save_model(model, models_dir / "RandomForest.joblib")
+    artifact_store.invalidate("model")
+    return {'RandomForest': model}
+
+def build_model(spec):
+    """Instancia un modelo a partir de su especificación ("modulo.Clase", parámetros)."""
+    class_path, params = spec
+    module_name, class_name = class_path.rsplit('.', 1)
+    return getattr(importlib.import_module(module_name), class_name)(**params)
+
+def candidate_available(spec):
+    """Comprueba si la librería del candidato está instalada (p.ej. lightgbm es opcional)."""
+    return importlib.util.find_spec(spec[0].split('.', 1)[0]) is not None
+
+def _fit_candidate(name, spec, data_paths, models_dir):
+    """Worker: entrena un candidato sobre los arrays compartidos y mide coste y métricas."""
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+
+    data = open_shared(data_paths)
+    model = build_model(spec)
+
+    start = time.perf_counter()
+    model.fit(data['X_train'], data['y_train'])
+    fit_seconds = time.perf_counter() - start
+
+    X_test, y_test = data['X_test'], data['y_test']
+    start = time.perf_counter()
+    probs = model.predict_proba(X_test)
+    predict_seconds = time.perf_counter() - start
+    predictions = model.classes_[np.argmax(probs, axis=1)]
+
+    # Sin hash de scaler: el split de la comparación no guarda sus artefactos
+    model_path = models_dir / f"{name}.joblib"
+    joblib.dump(model, model_path)
+
+    return {
+        'model': name,
+        'fit_seconds': fit_seconds,
+        'predict_rows_per_sec': len(X_test) / predict_seconds if predict_seconds > 0 else float('inf'),
+        'model_size_mb': os.path.getsize(model_path) / 1e6,
+        'accuracy': accuracy_score(y_test, predictions),
+        'precision': precision_score(y_test, predictions),
+        'recall': recall_score(y_test, predictions),
+        'f1': f1_score(y_test, predictions),
+        'roc_auc': roc_auc_score(y_test, probs[:, 1]),
+    }
+
+def train_models_parallel(X_train, y_train, X_test, y_test, candidates=None, n_workers=None,
+                          models_dir=MODELS_DIR, report_path=REPORTS_DIR / "model_comparison.csv"):
+    """
+    Entrena varios modelos candidatos a la vez, uno por proceso, sobre el mismo split.
+     - candidates: dict nombre -> especificación (por defecto CANDIDATE_MODELS).
+       Se saltan los candidatos cuya librería no esté instalada.
+     - Los arrays de entrenamiento y test se publican una sola vez en disco y cada
+       worker los mapea en memoria (solo lectura) en lugar de recibir una copia.
+     - Guarda cada modelo en models_dir/<nombre>.joblib.
+     - Escribe en report_path una tabla con tiempo de ajuste, filas/s al predecir,
+       tamaño del modelo y métricas, y la devuelve como DataFrame.
+    """
+    print("--> Entrenando modelos candidatos en paralelo...")
+    candidates = CANDIDATE_MODELS if candidates is None else candidates
+
+    available = {}
+    for name, spec in candidates.items():
+        if candidate_available(spec):
+            available[name] = spec
+        else:
+            print(f"    Saltando {name}: {spec[0].split('.', 1)[0]} no está instalado.")
+
+    n_workers = n_workers or min(len(available), os.cpu_count() or 1)
+    rows = []
+    with shared_arrays(
+        X_train=np.asarray(X_train, dtype=FEATURE_DTYPE),
+        y_train=np.asarray(y_train),
+        X_test=np.asarray(X_test, dtype=FEATURE_DTYPE),
+        y_test=np.asarray(y_test),
+    ) as data_paths:
+        with ProcessPoolExecutor(max_workers=max(n_workers, 1)) as pool:
+            futures = {
+                pool.submit(_fit_candidate, name, spec, data_paths, models_dir): name
+                for name, spec in available.items()
+            }
+            for future in as_completed(futures):
+                row = future.result()
+                print(f"    {row['model']}: ajuste {row['fit_seconds']:.2f}s, ROC-AUC {row['roc_auc']:.3f}")
+                rows.append(row)
+
+    table = pd.DataFrame(rows).sort_values('roc_auc', ascending=False).reset_index(drop=True)
+    if report_path is not None:
+        table.to_csv(report_path, index=False)
+        print(f"    Tabla comparativa guardada en {report_path}")
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    return table
@@ -0,0 +1,312 @@
+# tasa_churn/models/tuning.py
+import json
+import math
+import multiprocessing
+import os
+import queue
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+
+from tasa_churn.features.transformer import FEATURE_DTYPE
+from tasa_churn.models.train_model import build_model, candidate_available
+from tasa_churn.utils.artifacts import MODEL_NAME, artifact_store, save_model
+from tasa_churn.utils.instrument import stage
+from tasa_churn.utils.paths import MODELS_DIR, REPORTS_DIR
+from tasa_churn.utils.shared_arrays import open_shared, shared_arrays
+
+# Espacio de búsqueda: familia -> (clase "modulo.Clase", parámetro de número de árboles, valores posibles).
+# El número de árboles no se busca: es el recurso que crece en cada ronda del successive halving.
+SEARCH_SPACE = {
+    'RandomForest': ('sklearn.ensemble.RandomForestClassifier', 'n_estimators', {
+        'max_depth': [6, 8, 10, 12, 14, None],
+        'min_samples_leaf': [1, 5, 20, 50],
+        'max_features': ['sqrt', 0.5, 1.0],
+        'class_weight': ['balanced', None],
+        'random_state': [42],
+    }),
+    'ExtraTrees': ('sklearn.ensemble.ExtraTreesClassifier', 'n_estimators', {
+        'max_depth': [8, 10, 12, 16, None],
+        'min_samples_leaf': [1, 5, 20],
+        'max_features': ['sqrt', 0.5, 1.0],
+        'class_weight': ['balanced', None],
+        'random_state': [42],
+    }),
+    'HistGradientBoosting': ('sklearn.ensemble.HistGradientBoostingClassifier', 'max_iter', {
+        'learning_rate': [0.03, 0.1, 0.3],
+        'max_leaf_nodes': [15, 31, 63],
+        'min_samples_leaf': [20, 100],
+        'l2_regularization': [0.0, 1.0],
+        'class_weight': ['balanced', None],
+        'random_state': [42],
+    }),
+    'LightGBM': ('lightgbm.LGBMClassifier', 'n_estimators', {
+        'learning_rate': [0.03, 0.1, 0.3],
+        'num_leaves': [15, 31, 63],
+        'min_child_samples': [20, 100],
+        'reg_lambda': [0.0, 1.0],
+        'class_weight': ['balanced', None],
+        'random_state': [42],
+        'n_jobs': [1],
+        'verbose': [-1],
+    }),
+}
+
+# Familias que pueden sustituir al modelo de producción: update, materialize, FlatForest
+# (export-flat, serve --workers) y ReasonExplainer necesitan un bosque de árboles de sklearn
+FOREST_FAMILIES = ('RandomForest', 'ExtraTrees')
+
+# Fracción del train que se reserva para comparar configuraciones (el test no se usa para elegir)
+VALIDATION_SIZE = 0.2
+# Filas y árboles mínimos de la primera ronda
+MIN_ROWS = 1_000
+MIN_TREES = 5
+# Llamadas de una fila para medir la latencia
+_LATENCY_CALLS = 5
+
+
+def sample_configs(n_configs, families=None, random_state=42):
+    """
+    Configuraciones al azar del espacio de búsqueda, repartidas entre las familias disponibles.
+    Devuelve un dict nombre -> (familia, especificación sin número de árboles).
+    """
+    families = [f for f in (families or SEARCH_SPACE) if candidate_available(SEARCH_SPACE[f])]
+    if not families:
+        raise ValueError("Ninguna familia del espacio de búsqueda está instalada")
+    rng = np.random.default_rng(random_state)
+    configs, seen = {}, set()
+    for i in range(n_configs * 20):
+        if len(configs) == n_configs:
+            break
+        family = families[i % len(families)]
+        class_path, _, grid = SEARCH_SPACE[family]
+        params = {name: values[rng.integers(len(values))] for name, values in grid.items()}
+        # Los valores de numpy no se serializan en JSON ni en los nombres
+        params = {name: value.item() if hasattr(value, "item") else value for name, value in params.items()}
+        key = (family, json.dumps(params, sort_keys=True))
+        if key not in seen:
+            seen.add(key)
+            configs[f"{family}-{len(configs):02d}"] = (family, (class_path, params))
+    return configs
+
+
+def with_trees(family, spec, n_trees):
+    """Especificación con el número de árboles (o iteraciones de boosting) indicado."""
+    class_path, params = spec
+    return class_path, {**params, SEARCH_SPACE[family][1]: int(n_trees)}
+
+
+def stratified_order(y, random_state=42):
+    """
+    Orden aleatorio de las filas en el que cualquier prefijo mantiene la proporción de clases:
+    las submuestras de cada ronda son prefijos (anidadas y sin copiar datos).
+    """
+    y = np.asarray(y)
+    rng = np.random.default_rng(random_state)
+    order = rng.permutation(len(y))
+    key = np.empty(len(y))
+    for label in np.unique(y):
+        members = order[y[order] == label]
+        # Posición relativa dentro de su clase: (k + U) / n_clase, intercalada con las demás clases
+        key[members] = (np.arange(len(members)) + rng.random(len(members))) / len(members)
+    return order[np.argsort(key[order], kind="stable")]
+
+
+def schedule(n_configs, n_rows, max_trees, eta=3):
+    """
+    Rondas del successive halving: lista de (configuraciones, filas, árboles).
+    En cada ronda quedan 1/eta de las configuraciones y filas y árboles se multiplican por eta;
+    la última usa todas las filas y max_trees.
+    """
+    n_rounds = max(1, math.ceil(math.log(max(n_configs, 1), eta)))
+    rounds = []
+    for r in range(n_rounds):
+        factor = eta ** (n_rounds - 1 - r)
+        rounds.append((max(1, math.ceil(n_configs / eta ** r)),
+                       min(n_rows, max(MIN_ROWS, n_rows // factor)),
+                       max(MIN_TREES, max_trees // factor)))
+    return rounds
+
+
+def _latency(model, X_val):
+    """(ms por 1000 filas en bloque, mediana de ms por llamada de una fila)."""
+    start = time.perf_counter()
+    model.predict_proba(X_val)
+    batch_ms = (time.perf_counter() - start) * 1000 / len(X_val) * 1000
+    single = []
+    for i in range(_LATENCY_CALLS):
+        start = time.perf_counter()
+        model.predict_proba(X_val[i:i + 1])
+        single.append((time.perf_counter() - start) * 1000)
+    return batch_ms, float(np.median(single))
+
+
+def _fit_config(name, spec, n_rows, data_paths):
+    """Worker: entrena una configuración con las primeras n_rows filas y la puntúa en validación."""
+    data = open_shared(data_paths)
+    model = build_model(spec)
+    start = time.perf_counter()
+    model.fit(data['X'][:n_rows], data['y'][:n_rows])
+    fit_seconds = time.perf_counter() - start
+
+    X_val = np.asarray(data['X_val'])
+    positive = list(model.classes_).index(1)
+    roc_auc = roc_auc_score(data['y_val'], model.predict_proba(X_val)[:, positive])
+    batch_ms, single_ms = _latency(model, X_val)
+    return {'config': name, 'roc_auc': roc_auc, 'fit_seconds': fit_seconds,
+            'predict_ms_per_1k_rows': batch_ms, 'single_row_ms': single_ms}
+
+
+def _run_round(tasks, n_workers, timeout):
+    """
+    Ejecuta las tareas (argumentos de _fit_config) en un pool propio y devuelve los resultados
+    que terminen antes de timeout segundos (None: sin límite). Al salir, Pool.terminate() corta
+    los ajustes que sigan en marcha en lugar de esperarlos.
+    """
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    done = queue.SimpleQueue()
+    results = []
+    pool = multiprocessing.Pool(max(n_workers, 1))
+    try:
+        for args in tasks:
+            pool.apply_async(_fit_config, args, callback=done.put, error_callback=done.put)
+        for _ in tasks:
+            result = done.get(timeout=None if deadline is None else max(deadline - time.perf_counter(), 0))
+            if isinstance(result, BaseException):
+                raise result
+            results.append(result)
+    except queue.Empty:
+        pass
+    finally:
+        pool.terminate()
+        pool.join()
+    return results
+
+
+def tune_models(X_train, y_train, X_test, y_test, n_configs=27, budget_seconds=600.0, eta=3, max_trees=300,
+                families=None, n_workers=None, random_state=42, save=True, models_dir=MODELS_DIR,
+                model_name=MODEL_NAME, report_path=REPORTS_DIR / "tuning_leaderboard.csv", publish_artifacts=None):
+    """
+    Búsqueda de hiperparámetros de bosques y boosting con successive halving, dentro de un
+    presupuesto de tiempo.
+        - n_configs configuraciones al azar de SEARCH_SPACE (sample_configs). Se comparan por
+          ROC-AUC en una parte de validación del train (VALIDATION_SIZE); el test solo se usa
+          para el modelo final.
+        - Primeras rondas con submuestras estratificadas pequeñas y pocos árboles; en cada
+          ronda sigue 1/eta de las configuraciones, con eta veces más filas y árboles (schedule).
+        - Cada ronda entrena sus configuraciones en paralelo (un proceso por núcleo) sobre
+          arrays compartidos (shared_arrays), en un pool propio.
+        - budget_seconds: antes de cada ronda se estima su coste con los tiempos de la anterior;
+          si no cabe (junto con el re-entrenamiento final) se para y gana la mejor hasta ahora.
+          Si una ronda se pasa del presupuesto, se terminan sus procesos y cuentan solo las
+          configuraciones ya evaluadas. La primera ronda siempre se ejecuta.
+        - La ganadora se re-entrena con todo el train y max_trees, se evalúa en test y, si save
+          es True, sustituye a models/RandomForest.joblib de forma atómica. Con save solo se
+          buscan las familias de FOREST_FAMILIES (las de boosting, solo con save=False).
+        - publish_artifacts: función opcional que publica columnas, encoders y escalador del
+          preprocesado; con save se llama justo antes de guardar el modelo, para que un fallo
+          en la búsqueda no deje en producción un escalador que no corresponde al modelo.
+        - Escribe en report_path la tabla de todas las evaluaciones (ROC-AUC frente a tiempo de
+          ajuste y latencia de inferencia) y el resumen de la ganadora en el .json de al lado.
+    Devuelve (modelo ganador, tabla).
+    """
+    start = time.perf_counter()
+    deadline = start + budget_seconds
+    if save:
+        requested = list(families or SEARCH_SPACE)
+        families = [f for f in requested if f in FOREST_FAMILIES]
+        skipped = [f for f in requested if f not in FOREST_FAMILIES]
+        if not families:
+            raise ValueError(f"{', '.join(skipped)} no puede sustituir a {model_name} (no es un bosque): "
+                             "usa save=False (--no-save) para compararlas")
+        if skipped:
+            print(f"    {', '.join(skipped)} no se buscan: solo un bosque puede sustituir a {model_name} "
+                  "(compáralas con --no-save).")
+    configs = sample_configs(n_configs, families, random_state)
+    X_train = np.asarray(X_train, dtype=FEATURE_DTYPE)
+    y_train = np.asarray(y_train).astype(int)
+
+    fit_idx, val_idx = train_test_split(np.arange(len(y_train)), test_size=VALIDATION_SIZE,
+                                        stratify=y_train, random_state=random_state)
+    fit_idx = fit_idx[stratified_order(y_train[fit_idx], random_state)]
+    rounds = schedule(len(configs), len(fit_idx), max_trees, eta)
+    print(f"--> Successive halving: {len(configs)} configuraciones, {len(rounds)} rondas, "
+          f"presupuesto {budget_seconds:.0f}s")
+
+    n_workers = n_workers or min(len(configs), os.cpu_count() or 1)
+    survivors, rows, last_round = list(configs), [], None
+    with shared_arrays(X=X_train[fit_idx], y=y_train[fit_idx], X_val=X_train[val_idx],
+                       y_val=y_train[val_idx]) as data_paths:
+        for r, (n_keep, n_rows, n_trees) in enumerate(rounds):
+            if last_round is not None:
+                survivors = list(last_round.sort_values('roc_auc', ascending=False)['config'][:n_keep])
+                # Coste estimado: tiempos de la ronda anterior escalados por filas x árboles
+                growth = (n_rows / rounds[r - 1][1]) * (n_trees / rounds[r - 1][2])
+                fits = last_round.set_index('config').loc[survivors, 'fit_seconds'] * growth
+                refit = fits.max() * (len(y_train) / n_rows) * (max_trees / n_trees)
+                estimate = fits.sum() / min(n_workers, len(survivors)) + refit
+                if time.perf_counter() + estimate > deadline:
+                    print(f"    Ronda {r + 1} no cabe en el presupuesto (~{estimate:.0f}s): se para aquí.")
+                    break
+
+            print(f"    Ronda {r + 1}: {len(survivors)} configuraciones, {n_rows} filas, {n_trees} árboles")
+            results = []
+            with stage(f"tune:round{r + 1}", rows=n_rows * len(survivors)):
+                tasks = [(name, with_trees(*configs[name], n_trees), n_rows, data_paths) for name in survivors]
+                timeout = None if r == 0 else max(deadline - time.perf_counter(), 0)
+                results = [{**result, 'round': r + 1, 'rows': n_rows, 'trees': n_trees}
+                           for result in _run_round(tasks, n_workers, timeout)]
+                if len(results) < len(tasks):
+                    # Los ajustes en marcha ya se han cortado: el re-entrenamiento final empieza ya
+                    print(f"    Presupuesto agotado en la ronda {r + 1} ({len(results)} de {len(tasks)}).")
+            if not results:
+                break
+            last_round = pd.DataFrame(results)
+            rows.extend(sorted(results, key=lambda row: -row['roc_auc']))
+            best = last_round.loc[last_round['roc_auc'].idxmax()]
+            print(f"      mejor: {best['config']} (ROC-AUC {best['roc_auc']:.4f})")
+            if len(results) < len(tasks):
+                break
+
+    winner = last_round.loc[last_round['roc_auc'].idxmax(), 'config']
+    family, spec = configs[winner]
+    final_spec = with_trees(family, spec, max_trees)
+    print(f"--> Ganadora: {winner} {spec[1]}; re-entrenando con todo el train ({max_trees} árboles)...")
+    model = build_model(final_spec)
+    with stage("tune:refit", rows=len(y_train)):
+        fit_start = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - fit_start
+
+    X_test = np.asarray(X_test, dtype=FEATURE_DTYPE)
+    positive = list(model.classes_).index(1)
+    test_roc_auc = roc_auc_score(np.asarray(y_test).astype(int), model.predict_proba(X_test)[:, positive])
+    batch_ms, single_ms = _latency(model, X_test)
+    rows.append({'config': winner, 'roc_auc': np.nan, 'fit_seconds': fit_seconds,
+                 'predict_ms_per_1k_rows': batch_ms, 'single_row_ms': single_ms,
+                 'round': 'final', 'rows': len(y_train), 'trees': max_trees, 'test_roc_auc': test_roc_auc})
+    elapsed = time.perf_counter() - start
+    print(f"    ROC-AUC en test: {test_roc_auc:.4f} (ajuste {fit_seconds:.1f}s, "
+          f"{single_ms:.2f} ms por fila; total {elapsed:.0f}s)")
+
+    if save:
+        if publish_artifacts is not None:
+            publish_artifacts()
+        model_path = save_model(model, models_dir / model_name)
+        artifact_store.invalidate("model")
+        print(f"    Modelo guardado en {model_path}")
+
+    table = pd.DataFrame(rows)
+    table.insert(1, 'family', table['config'].map(lambda name: configs[name][0]))
+    table['params'] = table['config'].map(lambda name: json.dumps(configs[name][1][1], sort_keys=True))
+    if report_path is not None:
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        table.to_csv(report_path, index=False)
+        meta = {"winner": winner, "spec": final_spec, "test_roc_auc": test_roc_auc, "budget_seconds": budget_seconds,
+                "elapsed_seconds": elapsed, "eta": eta, "schedule": rounds, "saved": bool(save)}
+        report_path.with_suffix(".json").write_text(json.dumps(meta, indent=2, default=str))
+        print(f"    Tabla de resultados guardada en {report_path}")
+    return model, table
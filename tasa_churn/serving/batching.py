@@ -0,0 +1,172 @@
+# tasa_churn/serving/batching.py
+import asyncio
+import time
+from collections import Counter, deque
+
+import numpy as np
+
+
+class Scorer:
+    """
+    Puntuación vectorizada de una lista de clientes (dicts) con el modelo y artefactos actuales.
+        - Agrupa los dicts por columnas y llama una sola vez a transform_batch + predict_proba.
+        - Si algún cliente tiene una categoría desconocida, se puntúa uno a uno para que
+          el error solo afecte a ese cliente.
+    """
+
+    def __init__(self, model=None, transformer=None):
+        self._model = model
+        self._transformer = transformer
+
+    @property
+    def model(self):
+        if self._model is not None:
+            return self._model
+        from tasa_churn.utils.artifacts import artifact_store
+        return artifact_store.model
+
+    @property
+    def transformer(self):
+        if self._transformer is not None:
+            return self._transformer
+        from tasa_churn.features.transformer import current_transformer
+        return current_transformer()
+
+    def current(self):
+        """Par (modelo, transformador) con el que se puntúa el siguiente batch."""
+        if self._model is None and self._transformer is None:
+            from tasa_churn.features.transformer import current_model_and_transformer
+            return current_model_and_transformer()
+        return self.model, self.transformer
+
+    def score(self, rows):
+        """Devuelve una lista con un dict de resultado o una excepción por cliente."""
+        model, transformer = self.current()
+        try:
+            columns = {col: [row[col] for row in rows] for col in transformer.columns}
+            return self._results(model, model.predict_proba(transformer.transform_batch(columns)))
+        except (KeyError, ValueError):
+            results = []
+            for row in rows:
+                try:
+                    results.extend(self._results(model, model.predict_proba(transformer.transform_one(row))))
+                except (KeyError, ValueError) as e:
+                    results.append(ValueError(str(e)))
+            return results
+
+    @staticmethod
+    def _results(model, probs):
+        positive = list(model.classes_).index(1) if 1 in model.classes_ else -1
+        predictions = model.classes_[np.argmax(probs, axis=1)]
+        return [
+            {"churn_probability": float(p), "churn_prediction": int(c)}
+            for p, c in zip(probs[:, positive], predictions)
+        ]
+
+
+class MicroBatcher:
+    """
+    Agrupa peticiones concurrentes en una sola llamada vectorizada.
+        - Cada petición (uno o varios clientes) se encola con un Future.
+        - El bucle de batching toma la primera petición y espera como mucho max_wait_ms
+          a que lleguen más, hasta max_batch_size clientes; luego puntúa todo junto
+          en un hilo aparte para no bloquear el event loop.
+        - Lleva métricas: latencias, histograma de tamaños de batch y profundidad de cola.
+        - max_batch_size=1 desactiva el batching (una predicción por petición).
+    """
+
+    def __init__(self, scorer, max_batch_size=256, max_wait_ms=5.0, latency_window=10_000):
+        self.scorer = scorer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = asyncio.Queue()
+        self._task = None
+        self._latencies = deque(maxlen=latency_window)
+        self._batch_sizes = Counter()
+        self._queued_rows = 0
+        self._max_queued_rows = 0
+        self._requests = 0
+        self._rows = 0
+        self._errors = 0
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, rows):
+        """Encola una petición y espera sus resultados (lista, uno por cliente)."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((rows, future, time.perf_counter()))
+        self._queued_rows += len(rows)
+        self._max_queued_rows = max(self._max_queued_rows, self._queued_rows)
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            n_rows = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+            while n_rows < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                n_rows += len(item[0])
+
+            self._queued_rows -= n_rows
+            rows = [row for item in batch for row in item[0]]
+            try:
+                results = await loop.run_in_executor(None, self.scorer.score, rows)
+            except Exception as e:
+                results = [e] * len(rows)
+
+            self._record_batch(n_rows)
+            now = time.perf_counter()
+            offset = 0
+            for item_rows, future, started in batch:
+                item_results = results[offset:offset + len(item_rows)]
+                offset += len(item_rows)
+                self._latencies.append(now - started)
+                self._requests += 1
+                if not future.done():
+                    future.set_result(item_results)
+
+    def _record_batch(self, n_rows):
+        self._rows += n_rows
+        # Histograma por potencias de 2: 1, 2, 4, 8, ...
+        bucket = 1 << max(n_rows - 1, 0).bit_length()
+        self._batch_sizes[bucket] += 1
+
+    def record_error(self):
+        self._errors += 1
+
+    def metrics(self):
+        latencies = np.fromiter(self._latencies, dtype=np.float64) * 1000
+        percentiles = {}
+        if len(latencies):
+            p50, p90, p95, p99 = np.percentile(latencies, [50, 90, 95, 99])
+            percentiles = {"p50": p50, "p90": p90, "p95": p95, "p99": p99, "max": float(latencies.max())}
+        return {
+            "requests": self._requests,
+            "rows": self._rows,
+            "errors": self._errors,
+            "latency_ms": {k: round(float(v), 3) for k, v in percentiles.items()},
+            "batch_size_histogram": {f"<={k}": v for k, v in sorted(self._batch_sizes.items())},
+            "queue_depth": self._queue.qsize(),
+            "queued_rows": self._queued_rows,
+            "max_queued_rows": self._max_queued_rows,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+        }
@@ -0,0 +1,109 @@
+# tasa_churn/serving/loadgen.py
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from tasa_churn.serving.server import ScoringServer
+
+
+def random_customers(n, seed=0):
+    """Clientes aleatorios con el mismo esquema que el dataset original."""
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "Age": int(rng.integers(18, 66)),
+            "Gender": str(rng.choice(["Male", "Female"])),
+            "Tenure": int(rng.integers(1, 61)),
+            "Support Calls": int(rng.integers(0, 11)),
+            "Payment Delay": int(rng.integers(0, 31)),
+            "Subscription Type": str(rng.choice(["Basic", "Standard", "Premium"])),
+            "Contract Length": str(rng.choice(["Monthly", "Quarterly", "Annual"])),
+        }
+        for _ in range(n)
+    ]
+
+
+async def _client(host, port, payloads, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for payload in payloads:
+            body = json.dumps(payload).encode()
+            request = (
+                f"POST /predict HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n"
+            ).encode() + body
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            length = 0
+            await reader.readline()
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode().partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, n_requests=2000, concurrency=64, seed=0):
+    """
+    Lanza n_requests peticiones de un cliente cada una, con 'concurrency' conexiones en paralelo.
+    Devuelve peticiones/segundo y percentiles de latencia (ms).
+    """
+    customers = random_customers(n_requests, seed)
+    per_client = [customers[i::concurrency] for i in range(concurrency)]
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, payloads, latencies) for payloads in per_client if payloads))
+    elapsed = time.perf_counter() - start
+    lat = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "requests_per_sec": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p95_ms": float(np.percentile(lat, 95)),
+        "p99_ms": float(np.percentile(lat, 99)),
+    }
+
+
+async def _compare(n_requests, concurrency, max_batch_size, max_wait_ms, scorer):
+    results = {}
+    modes = {
+        "por petición": {"max_batch_size": 1, "max_wait_ms": 0.0},
+        "micro-batching": {"max_batch_size": max_batch_size, "max_wait_ms": max_wait_ms},
+    }
+    for name, params in modes.items():
+        server = await ScoringServer(scorer=scorer, port=0, **params).start()
+        try:
+            stats = await run_load(server.host, server.port, n_requests, concurrency)
+            stats["batch_size_histogram"] = server.batcher.metrics()["batch_size_histogram"]
+        finally:
+            await server.stop()
+        results[name] = stats
+    return results
+
+
+def compare_batching(n_requests=2000, concurrency=64, max_batch_size=256, max_wait_ms=5.0, scorer=None):
+    """
+    Levanta el servicio en proceso dos veces (sin batching y con micro-batching),
+    lanza la misma carga contra ambos y muestra la ganancia de throughput.
+    """
+    from tasa_churn.serving.batching import Scorer
+
+    scorer = scorer or Scorer()
+    print(f"--> Generando carga: {n_requests} peticiones, {concurrency} conexiones concurrentes...")
+    results = asyncio.run(_compare(n_requests, concurrency, max_batch_size, max_wait_ms, scorer))
+    for name, stats in results.items():
+        print(f"    {name:>15}: {stats['requests_per_sec']:8.1f} pet/s | p50 {stats['p50_ms']:.1f} ms | "
+              f"p95 {stats['p95_ms']:.1f} ms | p99 {stats['p99_ms']:.1f} ms")
+    gain = results["micro-batching"]["requests_per_sec"] / results["por petición"]["requests_per_sec"]
+    print(f"    Ganancia de throughput con micro-batching: x{gain:.1f}")
+    return results
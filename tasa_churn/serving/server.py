@@ -0,0 +1,161 @@
+# tasa_churn/serving/server.py
+import asyncio
+import json
+
+from tasa_churn.serving.batching import MicroBatcher, Scorer
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class ScoringServer:
+    """
+    Servicio HTTP local de puntuación (asyncio, sin dependencias externas).
+        - POST /predict: un cliente (objeto JSON) o varios (lista JSON).
+        - GET /metrics: latencias, histograma de tamaños de batch y profundidad de cola.
+        - GET /health: comprobación de vida.
+        - Las peticiones concurrentes se agrupan con MicroBatcher.
+    """
+
+    def __init__(self, scorer=None, host="127.0.0.1", port=8000, max_batch_size=256, max_wait_ms=5.0, sock=None):
+        self.scorer = scorer or Scorer()
+        self.host = host
+        self.port = port
+        # Socket ya abierto (p.ej. compartido entre los procesos de serving/workers.py)
+        self.sock = sock
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.batcher = None
+        self._server = None
+
+    async def start(self):
+        self.batcher = MicroBatcher(self.scorer, self.max_batch_size, self.max_wait_ms)
+        self.batcher.start()
+        if self.sock is not None:
+            self._server = await asyncio.start_server(self._handle, sock=self.sock)
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        # Con port=0 el sistema elige un puerto libre
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self.batcher is not None:
+            await self.batcher.stop()
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"--> Servicio de scoring en http://{self.host}:{self.port} "
+              f"(batch máx. {self.max_batch_size}, espera máx. {self.max_wait_ms} ms)")
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except ValueError as e:
+                    # Petición mal formada: se responde 400 y se cierra (no se sabe dónde empieza la siguiente)
+                    self.batcher.record_error()
+                    _write_response(writer, 400, {"error": f"Petición HTTP mal formada: {e}"}, keep_alive=False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self._route(method, path, body)
+                keep_alive = headers.get("connection", "keep-alive").lower() != "close"
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body):
+        if path == "/health":
+            health = {"status": "ok"}
+            if hasattr(self.scorer, "version"):
+                health["model_version"] = self.scorer.version
+            return 200, health
+        if path == "/metrics":
+            return 200, self.batcher.metrics()
+        if path != "/predict":
+            return 404, {"error": f"Ruta desconocida: {path}"}
+        if method != "POST":
+            return 405, {"error": "Usa POST para /predict"}
+
+        try:
+            data = json.loads(body or b"null")
+        except ValueError:
+            self.batcher.record_error()
+            return 400, {"error": "El cuerpo no es JSON válido"}
+        single = isinstance(data, dict)
+        rows = [data] if single else data
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows) or not rows:
+            self.batcher.record_error()
+            return 400, {"error": "Se espera un objeto JSON o una lista de objetos"}
+
+        results = await self.batcher.submit(rows)
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                self.batcher.record_error()
+                results[i] = {"error": str(result)}
+        if single:
+            return (400 if "error" in results[0] else 200), results[0]
+        return 200, {"results": results}
+
+
+async def _read_request(reader):
+    """(método, ruta, cabeceras, cuerpo), None si se cerró la conexión o ValueError si está mal formada."""
+    line = await reader.readline()
+    if not line:
+        return None
+    parts = line.decode("latin-1").split(" ", 2)
+    if len(parts) != 3:
+        raise ValueError("línea de petición incompleta")
+    method, path, _ = parts
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = headers.get("content-length", "0")
+    if not length.isdigit():
+        raise ValueError(f"Content-Length no válido: {length!r}")
+    length = int(length)
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+
+def _write_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+def serve(host="127.0.0.1", port=8000, max_batch_size=256, max_wait_ms=5.0, model=None):
+    """
+    Arranca el servicio y lo deja escuchando hasta Ctrl+C.
+    model: modelo alternativo (p.ej. la tabla de lookup_table); por defecto el de la caché.
+    """
+    server = ScoringServer(scorer=Scorer(model=model), host=host, port=port,
+                           max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    # Calentar modelo y artefactos antes de aceptar peticiones
+    server.scorer.current()
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\nSaliendo...")
@@ -0,0 +1,239 @@
+# tasa_churn/serving/workers.py
+import asyncio
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import time
+
+import joblib
+import numpy as np
+
+from tasa_churn.features.transformer import FeatureTransformer
+from tasa_churn.models.flat_forest import FlatForest
+from tasa_churn.serving.batching import Scorer
+from tasa_churn.serving.server import ScoringServer
+from tasa_churn.utils.artifacts import artifact_store
+from tasa_churn.utils.paths import MODELS_DIR
+
+BUNDLES_DIR = MODELS_DIR / "serving"
+
+_BUNDLE_ARTIFACTS = ("columns", "encoders", "scaler")
+
+
+def bundle_path(root, version):
+    return root / f"v{version:06d}"
+
+
+def write_bundle(store, path):
+    """
+    Versión servible del modelo: el bosque aplanado (FlatForest, .npy que se abren con mmap)
+    más columns/encoders/scaler. Se escribe en un directorio temporal y se renombra al final.
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    # El scaler se escribe desde el mismo par que el modelo, no copiando el fichero actual
+    model, scaler = store.model_and_scaler()
+    FlatForest.from_model(model).save(tmp_path / "forest")
+    for name in ("columns", "encoders"):
+        shutil.copyfile(store.paths[name], tmp_path / f"{name}.joblib")
+    joblib.dump(scaler, tmp_path / "scaler.joblib")
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_bundle(path):
+    """Abre una versión: (FlatForest mapeado en memoria, FeatureTransformer)."""
+    columns, encoders, scaler = (joblib.load(path / f"{name}.joblib") for name in _BUNDLE_ARTIFACTS)
+    return FlatForest.load(path / "forest", mmap=True), FeatureTransformer(columns, encoders, scaler)
+
+
+def smoke_test(path, store, rows):
+    """
+    Comprueba una versión antes de activarla: la abre como lo hará un worker, puntúa rows
+    y compara con el modelo de sklearn. Lanza ValueError si algo no cuadra.
+    """
+    forest, transformer = load_bundle(path)
+    if forest.n_features_in_ != transformer.n_features:
+        raise ValueError(f"El modelo espera {forest.n_features_in_} features y los artefactos dan "
+                         f"{transformer.n_features}")
+    X = transformer.transform_batch({col: [row[col] for row in rows] for col in transformer.columns})
+    probs = forest.predict_proba(X)
+    if not (np.isfinite(probs).all() and np.allclose(probs.sum(axis=1), 1.0)):
+        raise ValueError("Probabilidades no válidas en el lote de prueba")
+    if not np.allclose(probs, store.model.predict_proba(X), atol=1e-9):
+        raise ValueError("El modelo aplanado no coincide con el de sklearn en el lote de prueba")
+
+
+class VersionedScorer(Scorer):
+    """
+    Scorer de un worker: usa la versión indicada por el contador compartido del supervisor.
+    Al cambiar el contador abre la nueva versión (mmap, sin copiar el modelo) antes del
+    siguiente batch; el batch en curso termina con la versión con la que empezó.
+    """
+
+    def __init__(self, shared_version, root):
+        super().__init__()
+        self.shared_version = shared_version
+        self.root = root
+        self._version = None
+        self._bundle = None
+
+    @property
+    def version(self):
+        self.current()
+        return self._version
+
+    def current(self):
+        version = self.shared_version.value
+        if version != self._version:
+            self._bundle = load_bundle(bundle_path(self.root, version))
+            self._version = version
+        return self._bundle
+
+
+def _worker_main(sock, shared_version, root, max_batch_size, max_wait_ms):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C lo gestiona el supervisor
+    scorer = VersionedScorer(shared_version, root)
+    scorer.current()
+    server = ScoringServer(scorer=scorer, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms, sock=sock)
+
+    async def run():
+        await server.start()
+        async with server._server:
+            await server._server.serve_forever()
+
+    asyncio.run(run())
+
+
+class WorkerPool:
+    """
+    Supervisor de N procesos de scoring que comparten modelo y puerto.
+        - El supervisor convierte el modelo a una versión servible (write_bundle) y los
+          workers la abren con mmap: todos comparten las mismas páginas del bosque en
+          lugar de deserializar cada uno su copia de RandomForest.joblib.
+        - Abre el socket una vez y arranca los workers con fork; el kernel reparte
+          las conexiones entre ellos (mismo socket en escucha).
+        - check_for_update(): si cambia el modelo o los artefactos en MODELS_DIR, escribe la
+          nueva versión, la valida con un lote de prueba (smoke_test) y solo entonces cambia
+          el contador compartido. Cada worker pasa a la nueva versión en su siguiente batch;
+          ninguna petición se corta. Si la validación falla se sigue con la versión actual.
+        - run() repite la comprobación cada poll_interval segundos y rearranca workers caídos.
+    """
+
+    def __init__(self, n_workers=2, host="127.0.0.1", port=8000, store=artifact_store, root=BUNDLES_DIR,
+                 max_batch_size=256, max_wait_ms=5.0, poll_interval=2.0, smoke_rows=None, keep_versions=2):
+        self.n_workers = n_workers
+        self.host = host
+        self.port = port
+        self.store = store
+        self.root = root
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.poll_interval = poll_interval
+        self.keep_versions = keep_versions
+        if smoke_rows is None:
+            from tasa_churn.serving.loadgen import random_customers
+            smoke_rows = random_customers(64)
+        self.smoke_rows = smoke_rows
+
+        self._context = multiprocessing.get_context("fork")
+        self.version = self._context.Value("i", 0, lock=False)
+        self._digests = None
+        self._sock = None
+        self._workers = []
+
+    def _current_digests(self):
+        return tuple(self.store.digest(name) for name in ("model",) + _BUNDLE_ARTIFACTS)
+
+    def check_for_update(self):
+        """Publica una nueva versión si el modelo o los artefactos han cambiado. Devuelve True si cambió."""
+        try:
+            digests = self._current_digests()
+        except FileNotFoundError:
+            return False
+        if digests == self._digests:
+            return False
+
+        version = self.version.value + 1
+        path = bundle_path(self.root, version)
+        try:
+            write_bundle(self.store, path)
+            smoke_test(path, self.store, self.smoke_rows)
+        except Exception as e:
+            shutil.rmtree(path, ignore_errors=True)
+            # No se reintenta hasta que vuelvan a cambiar los ficheros
+            self._digests = digests
+            print(f"    Nueva versión del modelo rechazada: {e}")
+            return False
+
+        # Cambio atómico: los workers leen el contador antes de cada batch
+        self.version.value = version
+        self._digests = digests
+        print(f"--> Modelo v{version} activo ({path})")
+        for old in range(version - self.keep_versions, 0, -1):
+            if not bundle_path(self.root, old).exists():
+                break
+            # Los workers que aún la tengan mapeada la conservan hasta soltarla
+            shutil.rmtree(bundle_path(self.root, old), ignore_errors=True)
+        return True
+
+    def _spawn(self):
+        process = self._context.Process(
+            target=_worker_main,
+            args=(self._sock, self.version, self.root, self.max_batch_size, self.max_wait_ms),
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    def start(self):
+        """Publica la versión inicial, abre el socket y arranca los workers."""
+        shutil.rmtree(self.root, ignore_errors=True)
+        self.root.mkdir(parents=True)
+        if not self.check_for_update():
+            raise RuntimeError("No se pudo preparar el modelo inicial")
+
+        self._sock = socket.create_server((self.host, self.port), reuse_port=False, backlog=1024)
+        self._sock.setblocking(False)
+        self.port = self._sock.getsockname()[1]
+        self._workers = [self._spawn() for _ in range(self.n_workers)]
+        print(f"--> {self.n_workers} workers de scoring en http://{self.host}:{self.port} "
+              f"(batch máx. {self.max_batch_size}, espera máx. {self.max_wait_ms} ms)")
+        return self
+
+    def restart_dead_workers(self):
+        for i, process in enumerate(self._workers):
+            if not process.is_alive():
+                print(f"    Worker {process.pid} terminado (código {process.exitcode}), rearrancando...")
+                self._workers[i] = self._spawn()
+
+    def run(self):
+        try:
+            while True:
+                time.sleep(self.poll_interval)
+                self.check_for_update()
+                self.restart_dead_workers()
+        except KeyboardInterrupt:
+            print("\nSaliendo...")
+        finally:
+            self.stop()
+
+    def stop(self):
+        for process in self._workers:
+            process.terminate()
+        for process in self._workers:
+            process.join()
+        self._workers = []
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+def serve_workers(n_workers=2, host="127.0.0.1", port=8000, max_batch_size=256, max_wait_ms=5.0,
+                  poll_interval=2.0):
+    """Arranca el supervisor con n_workers procesos y recarga el modelo cuando cambie."""
+    WorkerPool(n_workers, host, port, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms,
+               poll_interval=poll_interval).start().run()
@@ -0,0 +1,187 @@
+# tasa_churn/utils/artifacts.py
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+
+from tasa_churn.utils.paths import ARTIFACTS_DIR, MODELS_DIR
+
+# Nombre del modelo que usan el CLI y los scorers
+MODEL_NAME = "RandomForest.joblib"
+# Resumen en JSON de columnas y opciones categóricas (se lee sin joblib ni sklearn)
+SCHEMA_NAME = "schema.json"
+
+
+class ArtifactStore:
+    """
+    Caché en proceso de los artefactos de entrenamiento y del modelo.
+        - Carga columns, encoders, scaler y el modelo una sola vez por proceso.
+        - En cada acceso solo hace un stat() del fichero: si cambian mtime o tamaño,
+          recalcula el hash del contenido y recarga únicamente si el contenido cambió.
+        - Es seguro usarlo desde varios hilos.
+    """
+
+    def __init__(self, artifacts_dir=ARTIFACTS_DIR, models_dir=MODELS_DIR, model_name=MODEL_NAME):
+        self.paths = {
+            "columns": artifacts_dir / "columns.joblib",
+            "encoders": artifacts_dir / "encoders.joblib",
+            "scaler": artifacts_dir / "scaler.joblib",
+            "model": models_dir / model_name,
+        }
+        self._cache = {}
+        self._lock = threading.RLock()
+
+    def get(self, name):
+        """
+        Devuelve el artefacto 'name' (columns, encoders, scaler o model).
+        Lanza FileNotFoundError si el fichero no existe.
+        """
+        path = self.paths[name]
+        st = path.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            entry = self._cache.get(name)
+            if entry is not None and entry["stamp"] == stamp:
+                return entry["value"]
+
+            import joblib
+
+            data = path.read_bytes()
+            digest = _content_digest(data)
+            if entry is not None and entry["digest"] == digest:
+                # Solo ha cambiado la fecha: el objeto en memoria sigue siendo válido
+                entry["stamp"] = stamp
+                return entry["value"]
+
+            value = joblib.load(io.BytesIO(data))
+            self._cache[name] = {"stamp": stamp, "digest": digest, "value": value}
+            return value
+
+    def digest(self, name):
+        """Hash del contenido del artefacto tal y como está cargado en memoria."""
+        self.get(name)
+        return self._cache[name]["digest"]
+
+    def invalidate(self, name=None):
+        """Olvida uno o todos los artefactos cacheados (p.ej. tras re-entrenar)."""
+        with self._lock:
+            if name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(name, None)
+
+    def model_and_scaler(self, timeout=5.0):
+        """
+        Modelo y scaler que van juntos. El modelo guarda el hash del scaler con el que se
+        entrenó (scaler_digest_, ver save_model): si no coincide, un escritor está a mitad de
+        sustituirlos (p.ej. update) y se espera a que termine. Lanza ValueError si tras
+        timeout segundos siguen sin corresponder. Los modelos sin hash (anteriores) se aceptan.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                scaler, model = self.get("scaler"), self.get("model")
+                expected = getattr(model, "scaler_digest_", None)
+                if expected is None or expected == self._cache["scaler"]["digest"]:
+                    return model, scaler
+            if time.monotonic() >= deadline:
+                raise ValueError(f"{self.paths['model'].name} no corresponde a {self.paths['scaler'].name} "
+                                 "(se entrenó con otro scaler)")
+            time.sleep(0.05)
+
+    def load_all(self):
+        """Carga (o valida) todos los artefactos de una vez."""
+        return {name: self.get(name) for name in self.paths}
+
+    @property
+    def columns(self):
+        return self.get("columns")
+
+    @property
+    def encoders(self):
+        return self.get("encoders")
+
+    @property
+    def scaler(self):
+        return self.get("scaler")
+
+    @property
+    def model(self):
+        return self.get("model")
+
+
+# Instancia compartida por todo el proceso
+artifact_store = ArtifactStore()
+
+
+def _content_digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def save_model(model, path, scaler_path=None):
+    """
+    Guarda el modelo de forma atómica (fichero temporal + os.replace) con el hash del scaler
+    con el que se entrenó (scaler_digest_), para que ArtifactStore.model_and_scaler nunca lo
+    empareje con otro scaler. scaler_path: por defecto models/artifacts/scaler.joblib.
+    """
+    scaler_path = ARTIFACTS_DIR / "scaler.joblib" if scaler_path is None else scaler_path
+    if scaler_path.exists():
+        model.scaler_digest_ = _content_digest(scaler_path.read_bytes())
+
+    import joblib
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def build_schema(columns, encoders):
+    """
+    Describe las columnas de entrada para el CLI:
+        - columns: orden en que se piden los datos.
+        - categorical: opciones válidas por columna; exact=True para LabelEncoder
+          (coincidencia exacta) y False para diccionarios (se acepta cualquier capitalización).
+    """
+    categorical = {}
+    for col in columns:
+        encoder = encoders.get(col)
+        if hasattr(encoder, 'classes_'):
+            categorical[col] = {"options": [str(c) for c in encoder.classes_], "exact": True}
+        elif isinstance(encoder, dict):
+            categorical[col] = {"options": [str(k) for k in encoder], "exact": False}
+    return {"columns": list(columns), "categorical": categorical}
+
+
+def write_schema(columns, encoders, artifacts_dir=ARTIFACTS_DIR):
+    """
+    Guarda el esquema junto a los artefactos, con el hash de columns.joblib y
+    encoders.joblib para detectar si se quedó desfasado.
+    """
+    schema = build_schema(columns, encoders)
+    schema["digests"] = {name: _content_digest((artifacts_dir / f"{name}.joblib").read_bytes())
+                         for name in ("columns", "encoders")}
+    path = artifacts_dir / SCHEMA_NAME
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(schema, indent=2, ensure_ascii=False))
+    os.replace(tmp_path, path)
+    return schema
+
+
+def read_schema(artifacts_dir=ARTIFACTS_DIR):
+    """
+    Lee el esquema sin deserializar los encoders (no importa joblib ni sklearn).
+    Devuelve None si no existe o si columns/encoders cambiaron desde que se escribió.
+    """
+    path = artifacts_dir / SCHEMA_NAME
+    try:
+        schema = json.loads(path.read_text())
+        for name, digest in schema["digests"].items():
+            if _content_digest((artifacts_dir / f"{name}.joblib").read_bytes()) != digest:
+                return None
+    except (FileNotFoundError, KeyError, ValueError):
+        return None
+    return schema
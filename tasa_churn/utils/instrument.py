@@ -0,0 +1,190 @@
+# tasa_churn/utils/instrument.py
+import atexit
+import cProfile
+import functools
+import json
+import os
+import time
+import tracemalloc
+
+from tasa_churn.utils.paths import REPORTS_DIR
+
+TRACES_DIR = REPORTS_DIR / "traces"
+
+
+class _NoopStage:
+    """Etapa vacía que se devuelve cuando la instrumentación está apagada (coste ~0)."""
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopStage()
+
+
+class _Stage:
+    def __init__(self, tracer, name, rows):
+        self.tracer = tracer
+        self.name = name
+        self.rows = rows
+        self._peak_seen = 0
+        self._profiler = None
+
+    def __enter__(self):
+        tracer = self.tracer
+        if tracer.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if tracer.stack:
+                parent = tracer.stack[-1]
+                parent._peak_seen = max(parent._peak_seen, peak)
+            tracemalloc.reset_peak()
+            self._mem_start = current
+        tracer.stack.append(self)
+        self.path = "/".join(s.name for s in tracer.stack)
+
+        if tracer.profile_stage == self.name:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+        self._cpu = time.process_time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self._start
+        cpu = time.process_time() - self._cpu
+        tracer = self.tracer
+
+        if self._profiler is not None:
+            self._profiler.disable()
+            tracer.dump_profile(self._profiler, self.name)
+
+        tracer.stack.pop()
+        peak_mb = increase_mb = None
+        if tracer.memory:
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, self._peak_seen)
+            if tracer.stack:
+                parent = tracer.stack[-1]
+                parent._peak_seen = max(parent._peak_seen, peak)
+            tracemalloc.reset_peak()
+            peak_mb, increase_mb = peak / 1e6, (peak - self._mem_start) / 1e6
+
+        tracer.spans.append({
+            "stage": self.path,
+            "start_seconds": self._start - tracer.started,
+            "wall_seconds": wall,
+            "cpu_seconds": cpu,
+            "peak_traced_mb": peak_mb,
+            "peak_increase_mb": increase_mb,
+            "rows": None if self.rows is None else int(self.rows),
+            "error": exc[0].__name__ if exc[0] is not None else None,
+        })
+        return False
+
+
+class Tracer:
+    """
+    Registro de etapas del pipeline: tiempo de pared, tiempo de CPU, pico de memoria
+    (tracemalloc) y filas procesadas.
+        - Apagado por defecto: stage() devuelve un objeto vacío y no mide nada.
+        - Encendido con enable_tracing() o la variable de entorno TASA_CHURN_TRACE=1.
+        - La memoria se mide con tracemalloc, que encarece las etapas con muchas
+          asignaciones (p.ej. leer CSV); memory=False (TASA_CHURN_TRACE_MEMORY=0) la desactiva.
+        - profile_stage (o TASA_CHURN_PROFILE=<etapa>) guarda un volcado de cProfile
+          de esa etapa en reports/traces.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = True
+        self.profile_stage = None
+        self.output_dir = TRACES_DIR
+        self.spans = []
+        self.stack = []
+        self.started = time.perf_counter()
+
+    def stage(self, name, rows=None):
+        if not self.enabled:
+            return _NOOP
+        return _Stage(self, name, rows)
+
+    def dump_profile(self, profiler, name):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"profile-{name}-{time.strftime('%Y%m%d-%H%M%S')}.prof"
+        profiler.dump_stats(path)
+        print(f"    Perfil de '{name}' guardado en {path}")
+
+    def write(self, path=None):
+        """Escribe la traza en JSON (por defecto reports/traces/trace-<fecha>.json)."""
+        if not self.spans:
+            return None
+        if path is None:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            path = self.output_dir / f"trace-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        spans = sorted(self.spans, key=lambda s: s["start_seconds"])
+        path.write_text(json.dumps({"spans": spans}, indent=2))
+        self.spans = []
+        print(f"--> Traza de etapas guardada en {path}")
+        return path
+
+
+tracer = Tracer()
+
+
+def stage(name, rows=None):
+    """
+    Context manager para medir una etapa:
+
+        with stage("dropna") as s:
+            df = df.dropna()
+            s.rows = len(df)
+    """
+    return tracer.stage(name, rows)
+
+
+def traced(name=None):
+    """Decorador equivalente a envolver la función entera en stage(name)."""
+    def decorator(fn):
+        stage_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.stage(stage_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def enable_tracing(profile_stage=None, memory=True, output_dir=None):
+    """Activa la instrumentación; la traza se escribe al salir del proceso (o con write_trace)."""
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    tracer.enabled = True
+    tracer.memory = memory
+    tracer.profile_stage = profile_stage
+    if output_dir is not None:
+        tracer.output_dir = output_dir
+    atexit.unregister(write_trace)
+    atexit.register(write_trace)
+
+
+def disable_tracing():
+    tracer.enabled = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def write_trace(path=None):
+    return tracer.write(path)
+
+
+if os.environ.get("TASA_CHURN_TRACE") == "1":
+    enable_tracing(profile_stage=os.environ.get("TASA_CHURN_PROFILE"),
+                   memory=os.environ.get("TASA_CHURN_TRACE_MEMORY", "1") != "0")
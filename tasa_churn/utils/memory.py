@@ -0,0 +1,21 @@
+# tasa_churn/utils/memory.py
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows no tiene el módulo resource
+    resource = None
+
+
+def peak_memory_mb():
+    """
+    Devuelve el pico de memoria residente (RSS) del proceso actual en MB.
+        - En Linux ru_maxrss viene en KB, en macOS en bytes.
+        - Devuelve None si la plataforma no permite medirlo.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
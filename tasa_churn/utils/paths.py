@@ -6,7 +6,8 @@ PROJECT_DIR = Path(__file__).resolve().parents[2]
 DATA_DIR = PROJECT_DIR / "data"
 RAW_DATA_DIR = DATA_DIR / "raw"
 PROCESSED_DATA_DIR = DATA_DIR / "processed"
-MODELS_DIR = PROJECT_DIR / "models"
+# Se puede redirigir con TASA_CHURN_MODELS_DIR (p.ej. benchmarks que no deben pisar el modelo real)
+MODELS_DIR = Path(os.environ.get("TASA_CHURN_MODELS_DIR", PROJECT_DIR / "models"))
 REPORTS_DIR = PROJECT_DIR / "reports"
 FIGURES_DIR = REPORTS_DIR / "figures"
 
@@ -0,0 +1,29 @@
+# tasa_churn/utils/shared_arrays.py
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+
+@contextmanager
+def shared_arrays(directory=None, **arrays):
+    """
+    Publica arrays de solo lectura para varios procesos sin copiarlos.
+        - Guarda cada array como .npy en un directorio temporal.
+        - Devuelve un dict nombre -> ruta; los workers los abren con open_shared
+          (np.load con mmap_mode='r'), así todos comparten las mismas páginas en caché.
+        - Al salir del bloque se borran los ficheros.
+    """
+    with tempfile.TemporaryDirectory(prefix="tasa_churn-", dir=directory) as tmp:
+        paths = {}
+        for name, values in arrays.items():
+            path = Path(tmp) / f"{name}.npy"
+            np.save(path, np.ascontiguousarray(values))
+            paths[name] = str(path)
+        yield paths
+
+
+def open_shared(paths):
+    """Abre (mapeados en memoria, solo lectura) los arrays publicados con shared_arrays."""
+    return {name: np.load(path, mmap_mode="r") for name, path in paths.items()}
@@ -0,0 +1,67 @@
+import functools
+
+import pytest
+import numpy as np
+import pandas as pd
+
+@pytest.fixture
+def sample_df():
+    data = {
+        "CustomerID": [1, 2],
+        "Gender": ["Male", "Female"],
+        "Subscription Type": ["Basic", "Premium"],
+        "Contract Length": ["Monthly", "Annual"],
+        "Usage Frequency": [5, 10],
+        "Last Interaction": [3, 2],
+        "Total Spend": [200, 400],
+        "Age": [35, 42],
+        "Tenure": [24, 36],
+        "Support Calls": [2, 1],
+        "Payment Delay": [3, 0],
+        "Churn": [1, 0]
+    }
+    return pd.DataFrame(data)
+
+
+@pytest.fixture
+def churn_df():
+    rng = np.random.default_rng(0)
+    n = 300
+    data = {
+        "CustomerID": np.arange(1, n + 1),
+        "Age": rng.integers(18, 66, n),
+        "Gender": rng.choice(["Male", "Female"], n),
+        "Tenure": rng.integers(1, 61, n),
+        "Usage Frequency": rng.integers(1, 31, n),
+        "Support Calls": rng.integers(0, 11, n),
+        "Payment Delay": rng.integers(0, 31, n),
+        "Subscription Type": rng.choice(["Basic", "Standard", "Premium"], n),
+        "Contract Length": rng.choice(["Monthly", "Quarterly", "Annual"], n),
+        "Total Spend": rng.integers(100, 1001, n),
+        "Last Interaction": rng.integers(1, 31, n),
+    }
+    data["Churn"] = ((data["Support Calls"] > 5) | (data["Payment Delay"] > 20)).astype(int)
+    return pd.DataFrame(data)
+
+
+@pytest.fixture(autouse=True)
+def artifacts_dir(tmp_path_factory, monkeypatch):
+    """
+    Todos los tests escriben los artefactos en un directorio temporal en lugar de models/artifacts
+    (preprocess_data, la caché de preprocesado, out-of-core, save_model y la caché de artefactos).
+    """
+    from tasa_churn.features import build_features, out_of_core, preprocess_cache
+    from tasa_churn.utils import artifacts
+    from tasa_churn.utils.artifacts import artifact_store, write_schema
+
+    # Misma estructura que models/: <models>/artifacts
+    path = tmp_path_factory.mktemp("models") / "artifacts"
+    path.mkdir()
+    for module in (build_features, preprocess_cache, out_of_core, artifacts):
+        monkeypatch.setattr(module, "ARTIFACTS_DIR", path)
+    for module in (build_features, preprocess_cache, out_of_core):
+        monkeypatch.setattr(module, "write_schema", functools.partial(write_schema, artifacts_dir=path))
+    monkeypatch.setattr(artifact_store, "paths", {
+        **artifact_store.paths, **{name: path / f"{name}.joblib" for name in ("columns", "encoders", "scaler")}})
+    monkeypatch.setattr(artifact_store, "_cache", {})
+    return path
@@ -0,0 +1,65 @@
+import os
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+
+from tasa_churn.utils.artifacts import ArtifactStore, read_schema, save_model, write_schema
+
+
+def test_store_loads_once_and_reloads_on_change(tmp_path):
+    joblib.dump(["Age", "Tenure"], tmp_path / "columns.joblib")
+    store = ArtifactStore(artifacts_dir=tmp_path, models_dir=tmp_path)
+
+    first = store.columns
+    assert store.columns is first
+
+    # Mismo contenido con otra fecha: no se vuelve a deserializar
+    st = os.stat(tmp_path / "columns.joblib")
+    os.utime(tmp_path / "columns.joblib", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert store.columns is first
+
+    # Contenido distinto: se recarga
+    joblib.dump(["Age", "Tenure", "Gender"], tmp_path / "columns.joblib")
+    os.utime(tmp_path / "columns.joblib", ns=(st.st_atime_ns, st.st_mtime_ns + 2 * 10**9))
+    assert store.columns == ["Age", "Tenure", "Gender"]
+
+
+def test_schema_is_read_without_encoders_and_detects_stale_files(tmp_path):
+    columns = ["Gender", "Age", "Contract Length"]
+    encoders = {"Gender": LabelEncoder().fit(["Male", "Female"]),
+                "Contract Length": {"Monthly": 0, "Annual": 1}}
+    joblib.dump(columns, tmp_path / "columns.joblib")
+    joblib.dump(encoders, tmp_path / "encoders.joblib")
+
+    assert read_schema(tmp_path) is None
+    write_schema(columns, encoders, artifacts_dir=tmp_path)
+
+    schema = read_schema(tmp_path)
+    assert schema["columns"] == columns
+    assert schema["categorical"]["Gender"] == {"options": ["Female", "Male"], "exact": True}
+    assert schema["categorical"]["Contract Length"] == {"options": ["Monthly", "Annual"], "exact": False}
+    assert "Age" not in schema["categorical"]
+
+    # Encoders re-entrenados sin actualizar el esquema: se descarta
+    joblib.dump({"Gender": encoders["Gender"]}, tmp_path / "encoders.joblib")
+    assert read_schema(tmp_path) is None
+
+
+def test_model_is_only_paired_with_its_scaler(tmp_path):
+    X, y = np.arange(20.0).reshape(10, 2), np.arange(10) % 2
+    joblib.dump(MinMaxScaler().fit(X), tmp_path / "scaler.joblib")
+    model = LogisticRegression().fit(X, y)
+    save_model(model, tmp_path / "RandomForest.joblib", scaler_path=tmp_path / "scaler.joblib")
+    store = ArtifactStore(artifacts_dir=tmp_path, models_dir=tmp_path)
+
+    paired, scaler = store.model_and_scaler()
+    assert paired.scaler_digest_ == store.digest("scaler")
+    assert not list(tmp_path.glob("*.tmp"))
+
+    # Otro scaler bajo el mismo modelo (p.ej. un update a medias): no se emparejan
+    joblib.dump(MinMaxScaler().fit(X * 2), tmp_path / "scaler.joblib")
+    with pytest.raises(ValueError):
+        store.model_and_scaler(timeout=0)
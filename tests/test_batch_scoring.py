@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from tasa_churn.features.build_features import preprocess_data, process_batch, process_input
+from tasa_churn.features.transformer import FeatureTransformer
+from tasa_churn.features.validation import MISSING_VALUE, NOT_NUMERIC, OUT_OF_RANGE, UNKNOWN_CATEGORY
+from tasa_churn.models.predict_model import score_csv
+from tasa_churn.utils.artifacts import artifact_store
+
+
+def _pandas_transform(user_data, columns, encoders, scaler):
+    """Codificación y escalado originales de process_input (DataFrame de una fila)."""
+    df = pd.DataFrame(columns=columns)
+    for col in columns:
+        df.loc[0, col] = user_data[col]
+    df['Gender'] = encoders['Gender'].transform(df['Gender'].astype(str))
+    for col in ('Subscription Type', 'Contract Length'):
+        df[col] = df[col].astype(str).str.title().map(encoders[col])
+        if df[col].isna().any():
+            df[col] = 0
+    df = df.apply(pd.to_numeric, errors='coerce').fillna(0)
+    return scaler.transform(df.to_numpy(dtype=np.float64))
+
+
+def test_process_batch_matches_process_input(churn_df):
+    preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=True)
+    rows = churn_df.head(20)
+    batch = process_batch(rows)
+    single = np.vstack([process_input(r) for r in rows.to_dict("records")])
+    np.testing.assert_array_equal(batch, single)
+
+
+def test_transform_batch_matches_pandas_encoding(churn_df, artifacts_dir):
+    preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=True)
+    columns, encoders, scaler = artifact_store.columns, artifact_store.encoders, artifact_store.scaler
+    transformer = FeatureTransformer(columns, encoders, scaler)
+
+    rows = churn_df[columns].head(12).copy()
+    # Categorías desconocidas (pasan a 0) y con otras mayúsculas (se aplica title())
+    rows["Subscription Type"] = ["Gold", "premium", "BASIC", "Standard"] * 3
+    rows["Contract Length"] = ["annual", "Weekly", "QUARTERLY", "Monthly"] * 3
+    expected = np.vstack([_pandas_transform(r, columns, encoders, scaler) for r in rows.to_dict("records")])
+    np.testing.assert_array_equal(transformer.transform_batch(rows), expected.astype(transformer.dtype))
+
+    # Gender usa LabelEncoder: una categoría desconocida falla en los dos
+    unknown = {**rows.iloc[0].to_dict(), "Gender": "male"}
+    with pytest.raises(ValueError):
+        _pandas_transform(unknown, columns, encoders, scaler)
+    with pytest.raises(ValueError):
+        transformer.transform_batch({col: [value] for col, value in unknown.items()})
+
+
+def test_score_csv_writes_all_rows(churn_df, tmp_path):
+    X_train, X_test, y_train, y_test = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=True)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X_train, y_train)
+
+    input_path = tmp_path / "clientes.csv"
+    output_path = tmp_path / "scores.csv"
+    churn_df.drop(columns=["Churn"]).to_csv(input_path, index=False)
+
+    stats = score_csv(input_path, output_path, model=model, chunk_size=64)
+    scores = pd.read_csv(output_path)
+
+    assert stats["rows"] == len(churn_df)
+    assert list(scores["CustomerID"]) == list(churn_df["CustomerID"])
+    expected = model.predict_proba(pd.DataFrame(process_batch(churn_df), columns=X_train.columns))[:, 1]
+    np.testing.assert_allclose(scores["churn_probability"], expected)
+
+
+def test_score_csv_quarantines_invalid_rows(churn_df, tmp_path):
+    X_train, _, y_train, _ = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=True)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X_train, y_train)
+
+    rows = churn_df.drop(columns=["Churn"]).head(50).astype({"Age": object})
+    rows.loc[3, "Gender"] = "Otro"
+    rows.loc[7, "Age"] = "treinta"
+    rows.loc[8, "Age"] = 500
+    rows.loc[9, "Tenure"] = np.nan
+    input_path = tmp_path / "clientes.csv"
+    output_path = tmp_path / "scores.csv"
+    rows.to_csv(input_path, index=False)
+
+    stats = score_csv(input_path, output_path, model=model, chunk_size=16)
+    scores = pd.read_csv(output_path)
+    rejects = pd.read_csv(tmp_path / "scores.rejects.csv")
+
+    assert (stats["rows"], stats["rejected"]) == (50, 4)
+    assert list(rejects["CustomerID"]) == [4, 8, 9, 10]
+    assert list(rejects["error_code"]) == [UNKNOWN_CATEGORY, NOT_NUMERIC, OUT_OF_RANGE, MISSING_VALUE]
+    assert rejects["errors"][0] == "Gender: categoría desconocida"
+    assert len(scores) == 46 and not scores["CustomerID"].isin(rejects["CustomerID"]).any()
+
+    # Sin rechazos no queda el fichero de la ejecución anterior; con todas rechazadas, la salida queda vacía
+    churn_df.drop(columns=["Churn"]).head(20).to_csv(input_path, index=False)
+    assert score_csv(input_path, output_path, model=model)["rejected"] == 0
+    assert not (tmp_path / "scores.rejects.csv").exists()
+    rows.assign(Gender="Otro").to_csv(input_path, index=False)
+    assert score_csv(input_path, output_path, model=model)["rejected"] == 50
+    assert list(pd.read_csv(output_path).columns) == ["CustomerID", "churn_probability", "churn_prediction"]
+    assert pd.read_csv(output_path).empty
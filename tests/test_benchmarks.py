@@ -0,0 +1,44 @@
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from tasa_churn.benchmarks.startup import measure_startup
+from tasa_churn.benchmarks.suite import compare_to_baseline
+from tasa_churn.data.synthetic import COLUMNS, synthetic_chunks, write_synthetic_csv
+from tasa_churn.features.build_features import preprocess_data
+from tasa_churn.utils.artifacts import save_model
+
+
+def test_synthetic_data_schema_and_reproducibility(tmp_path):
+    path = write_synthetic_csv(tmp_path / "synthetic.csv", 2500, seed=3, chunk_size=1000)
+    df = pd.read_csv(path)
+
+    assert list(df.columns) == COLUMNS
+    assert len(df) == 2500
+    assert df["CustomerID"].is_unique
+    assert df["Age"].between(18, 65).all()
+    assert set(df["Contract Length"]) == {"Monthly", "Quarterly", "Annual"}
+    assert 0 < df["Churn"].mean() < 1
+
+    again = pd.concat(synthetic_chunks(2500, seed=3, chunk_size=1000), ignore_index=True)
+    pd.testing.assert_frame_equal(df, again, check_dtype=False)
+
+
+def test_compare_to_baseline_flags_regressions():
+    baseline = {"cases": {"train": {"wall_seconds": 1.0, "peak_rss_mb": 100.0},
+                          "batch_scoring": {"rows_per_sec": 1000.0}}}
+    results = {"cases": {"train": {"wall_seconds": 1.1, "peak_rss_mb": 150.0},
+                         "batch_scoring": {"rows_per_sec": 500.0}}}
+
+    regressions = compare_to_baseline(results, baseline, tolerance=0.25)
+    assert {(r["case"], r["metric"]) for r in regressions} == {("train", "peak_rss_mb"),
+                                                               ("batch_scoring", "rows_per_sec")}
+
+
+def test_measure_startup_reaches_first_prediction(churn_df, artifacts_dir):
+    # Modelo propio junto a los artefactos temporales (misma estructura que models/)
+    X_train, _, y_train, _ = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=True)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X_train, y_train)
+    save_model(model, artifacts_dir.parent / "RandomForest.joblib")
+
+    stats = measure_startup(models_dir=artifacts_dir.parent)
+    assert 0 < stats["first_prompt_seconds"] < stats["first_prediction_seconds"]
@@ -0,0 +1,46 @@
+import numpy as np
+from sklearn.metrics import average_precision_score, roc_auc_score
+
+from tasa_churn.features.build_features import preprocess_data
+from tasa_churn.models.cross_validation import bootstrap_metrics, cross_validate_models, weighted_metrics
+
+
+def test_weighted_metrics_match_sklearn_on_resamples():
+    rng = np.random.default_rng(0)
+    y = rng.random(500) < 0.3
+    scores = np.round(rng.random(500) * 0.6 + y * 0.3, 2)  # con empates
+    idx = rng.integers(0, 500, size=(3, 500))
+    counts = np.stack([np.bincount(i, minlength=500) for i in idx])
+
+    metrics = weighted_metrics(y, scores, counts)
+    for row, i in enumerate(idx):
+        assert np.isclose(metrics["roc_auc"][row], roc_auc_score(y[i], scores[i]))
+        assert np.isclose(metrics["pr_auc"][row], average_precision_score(y[i], scores[i]))
+
+    top = np.argsort(-scores, kind="stable")[:50]
+    point = weighted_metrics(y, scores, np.ones((1, 500)))
+    assert np.isclose(point["recall_top_decile"][0], y[top].sum() / y.sum())
+
+    summary = bootstrap_metrics(y, scores, n_bootstrap=200)
+    assert summary["roc_auc"]["ci_low"] <= summary["roc_auc"]["estimate"] <= summary["roc_auc"]["ci_high"]
+
+
+def test_cross_validate_models_caches_oof_predictions(churn_df, tmp_path):
+    X_train, _, y_train, _ = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=False)
+    candidates = {
+        "rf_small": ("sklearn.ensemble.RandomForestClassifier", {"n_estimators": 5, "max_depth": 3, "random_state": 0}),
+        "missing": ("paquete_inexistente.Modelo", {}),
+    }
+    kwargs = dict(candidates=candidates, n_splits=3, n_workers=2, n_bootstrap=50,
+                  cache_dir=tmp_path / "oof", report_path=tmp_path / "cv.csv")
+
+    table = cross_validate_models(X_train, y_train, **kwargs)
+    assert list(table["model"]) == ["rf_small"]
+    assert {"roc_auc", "roc_auc_ci_low", "pr_auc", "recall_top_decile"} <= set(table.columns)
+    assert len(list((tmp_path / "oof").glob("rf_small-*.npy"))) == 1
+    assert (tmp_path / "cv.json").exists()
+
+    # Segunda ejecución: mismas métricas sin volver a entrenar
+    again = cross_validate_models(X_train, y_train, **kwargs)
+    assert again["fit_seconds"].isna().all()
+    assert again["roc_auc"][0] == table["roc_auc"][0]
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from tasa_churn.data.dedup import DedupIndex
+from tasa_churn.features.out_of_core import preprocess_out_of_core
+
+
+def test_dedup_index_filters_within_and_across_runs(churn_df, tmp_path):
+    first, second = churn_df.iloc[:200], churn_df.iloc[150:]
+
+    index = DedupIndex(tmp_path / "index", max_segments=2)
+    keep = index.filter(pd.concat([first, first.iloc[:10]]))
+    assert keep.sum() == 200 and not keep[200:].any()
+    index.commit()
+
+    # Nueva ejecución: el índice persiste y solo pasan las 100 filas no vistas
+    index = DedupIndex(tmp_path / "index", max_segments=2)
+    assert index.filter(second).sum() == 100
+    index.commit()
+    assert len(DedupIndex(tmp_path / "index", max_segments=2)) == 300
+
+    # Un tercer segmento supera max_segments: se fusionan en uno
+    index = DedupIndex(tmp_path / "index", max_segments=2)
+    extra = churn_df.iloc[:5].assign(CustomerID=range(1000, 1005))
+    assert index.filter(extra).all()
+    index.commit()
+    assert len(index.meta["segments"]) == 1
+    assert len(list((tmp_path / "index").glob("segment-*.npy"))) == 1
+    assert not index.filter(churn_df).any()
+
+
+def test_dedup_by_key_and_in_out_of_core_pipeline(churn_df, tmp_path):
+    index = DedupIndex(tmp_path / "by_customer", key_col="CustomerID")
+    changed = churn_df.iloc[:50].assign(Tenure=99)
+    index.filter(churn_df)
+    assert not index.filter(changed).any()
+
+    csv_path = tmp_path / "churn.csv"
+    pd.concat([churn_df, churn_df.iloc[:40]]).to_csv(csv_path, index=False)
+    X_train, X_test, _, _ = preprocess_out_of_core(csv_path, tmp_path / "matrices", chunk_size=100,
+                                                   save_artifacts=False, dedup=DedupIndex(tmp_path / "rows"))
+    # Los 40 duplicados caen en otro bloque: solo el índice los detecta
+    assert len(X_train) + len(X_test) == len(churn_df)
+    assert len(DedupIndex(tmp_path / "rows")) == len(churn_df)
@@ -0,0 +1,92 @@
+import json
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import MinMaxScaler
+
+from tasa_churn.features.build_features import preprocess_data
+from tasa_churn.features.drift import N_BINS, DriftMonitor, DriftReference, bin_counts
+from tasa_churn.features.validation import OUT_OF_RANGE
+from tasa_churn.models.predict_model import score_csv
+
+
+def _reference(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    raw = np.column_stack([rng.integers(18, 66, n), rng.integers(0, 31, n)]).astype(float)
+    scaler = MinMaxScaler().fit(raw)
+    reference = DriftReference.from_scaler(["Age", "Payment Delay"], scaler).add(scaler.transform(raw))
+    return reference, scaler, rng
+
+
+def test_bin_counts_matches_histogram():
+    # Valores lejos de los bordes de los bins
+    X = ((np.random.default_rng(1).integers(-200, 1200, size=(1000, 3)) + 0.5) / 1000).astype(np.float32)
+    counts = bin_counts(X, 1.0, 0.0)
+    assert counts.shape == (3, N_BINS + 2)
+    for j in range(3):
+        inside = X[:, j][(X[:, j] >= 0) & (X[:, j] <= 1)]
+        assert counts[j, 0] == (X[:, j] < 0).sum()
+        assert counts[j, -1] == (X[:, j] > 1).sum()
+        np.testing.assert_array_equal(counts[j, 1:-1], np.histogram(inside, bins=N_BINS, range=(0, 1))[0])
+
+
+def test_monitor_detects_shift_and_slides_window():
+    reference, scaler, rng = _reference()
+    monitor = DriftMonitor(reference, scaler, bucket_rows=1000, window_buckets=1)
+
+    same = np.column_stack([rng.integers(18, 66, 2000), rng.integers(0, 31, 2000)]).astype(float)
+    monitor.update(scaler.transform(same))
+    report = monitor.report()
+    assert (report["psi"] < 0.05).all() and (report["out_of_range_rate"] == 0).all()
+
+    # Clientes que pagan mucho más tarde: fuera del rango de entrenamiento
+    shifted = same.copy()
+    shifted[:, 1] += 20
+    monitor.update(scaler.transform(shifted))
+    report = monitor.report()
+    assert report.loc["Payment Delay", "psi"] > 0.2
+    assert report.loc["Payment Delay", "out_of_range_rate"] > 0.5
+    assert report.loc["Age", "psi"] < 0.05
+    assert monitor.alerts() == ["Payment Delay"]
+    # Una entrada por cubo cerrado; la ventana (un cubo) ya solo contiene el bloque desplazado
+    assert len(monitor.history) == 2 and monitor.history[-1]["window_rows"] == 2000
+    assert monitor.rows_seen == 4000
+
+
+def test_monitor_follows_scaler_updates():
+    reference, scaler, rng = _reference()
+    raw = np.column_stack([rng.integers(18, 66, 3000), rng.integers(0, 31, 3000)]).astype(float)
+    # Scaler actualizado con un rango más amplio (p.ej. tras update): mismos bins que la referencia
+    wider = MinMaxScaler().fit(np.vstack([raw, [[10, 0], [90, 60]]]))
+    original = DriftMonitor(reference, scaler)
+    original.update(scaler.transform(raw))
+    updated = DriftMonitor(reference, wider)
+    updated.update(wider.transform(raw).astype(np.float32))
+    pd.testing.assert_frame_equal(updated.report(), original.report())
+
+
+def test_monitor_uses_validator_flags():
+    reference, scaler, _ = _reference()
+    monitor = DriftMonitor(reference, scaler)
+    flags = np.zeros((10, 2), dtype=np.uint8)
+    flags[:3, 0] = OUT_OF_RANGE
+    monitor.update(None, flags)
+    np.testing.assert_allclose(monitor.report()["out_of_range_rate"], [0.3, 0.0])
+
+
+def test_score_csv_writes_drift_report(churn_df, tmp_path, artifacts_dir):
+    X_train, _, y_train, _ = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=True)
+    assert (artifacts_dir / "drift_reference.joblib").exists()
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X_train, y_train)
+
+    input_path = tmp_path / "clientes.csv"
+    output_path = tmp_path / "scores.csv"
+    churn_df.drop(columns=["Churn"]).to_csv(input_path, index=False)
+    score_csv(input_path, output_path, model=model, chunk_size=64)
+
+    report = json.loads(output_path.with_suffix(".drift.json").read_text())
+    window = pd.DataFrame(report["window"]).set_index("feature")
+    assert list(window.index) == list(X_train.columns)
+    assert report["rows_seen"] == len(churn_df)
+    assert window["psi"].notna().all()
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+from tasa_churn.features.build_features import preprocess_data
+from tasa_churn.models.explain import ReasonExplainer
+from tasa_churn.models.predict_model import score_csv
+
+
+def test_contributions_add_up_to_probability(churn_df):
+    X_train, X_test, y_train, _ = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=False)
+    for model in (RandomForestClassifier(n_estimators=15, max_depth=6, random_state=0),
+                  ExtraTreesClassifier(n_estimators=15, random_state=0)):
+        model.fit(X_train.to_numpy(), y_train)
+        explainer = ReasonExplainer.from_model(model, X_train.columns)
+
+        X = X_test.to_numpy()
+        contrib = explainer.contributions(X, chunk_size=7)
+        assert contrib.shape == X.shape
+        np.testing.assert_allclose(explainer.bias + contrib.sum(axis=1), model.predict_proba(X)[:, 1], atol=1e-12)
+
+
+def test_top_reasons_sorted_and_named(churn_df):
+    X_train, X_test, y_train, _ = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=False)
+    model = RandomForestClassifier(n_estimators=10, max_depth=5, random_state=0).fit(X_train.to_numpy(), y_train)
+    explainer = ReasonExplainer.from_model(model, X_train.columns)
+
+    X = X_test.to_numpy()
+    top, values = explainer.top_reasons(X, k=3)
+    assert top.shape == values.shape == (len(X), 3)
+    assert top.dtype == np.int8 and values.dtype == np.float32
+    assert (np.diff(values, axis=1) <= 0).all()
+
+    contrib = explainer.contributions(X)
+    np.testing.assert_allclose(values[:, 0], contrib.max(axis=1), rtol=1e-6)
+    assert set(explainer.reason_names(top).ravel()) <= set(X_train.columns)
+
+
+def test_explainer_rejects_non_tree_models(churn_df):
+    X_train, _, y_train, _ = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=False)
+    model = LogisticRegression().fit(X_train, y_train)
+    with pytest.raises(ValueError):
+        ReasonExplainer.from_model(model, X_train.columns)
+
+
+def test_score_csv_adds_reason_columns(churn_df, tmp_path, artifacts_dir):
+    X_train, _, y_train, _ = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=True)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X_train, y_train)
+
+    input_path = tmp_path / "clientes.csv"
+    output_path = tmp_path / "scores.csv"
+    churn_df.drop(columns=["Churn"]).to_csv(input_path, index=False)
+    score_csv(input_path, output_path, model=model, chunk_size=64, reasons=2)
+
+    scores = pd.read_csv(output_path)
+    assert list(scores.columns[-4:]) == ["reason_1", "reason_1_value", "reason_2", "reason_2_value"]
+    assert scores["reason_1"].isin(X_train.columns).all()
+    assert (scores["reason_1_value"] >= scores["reason_2_value"]).all()
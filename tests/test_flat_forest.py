@@ -0,0 +1,18 @@
+import numpy as np
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+from tasa_churn.features.build_features import preprocess_data
+from tasa_churn.models.flat_forest import FlatForest, export_forest
+
+
+def test_flat_forest_matches_sklearn(churn_df, tmp_path):
+    X_train, X_test, y_train, y_test = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=False)
+    for model in (RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0),
+                  ExtraTreesClassifier(n_estimators=20, random_state=0)):
+        model.fit(X_train.to_numpy(), y_train)
+        export_forest(model, tmp_path / "flat")
+        flat = FlatForest.load(tmp_path / "flat", mmap=True)
+
+        X = X_train.to_numpy()
+        np.testing.assert_allclose(flat.predict_proba(X, chunk_size=64), model.predict_proba(X), atol=1e-12)
+        np.testing.assert_array_equal(flat.predict(X), model.predict(X))
@@ -0,0 +1,57 @@
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+
+from tasa_churn.features.build_features import DROP_COLUMNS
+from tasa_churn.features.transformer import FeatureTransformer
+from tasa_churn.models.incremental import update_model
+from tasa_churn.utils.artifacts import ArtifactStore
+
+
+def _encode(df, columns, encoders):
+    X = df[columns].copy()
+    X["Gender"] = encoders["Gender"].transform(X["Gender"])
+    for col in ("Subscription Type", "Contract Length"):
+        X[col] = X[col].map(encoders[col])
+    return X.astype(float)
+
+
+def test_update_model_appends_trees_and_keeps_old_decisions(churn_df, tmp_path):
+    old, new = churn_df.iloc[:200], churn_df.iloc[200:].copy()
+    new["Age"] += 30  # rango que el scaler original no ha visto
+
+    columns = [c for c in old.columns if c not in DROP_COLUMNS + ["Churn"]]
+    encoders = {"Gender": LabelEncoder().fit(old["Gender"]),
+                "Subscription Type": {'Basic': 0, 'Standard': 1, 'Premium': 2},
+                "Contract Length": {'Monthly': 0, 'Quarterly': 1, 'Annual': 2}}
+    X_old = _encode(old, columns, encoders)
+    scaler = MinMaxScaler().fit(X_old)
+    model = RandomForestClassifier(n_estimators=10, max_depth=4, random_state=0)
+    model.fit(pd.DataFrame(scaler.transform(X_old), columns=columns), old["Churn"])
+
+    artifacts = tmp_path / "artifacts"
+    artifacts.mkdir()
+    for name, value in {"columns": columns, "encoders": encoders, "scaler": scaler}.items():
+        joblib.dump(value, artifacts / f"{name}.joblib")
+    joblib.dump(model, tmp_path / "RandomForest.joblib")
+
+    stats = update_model(new, n_new_trees=5, max_trees=12, artifacts_dir=artifacts, models_dir=tmp_path)
+    assert (stats["added"], stats["retired"], stats["n_trees"]) == (5, 3, 12)
+    assert not list(tmp_path.rglob("*.tmp"))
+
+    new_scaler = joblib.load(artifacts / "scaler.joblib")
+    new_model = joblib.load(tmp_path / "RandomForest.joblib")
+    assert new_scaler.data_max_[columns.index("Age")] == new["Age"].max()
+    assert len(new_model.estimators_) == 12
+    # El modelo publicado solo se empareja con el scaler nuevo
+    paired, paired_scaler = ArtifactStore(artifacts, tmp_path).model_and_scaler(timeout=0)
+    assert paired_scaler.data_max_[columns.index("Age")] == new["Age"].max()
+
+    # Los árboles antiguos que siguen en el bosque deciden igual con el nuevo escalado
+    rows = pd.concat([old, new])
+    X_before = scaler.transform(_encode(rows, columns, encoders)).astype(np.float32)
+    X_after = FeatureTransformer(columns, encoders, new_scaler).transform_batch(rows).astype(np.float32)
+    for before, after in zip(model.estimators_[3:], new_model.estimators_[:7]):
+        np.testing.assert_array_equal(before.apply(X_before), after.apply(X_after))
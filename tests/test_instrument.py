@@ -0,0 +1,32 @@
+import json
+
+from tasa_churn.utils import instrument
+from tasa_churn.utils.instrument import disable_tracing, enable_tracing, stage, traced, write_trace
+
+
+def test_stage_is_noop_when_disabled():
+    disable_tracing()
+    with stage("nada") as s:
+        s.rows = 10
+    assert instrument.tracer.spans == []
+
+
+def test_stages_are_nested_and_written(tmp_path):
+    @traced("fit")
+    def fit():
+        return [0] * 100_000
+
+    enable_tracing(profile_stage="fit", output_dir=tmp_path)
+    try:
+        with stage("pipeline") as s:
+            fit()
+            s.rows = 42
+        path = write_trace(tmp_path / "trace.json")
+    finally:
+        disable_tracing()
+
+    spans = {span["stage"]: span for span in json.loads(path.read_text())["spans"]}
+    assert set(spans) == {"pipeline", "pipeline/fit"}
+    assert spans["pipeline"]["rows"] == 42
+    assert spans["pipeline"]["peak_traced_mb"] >= spans["pipeline/fit"]["peak_increase_mb"] > 0
+    assert list(tmp_path.glob("profile-fit-*.prof"))
@@ -0,0 +1,60 @@
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+
+from tasa_churn.features.build_features import DROP_COLUMNS
+from tasa_churn.features.transformer import FeatureTransformer
+from tasa_churn.models.lookup_table import LookupTableScorer, load_lookup, materialize
+from tasa_churn.utils.artifacts import ArtifactStore
+
+
+def _fit(churn_df, tmp_path):
+    columns = [c for c in churn_df.columns if c not in DROP_COLUMNS + ["Churn"]]
+    encoders = {"Gender": LabelEncoder().fit(churn_df["Gender"]),
+                "Subscription Type": {'Basic': 0, 'Standard': 1, 'Premium': 2},
+                "Contract Length": {'Monthly': 0, 'Quarterly': 1, 'Annual': 2}}
+    X_raw = FeatureTransformer(columns, encoders).encode_batch(churn_df)
+    scaler = MinMaxScaler().fit(pd.DataFrame(X_raw, columns=columns))
+    X = pd.DataFrame(scaler.transform(pd.DataFrame(X_raw, columns=columns)), columns=columns)
+    model = RandomForestClassifier(n_estimators=15, max_depth=6, random_state=0).fit(X, churn_df["Churn"])
+
+    artifacts = tmp_path / "artifacts"
+    artifacts.mkdir()
+    for name, value in {"columns": columns, "encoders": encoders, "scaler": scaler}.items():
+        joblib.dump(value, artifacts / f"{name}.joblib")
+    joblib.dump(model, tmp_path / "RandomForest.joblib")
+    return ArtifactStore(artifacts, tmp_path, "RandomForest.joblib"), X
+
+
+def test_lookup_table_matches_model(churn_df, tmp_path):
+    store, X = _fit(churn_df, tmp_path)
+    scorer = LookupTableScorer.build(store.model, store.scaler, store.columns)
+
+    report = scorer.validate(X)
+    assert report["coverage"] == 1.0
+    assert report["max_abs_error"] <= 1 / 510 + 1e-9
+    assert report["prediction_agreement"] == 1.0
+
+    # Fuera de la rejilla (Age mayor que el máximo visto) se usa el modelo real
+    outside = X.iloc[:3].copy()
+    outside["Age"] = 1.5
+    _, inside = scorer.grid_index(outside)
+    assert not inside.any()
+    np.testing.assert_allclose(scorer.predict_proba(outside), store.model.predict_proba(outside))
+
+
+def test_materialize_round_trip_and_staleness(churn_df, tmp_path):
+    store, X = _fit(churn_df, tmp_path)
+    built = materialize(store=store, X_test=X)
+    assert built.meta["validation"]["rows"] == len(X)
+
+    loaded = load_lookup(store)
+    assert isinstance(loaded.table, np.memmap)
+    np.testing.assert_array_equal(loaded.predict_proba(X), built.predict_proba(X))
+
+    # Con otro modelo la tabla queda obsoleta
+    model = RandomForestClassifier(n_estimators=3, random_state=1).fit(X, churn_df["Churn"])
+    joblib.dump(model, tmp_path / "RandomForest.joblib")
+    assert load_lookup(ArtifactStore(store.paths["columns"].parent, tmp_path, "RandomForest.joblib")) is None
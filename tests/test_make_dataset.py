@@ -0,0 +1,31 @@
+import pytest
+
+from tasa_churn.data.make_dataset import load_data
+
+
+def test_load_data_cache_roundtrip(churn_df, tmp_path):
+    pytest.importorskip("pyarrow")
+    csv_path = tmp_path / "clientes.csv"
+    churn_df.to_csv(csv_path, index=False)
+
+    first = load_data(csv_path, cache_dir=tmp_path)
+    assert list(tmp_path.glob("clientes-*.parquet"))
+    assert str(first["Gender"].dtype) == "category"
+    assert str(first["Age"].dtype) == "Int8"
+
+    cached = load_data(csv_path, cache_dir=tmp_path)
+    assert cached.equals(first)
+
+    subset = load_data(csv_path, columns=["Age", "Churn"], cache_dir=tmp_path)
+    assert list(subset.columns) == ["Age", "Churn"]
+
+
+def test_load_data_cache_invalidated_on_change(churn_df, tmp_path):
+    pytest.importorskip("pyarrow")
+    csv_path = tmp_path / "clientes.csv"
+    churn_df.to_csv(csv_path, index=False)
+    load_data(csv_path, cache_dir=tmp_path)
+
+    churn_df.head(10).to_csv(csv_path, index=False)
+    assert len(load_data(csv_path, cache_dir=tmp_path)) == 10
+    assert len(list(tmp_path.glob("clientes-*.parquet"))) == 1
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from tasa_churn.features.out_of_core import preprocess_out_of_core, in_test_split
+from tasa_churn.models.train_model import train_models_out_of_core
+
+
+def test_out_of_core_matrices_are_chunk_independent(churn_df, tmp_path):
+    csv_path = tmp_path / "churn.csv"
+    churn_df.to_csv(csv_path, index=False)
+
+    small = preprocess_out_of_core(csv_path, tmp_path / "small", chunk_size=70, save_artifacts=False)
+    large = preprocess_out_of_core(csv_path, tmp_path / "large", chunk_size=1000, save_artifacts=False)
+
+    X_train, X_test, y_train, y_test = small
+    assert X_train.dtype == np.float32 and y_train.dtype == np.int8
+    assert len(X_train) + len(X_test) == len(churn_df)
+    assert len(X_train) == len(y_train) and len(X_test) == len(y_test)
+    # Reparto por hash del cliente, igual que lo haría in_test_split sobre todo el dataset
+    assert len(X_test) == in_test_split(churn_df).sum()
+    # El scaler ajustado por bloques ve el mínimo y el máximo globales
+    X_all = np.vstack([X_train, X_test])
+    np.testing.assert_allclose(X_all.min(axis=0), 0, atol=1e-6)
+    np.testing.assert_allclose(X_all.max(axis=0), 1, atol=1e-6)
+    for a, b in zip(small, large):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_out_of_core_matrices_match_preprocess_data(churn_df, tmp_path):
+    from tasa_churn.features.build_features import preprocess_data
+
+    # Columna numérica con decimales (fuera de RAW_SCHEMA): el escalado tiene que hacerse en
+    # float64 en los dos caminos para que coincidan
+    df = churn_df.assign(Discount=np.linspace(0.01, 0.99, len(churn_df)) / 3)
+    csv_path = tmp_path / "churn.csv"
+    df.to_csv(csv_path, index=False)
+
+    ooc = preprocess_out_of_core(csv_path, tmp_path / "matrices", chunk_size=70, save_artifacts=False)
+    in_memory = preprocess_data(df, target_col="Churn", save_artifacts=False)
+    # Los repartos train/test son distintos: se comparan todas las filas, ordenadas
+    rows_ooc = np.vstack(ooc[:2])
+    rows_mem = np.vstack([in_memory[0].to_numpy(), in_memory[1].to_numpy()])
+    np.testing.assert_array_equal(np.unique(rows_ooc, axis=0), np.unique(rows_mem, axis=0))
+
+
+def test_train_out_of_core_merges_chunk_forests(churn_df, tmp_path):
+    csv_path = tmp_path / "churn.csv"
+    churn_df.to_csv(csv_path, index=False)
+    X_train, X_test, y_train, y_test = preprocess_out_of_core(csv_path, tmp_path / "matrices", chunk_size=100,
+                                                              save_artifacts=False)
+    columns = ["Age", "Gender", "Tenure", "Support Calls", "Payment Delay", "Subscription Type", "Contract Length"]
+
+    models = train_models_out_of_core(X_train, y_train, columns, n_estimators=10, chunk_rows=80,
+                                      models_dir=tmp_path)
+    model = models["RandomForest"]
+    assert len(model.estimators_) == 10
+    assert (tmp_path / "RandomForest.joblib").exists()
+    assert (model.predict(pd.DataFrame(X_test, columns=columns)) == y_test).mean() > 0.8
+
+
+def test_train_out_of_core_keeps_trees_of_single_class_last_chunk(tmp_path):
+    rng = np.random.default_rng(0)
+    X_train = rng.random((200, 2), dtype=np.float32)
+    y_train = (X_train[:, 0] > 0.5).astype(np.int8)
+    y_train[150:] = 0
+
+    models = train_models_out_of_core(X_train, y_train, ["a", "b"], n_estimators=8, chunk_rows=50,
+                                      models_dir=tmp_path)
+    model = models["RandomForest"]
+    assert len(model.estimators_) == 8
+    assert list(model.classes_) == [0, 1]
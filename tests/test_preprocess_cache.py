@@ -0,0 +1,52 @@
+import numpy as np
+
+from tasa_churn.features.build_features import preprocess_data
+from tasa_churn.features.transformer import FeatureTransformer
+
+
+def test_preprocess_cache_hit_matches_fresh_run(churn_df, tmp_path):
+    fresh = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=True, use_cache=True, cache_dir=tmp_path)
+    assert len(list(tmp_path.glob("preprocess-*"))) == 1
+
+    cached = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=True, use_cache=True, cache_dir=tmp_path)
+    for a, b in zip(fresh, cached):
+        np.testing.assert_array_equal(a.to_numpy(), b.to_numpy())
+        assert a.index.equals(b.index)
+    # Los arrays cacheados se abren mapeados, en solo lectura
+    assert not cached[0].to_numpy().flags.writeable
+
+
+def test_preprocess_cache_key_depends_on_data(churn_df, tmp_path):
+    preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=False, use_cache=True, cache_dir=tmp_path)
+    preprocess_data(churn_df.head(200).copy(), target_col="Churn", save_artifacts=False, use_cache=True, cache_dir=tmp_path)
+    assert len(list(tmp_path.glob("preprocess-*"))) == 2
+
+
+def test_float32_pipeline_matches_float64(churn_df, tmp_path):
+    from sklearn.ensemble import RandomForestClassifier
+
+    X_train, X_test, y_train, y_test = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=False,
+                                                       use_cache=True, cache_dir=tmp_path)
+    X_train64, X_test64, _, _ = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=False,
+                                                use_cache=True, cache_dir=tmp_path, dtype=np.float64)
+    # dtype forma parte de la clave de la caché
+    assert len(list(tmp_path.glob("preprocess-*"))) == 2
+    assert X_train.to_numpy().dtype == np.float32 and X_train64.to_numpy().dtype == np.float64
+    assert X_train.to_numpy().nbytes * 2 == X_train64.to_numpy().nbytes
+    assert X_train.index.equals(X_train64.index) and y_train.index.equals(X_train.index)
+
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X_train, y_train)
+    model64 = RandomForestClassifier(n_estimators=10, random_state=0).fit(X_train64, y_train)
+    np.testing.assert_array_equal(model.predict_proba(X_test), model64.predict_proba(X_test64))
+
+
+def test_float32_pipeline_scales_fractional_values_like_serving(churn_df, artifacts_dir):
+    # Antigüedad con fracción de mes: float32 no la representa exactamente antes de escalar
+    df = churn_df.assign(Tenure=churn_df["Tenure"] + np.linspace(0.01, 0.99, len(churn_df)))
+    X_train, _, _, _ = preprocess_data(df.copy(), target_col="Churn", save_artifacts=True)
+
+    transformer = FeatureTransformer.from_artifacts()
+    tenure = transformer.columns.index("Tenure")
+    assert transformer.scale[tenure] == 1 / (df["Tenure"].max() - df["Tenure"].min())
+    rows = df.loc[X_train.index, transformer.columns]
+    np.testing.assert_array_equal(X_train.to_numpy(), transformer.transform_batch(rows))
@@ -1,32 +1,11 @@
 import pytest
-import pandas as pd
 import numpy as np
 import joblib
 from pathlib import Path
 
 from tasa_churn.features.build_features import preprocess_data, process_input
-from tasa_churn.utils.paths import ARTIFACTS_DIR
 
-@pytest.fixture
-def sample_df():
-    data = {
-        "CustomerID": [1, 2],
-        "Gender": ["Male", "Female"],
-        "Subscription Type": ["Basic", "Premium"],
-        "Contract Length": ["Monthly", "Annual"],
-        "Usage Frequency": [5, 10],
-        "Last Interaction": [3, 2],
-        "Total Spend": [200, 400],
-        "Age": [35, 42],
-        "Tenure": [24, 36],
-        "Support Calls": [2, 1],
-        "Payment Delay": [3, 0],
-        "Churn": [1, 0]
-    }
-    return pd.DataFrame(data)
-
-
-def test_preprocess_columns_and_encoding(sample_df):
+def test_preprocess_columns_and_encoding(sample_df, artifacts_dir):
     X_train, X_test, y_train, y_test = preprocess_data(sample_df.copy(), target_col="Churn", save_artifacts=True)
 
     # Columnas irrelevantes eliminadas
@@ -34,7 +13,7 @@ def test_preprocess_columns_and_encoding(sample_df):
         assert col not in X_train.columns
 
     # Gender está codificado con LabelEncoder
-    encoders = joblib.load(ARTIFACTS_DIR / "encoders.joblib")
+    encoders = joblib.load(artifacts_dir / "encoders.joblib")
     assert set(X_train['Gender']).issubset({0, 1})
     assert hasattr(encoders['Gender'], 'classes_')
 
@@ -45,14 +24,14 @@ def test_preprocess_columns_and_encoding(sample_df):
     # Escalado entre 0 y 1
     assert np.all((X_train >= 0) & (X_train <= 1))
 
-def test_artifacts_saved(sample_df):
+def test_artifacts_saved(sample_df, artifacts_dir):
     preprocess_data(sample_df.copy(), target_col="Churn", save_artifacts=True)
     # Verificar que los artefactos existen
-    assert Path(ARTIFACTS_DIR / "columns.joblib").exists()
-    assert Path(ARTIFACTS_DIR / "encoders.joblib").exists()
-    assert Path(ARTIFACTS_DIR / "scaler.joblib").exists()
+    assert Path(artifacts_dir / "columns.joblib").exists()
+    assert Path(artifacts_dir / "encoders.joblib").exists()
+    assert Path(artifacts_dir / "scaler.joblib").exists()
 
-def test_process_input_basic(sample_df):
+def test_process_input_basic(sample_df, artifacts_dir):
     preprocess_data(sample_df.copy(), target_col="Churn", save_artifacts=True)
     user_input = {
         "Gender": "Male",
@@ -67,7 +46,7 @@ def test_process_input_basic(sample_df):
     # Devuelve numpy array
     assert isinstance(processed, np.ndarray)
     # Tiene tantas columnas como el DataFrame entrenado
-    columns = joblib.load(ARTIFACTS_DIR / "columns.joblib")
+    columns = joblib.load(artifacts_dir / "columns.joblib")
     assert processed.shape[1] == len(columns)
 
 def test_process_input_scaling(sample_df):
@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+from sklearn.ensemble import RandomForestClassifier
+
+from tasa_churn.features.build_features import preprocess_data
+from tasa_churn.features.transformer import FeatureTransformer
+from tasa_churn.serving.batching import MicroBatcher, Scorer
+from tasa_churn.serving.loadgen import random_customers, run_load
+from tasa_churn.serving.server import ScoringServer
+
+
+def _scorer(churn_df):
+    X_train, X_test, y_train, y_test = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=True)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X_train.to_numpy(), y_train)
+    return Scorer(model=model, transformer=FeatureTransformer.from_artifacts())
+
+
+def test_micro_batcher_coalesces_requests(churn_df):
+    scorer = _scorer(churn_df)
+    customers = random_customers(20)
+
+    async def run():
+        batcher = MicroBatcher(scorer, max_batch_size=64, max_wait_ms=50)
+        batcher.start()
+        results = await asyncio.gather(*(batcher.submit([c]) for c in customers))
+        await batcher.stop()
+        return results, batcher.metrics()
+
+    results, metrics = asyncio.run(run())
+    expected = scorer.score(customers)
+    assert [r[0] for r in results] == expected
+    assert metrics["requests"] == 20
+    assert sum(metrics["batch_size_histogram"].values()) < 20
+
+
+def test_server_isolates_bad_rows(churn_df):
+    scorer = _scorer(churn_df)
+    good, bad = random_customers(2)
+    bad["Gender"] = "Other"
+
+    async def run():
+        server = await ScoringServer(scorer=scorer, port=0).start()
+        status_bulk, bulk = await server._route("POST", "/predict", json.dumps([bad, good]).encode())
+        load = await run_load(server.host, server.port, n_requests=50, concurrency=5)
+        await server.stop()
+        return status_bulk, bulk, load
+
+    status_bulk, bulk, load = asyncio.run(run())
+    assert status_bulk == 200
+    assert "error" in bulk["results"][0]
+    assert "churn_probability" in bulk["results"][1]
+    assert load["requests"] == 50
+
+
+def test_server_rejects_malformed_requests(churn_df):
+    scorer = _scorer(churn_df)
+
+    async def send(server, raw):
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        writer.write(raw)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response
+
+    async def run():
+        server = await ScoringServer(scorer=scorer, port=0).start()
+        responses = [await send(server, b"BASURA\r\n\r\n"),
+                     await send(server, b"POST /predict HTTP/1.1\r\nContent-Length: diez\r\n\r\n")]
+        metrics = server.batcher.metrics()
+        await server.stop()
+        return responses, metrics
+
+    responses, metrics = asyncio.run(run())
+    for response in responses:
+        assert response.startswith(b"HTTP/1.1 400 Bad Request")
+        assert b"Connection: close" in response and b"mal formada" in response
+    assert metrics["errors"] == 2
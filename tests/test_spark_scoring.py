@@ -0,0 +1,74 @@
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+
+from tasa_churn.features.build_features import DROP_COLUMNS
+from tasa_churn.features.transformer import FeatureTransformer
+from tasa_churn.features.validation import SchemaValidator, UNKNOWN_CATEGORY
+from tasa_churn.models.spark_scoring import score_batch
+from tasa_churn.utils.artifacts import ArtifactStore
+
+
+def _store(churn_df, tmp_path):
+    columns = [c for c in churn_df.columns if c not in DROP_COLUMNS + ["Churn"]]
+    encoders = {"Gender": LabelEncoder().fit(churn_df["Gender"]),
+                "Subscription Type": {'Basic': 0, 'Standard': 1, 'Premium': 2},
+                "Contract Length": {'Monthly': 0, 'Quarterly': 1, 'Annual': 2}}
+    transformer = FeatureTransformer(columns, encoders)
+    scaler = MinMaxScaler().fit(pd.DataFrame(transformer.encode_batch(churn_df), columns=columns))
+    X = FeatureTransformer(columns, encoders, scaler).transform_batch(churn_df)
+    model = RandomForestClassifier(n_estimators=5, max_depth=4, random_state=0).fit(X, churn_df["Churn"])
+
+    artifacts = tmp_path / "artifacts"
+    artifacts.mkdir()
+    for name, value in {"columns": columns, "encoders": encoders, "scaler": scaler}.items():
+        joblib.dump(value, artifacts / f"{name}.joblib")
+    joblib.dump(model, tmp_path / "RandomForest.joblib")
+    return ArtifactStore(artifacts, tmp_path, "RandomForest.joblib"), X
+
+
+def test_score_batch_nulls_invalid_rows(churn_df, tmp_path):
+    store, X = _store(churn_df, tmp_path)
+    batch = churn_df.drop(columns=["Churn"]).head(10).copy()
+    batch.loc[2, "Gender"] = "Otro"
+    transformer = FeatureTransformer(store.columns, store.encoders, store.scaler)
+    validator = SchemaValidator(store.columns, store.encoders, store.scaler)
+
+    scores = score_batch(batch, transformer, validator, store.model, 1, id_col="CustomerID")
+    assert list(scores["CustomerID"]) == list(batch["CustomerID"])
+    assert scores["error_code"][2] == UNKNOWN_CATEGORY
+    assert pd.isna(scores["churn_probability"][2]) and pd.isna(scores["churn_prediction"][2])
+    valid = scores["error_code"] == 0
+    np.testing.assert_allclose(scores["churn_probability"][valid], store.model.predict_proba(X[:10][valid])[:, 1])
+
+
+@pytest.mark.spark
+def test_score_csv_spark_local_mode(churn_df, tmp_path):
+    # make test-spark (TASA_CHURN_REQUIRE_SPARK=1) exige pyspark y Java: sin ellos la prueba falla, no se salta
+    if not os.environ.get("TASA_CHURN_REQUIRE_SPARK"):
+        pytest.importorskip("pyspark", reason="pyspark no instalado (pip install -e .[ml])")
+        if not (os.environ.get("JAVA_HOME") or shutil.which("java")):
+            pytest.skip("Spark necesita Java (JAVA_HOME o java en el PATH)")
+    from tasa_churn.models.spark_scoring import score_csv_spark, spark_session
+
+    store, X = _store(churn_df, tmp_path)
+    input_path = tmp_path / "clientes.csv"
+    churn_df.drop(columns=["Churn"]).to_csv(input_path, index=False)
+
+    spark = spark_session("local[*]")
+    try:
+        stats = score_csv_spark(input_path, tmp_path / "scores.parquet", spark=spark, store=store)
+    finally:
+        spark.stop()
+
+    scores = pd.read_parquet(tmp_path / "scores.parquet").sort_values("CustomerID")
+    assert stats["rows"] == len(churn_df)
+    assert {p.name.split("=")[0] for p in (tmp_path / "scores.parquet").glob("churn_prediction=*")} == \
+        {"churn_prediction"}
+    np.testing.assert_allclose(scores["churn_probability"], store.model.predict_proba(X)[:, 1])
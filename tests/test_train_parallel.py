@@ -0,0 +1,18 @@
+from tasa_churn.features.build_features import preprocess_data
+from tasa_churn.models.train_model import train_models_parallel
+
+
+def test_train_models_parallel_writes_models_and_table(churn_df, tmp_path):
+    X_train, X_test, y_train, y_test = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=False)
+    candidates = {
+        "rf_small": ("sklearn.ensemble.RandomForestClassifier", {"n_estimators": 5, "max_depth": 3, "random_state": 0}),
+        "et_small": ("sklearn.ensemble.ExtraTreesClassifier", {"n_estimators": 5, "max_depth": 3, "random_state": 0}),
+        "missing": ("paquete_inexistente.Modelo", {}),
+    }
+    table = train_models_parallel(X_train, y_train, X_test, y_test, candidates=candidates, n_workers=2,
+                                  models_dir=tmp_path, report_path=tmp_path / "comparison.csv")
+
+    assert set(table["model"]) == {"rf_small", "et_small"}
+    assert (tmp_path / "rf_small.joblib").exists()
+    assert (tmp_path / "comparison.csv").exists()
+    assert {"fit_seconds", "predict_rows_per_sec", "model_size_mb", "roc_auc"} <= set(table.columns)
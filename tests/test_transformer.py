@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from tasa_churn.features.build_features import preprocess_data
+from tasa_churn.features.transformer import FeatureTransformer
+
+
+def test_transform_one_and_batch_agree(churn_df):
+    preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=True)
+    transformer = FeatureTransformer.from_artifacts()
+
+    rows = churn_df[transformer.columns].head(30)
+    batch = transformer.transform_batch(rows)
+    singles = np.vstack([transformer.transform_one(r) for r in rows.to_dict("records")])
+    from_array = transformer.transform_batch(rows.to_numpy(dtype=object))
+
+    np.testing.assert_array_equal(batch, singles)
+    np.testing.assert_array_equal(batch, from_array)
+
+
+def test_transform_unknown_categories(churn_df):
+    preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=True)
+    transformer = FeatureTransformer.from_artifacts()
+
+    row = churn_df[transformer.columns].iloc[0].to_dict()
+    lenient = transformer.encode_one({**row, "Subscription Type": "Gold", "Contract Length": "annual"})
+    assert lenient[0, transformer.columns.index("Subscription Type")] == 0
+    assert lenient[0, transformer.columns.index("Contract Length")] == 2
+
+    with pytest.raises(ValueError):
+        transformer.transform_batch({**{c: [v] for c, v in row.items()}, "Gender": ["Other"]})
@@ -0,0 +1,95 @@
+import time
+
+import numpy as np
+import joblib
+import pytest
+
+from tasa_churn.features.build_features import preprocess_data
+from tasa_churn.models import tuning
+from tasa_churn.models.tuning import sample_configs, schedule, stratified_order, tune_models
+
+
+def test_stratified_order_keeps_class_ratio_in_prefixes():
+    y = np.r_[np.ones(300, dtype=int), np.zeros(700, dtype=int)]
+    order = stratified_order(y, random_state=0)
+    assert sorted(order) == list(range(len(y)))
+    for n in (50, 100, 500):
+        assert abs(y[order[:n]].mean() - 0.3) <= 1.5 / n + 0.02
+
+
+def test_schedule_halves_configs_and_grows_resources():
+    rounds = schedule(27, 100_000, 300, eta=3)
+    assert [r[0] for r in rounds] == [27, 9, 3]
+    assert rounds[-1][1:] == (100_000, 300)
+    assert rounds[0][1] < rounds[1][1] < rounds[2][1] and rounds[0][2] < rounds[1][2]
+
+
+def test_sample_configs_are_distinct_and_skip_missing_families():
+    configs = sample_configs(6, families=["RandomForest", "ExtraTrees", "LightGBM"], random_state=0)
+    assert len(configs) == 6
+    assert {family for family, _ in configs.values()} <= {"RandomForest", "ExtraTrees", "LightGBM"}
+    assert len({str(spec) for _, spec in configs.values()}) == 6
+
+
+def test_tune_models_saves_winner_and_leaderboard(churn_df, tmp_path):
+    X_train, X_test, y_train, y_test = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=False)
+    published = []
+    model, table = tune_models(X_train, y_train, X_test, y_test, n_configs=4, eta=2, max_trees=8,
+                               families=["RandomForest", "HistGradientBoosting"], n_workers=2,
+                               models_dir=tmp_path, model_name="RandomForest.joblib",
+                               report_path=tmp_path / "leaderboard.csv",
+                               publish_artifacts=lambda: published.append(list(tmp_path.iterdir())))
+
+    # Los artefactos se publican una vez, después de la búsqueda y antes de guardar el modelo
+    assert published == [[]]
+
+    rounds = table[table["round"] != "final"]
+    assert list(rounds.groupby("round").size()) == [4, 2]
+    assert (table["round"] == "final").sum() == 1
+    assert {"fit_seconds", "predict_ms_per_1k_rows", "single_row_ms", "params"} <= set(table.columns)
+    saved = joblib.load(tmp_path / "RandomForest.joblib")
+    np.testing.assert_allclose(saved.predict_proba(X_test.to_numpy()), model.predict_proba(X_test.to_numpy()))
+    assert (tmp_path / "leaderboard.json").exists()
+    # Solo un bosque puede sustituir al modelo de producción
+    assert set(table["family"]) == {"RandomForest"} and hasattr(saved, "estimators_")
+
+
+def test_tune_models_only_saves_forests(churn_df, tmp_path):
+    X_train, X_test, y_train, y_test = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=False)
+    with pytest.raises(ValueError):
+        tune_models(X_train, y_train, X_test, y_test, n_configs=2, families=["HistGradientBoosting"],
+                    models_dir=tmp_path, report_path=None)
+    assert not list(tmp_path.iterdir())
+
+    model, _ = tune_models(X_train, y_train, X_test, y_test, n_configs=2, eta=2, max_trees=8, n_workers=1,
+                           families=["HistGradientBoosting"], save=False, report_path=None)
+    assert not hasattr(model, "estimators_")
+
+
+def test_tune_models_stops_when_budget_is_spent(churn_df, tmp_path):
+    X_train, X_test, y_train, y_test = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=False)
+    _, table = tune_models(X_train, y_train, X_test, y_test, n_configs=4, eta=2, max_trees=8, budget_seconds=0,
+                           families=["RandomForest"], n_workers=1, save=False, report_path=None)
+    # Solo la primera ronda (siempre se ejecuta) y el modelo final
+    assert list(table["round"]).count(1) == 4 and set(table["round"]) == {1, "final"}
+
+
+def _hanging_fit(name, spec, n_rows, data_paths):
+    # Ronda final (8 árboles): un ajuste mucho más lento que lo que estima la ronda anterior
+    if spec[1]["n_estimators"] == 8:
+        time.sleep(60)
+    return _real_fit(name, spec, n_rows, data_paths)
+
+
+_real_fit = tuning._fit_config
+
+
+def test_tune_models_terminates_rounds_over_budget(churn_df, monkeypatch):
+    X_train, X_test, y_train, y_test = preprocess_data(churn_df.copy(), target_col="Churn", save_artifacts=False)
+    monkeypatch.setattr(tuning, "_fit_config", _hanging_fit)
+    budget = 5
+    start = time.perf_counter()
+    _, table = tune_models(X_train, y_train, X_test, y_test, n_configs=4, eta=2, max_trees=8, budget_seconds=budget,
+                           families=["RandomForest"], n_workers=2, save=False, report_path=None)
+    assert time.perf_counter() - start < budget + 3
+    assert set(table["round"]) == {1, "final"}
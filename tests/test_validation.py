@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+
+from tasa_churn.features.validation import (MISSING_COLUMN, NOT_NUMERIC, OUT_OF_RANGE,
+                                            UNKNOWN_CATEGORY, SchemaValidator)
+
+
+def test_validator_flags_each_row_without_raising(sample_df):
+    columns = ["Gender", "Subscription Type", "Age"]
+    encoders = {"Gender": LabelEncoder().fit(["Female", "Male"]),
+                "Subscription Type": {'Basic': 0, 'Standard': 1, 'Premium': 2}}
+    scaler = MinMaxScaler().fit(np.array([[0, 0, 18], [1, 2, 65]]))
+    validator = SchemaValidator(columns, encoders, scaler)
+
+    batch = pd.DataFrame({
+        "Gender": ["Male", "Otro", "Female", "Male"],
+        "Subscription Type": ["premium", "Basic", "Gold", "Basic"],
+        "Age": ["35", "40", "x", "90"],
+    })
+    valid, errors = validator.validate(batch)
+    np.testing.assert_array_equal(valid, [True, False, False, False])
+    np.testing.assert_array_equal(errors, [0, UNKNOWN_CATEGORY, UNKNOWN_CATEGORY | NOT_NUMERIC, OUT_OF_RANGE])
+    assert errors.dtype == np.uint8
+
+    # Columnas como 'category' dan el mismo resultado
+    _, errors_cat = validator.validate(batch.astype("category"))
+    np.testing.assert_array_equal(errors_cat, errors)
+
+    # Una columna ausente marca todas las filas
+    valid, errors = validator.validate(batch.drop(columns=["Age"]))
+    assert not valid.any() and (errors & MISSING_COLUMN).all()
+    assert validator.describe(validator.check(batch))[2] == \
+        "Subscription Type: categoría desconocida; Age: no numérico"
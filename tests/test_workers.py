@@ -0,0 +1,61 @@
+import asyncio
+import json
+import threading
+import urllib.request
+
+import joblib
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+
+from tasa_churn.features.build_features import DROP_COLUMNS
+from tasa_churn.features.transformer import FeatureTransformer
+from tasa_churn.serving.loadgen import run_load
+from tasa_churn.serving.workers import WorkerPool
+from tasa_churn.utils.artifacts import ArtifactStore
+
+
+def _health(port):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=10) as response:
+        return json.loads(response.read())
+
+
+def test_worker_pool_hot_swaps_without_dropping_requests(churn_df, tmp_path):
+    columns = [c for c in churn_df.columns if c not in DROP_COLUMNS + ["Churn"]]
+    encoders = {"Gender": LabelEncoder().fit(churn_df["Gender"]),
+                "Subscription Type": {'Basic': 0, 'Standard': 1, 'Premium': 2},
+                "Contract Length": {'Monthly': 0, 'Quarterly': 1, 'Annual': 2}}
+    raw = pd.DataFrame(FeatureTransformer(columns, encoders).encode_batch(churn_df), columns=columns)
+    scaler = MinMaxScaler().fit(raw)
+    X, y = scaler.transform(raw), churn_df["Churn"]
+
+    artifacts = tmp_path / "artifacts"
+    artifacts.mkdir()
+    for name, value in {"columns": columns, "encoders": encoders, "scaler": scaler}.items():
+        joblib.dump(value, artifacts / f"{name}.joblib")
+    model_path = tmp_path / "RandomForest.joblib"
+    joblib.dump(RandomForestClassifier(n_estimators=5, max_depth=4, random_state=0).fit(X, y), model_path)
+
+    store = ArtifactStore(artifacts, tmp_path, "RandomForest.joblib")
+    pool = WorkerPool(n_workers=2, port=0, store=store, root=tmp_path / "serving").start()
+    try:
+        assert _health(pool.port)["model_version"] == 1
+
+        # Carga continua mientras se publica un modelo nuevo
+        result = {}
+        load = threading.Thread(target=lambda: result.update(
+            asyncio.run(run_load(pool.host, pool.port, n_requests=400, concurrency=8))))
+        load.start()
+        joblib.dump(RandomForestClassifier(n_estimators=8, random_state=1).fit(X, y), model_path)
+        assert pool.check_for_update()
+        load.join()
+        assert result["requests"] == 400
+        assert _health(pool.port)["model_version"] == 2
+
+        # Un modelo con otras features no pasa la prueba y se sigue sirviendo el anterior
+        joblib.dump(RandomForestClassifier(n_estimators=2).fit(X[:, :3], y), model_path)
+        assert not pool.check_for_update()
+        assert _health(pool.port)["model_version"] == 2
+        assert not (tmp_path / "serving" / "v000003").exists()
+    finally:
+        pool.stop()